@@ -4,24 +4,45 @@ Coordinates position monitoring, risk calculation, and alerts
 """
 import asyncio
 import logging
-from typing import Dict, List, Optional, Any
-from datetime import datetime, timedelta
+import time
+from typing import Dict, List, Optional, Any, Set, Tuple
 
 from bot.reya_client import ReyaAPIClient
 from bot.risk_calculator import RiskCalculator
 from bot.user_manager import UserManager
 from websocket.reya_websocket import ReyaWebSocketManager
 from data.storage import Database
-from data.models import Position, AccountBalance, Alert, AlertSeverity
+from data.models import Position, AccountBalance, Alert, AlertSeverity, Wallet, WalletSnapshot
 from utils.formatters import format_liquidation_alert, format_risk_level
 from config.settings import (
     ALERT_FREQUENCY_WARNING,
     ALERT_FREQUENCY_CRITICAL,
-    ALERT_FREQUENCY_URGENT
+    ALERT_FREQUENCY_URGENT,
+    POSITION_UPDATE_INTERVAL,
+    MONITOR_MAX_CONCURRENCY,
+    WALLET_SNAPSHOT_TTL,
+    WALLET_SNAPSHOT_CACHE_SIZE,
+    WALLET_REFRESH_TTL
 )
 
 logger = logging.getLogger(__name__)
 
+# Field carrying an account's collateral balance in Reya balance payloads
+BALANCE_KEY = 'realBalance'
+
+# Position payload fields that affect stored state
+POSITION_KEYS = ('symbol', 'side', 'qty', 'avgEntryPrice', 'mark_price', 'unrealized_pnl')
+
+
+def parse_total_balance(accounts: List[dict]) -> float:
+    """Sum account balances from a normalized list of Reya accounts"""
+    total_balance = 0.0
+    for account_balance in accounts:
+        value = account_balance.get(BALANCE_KEY)
+        if value is not None:
+            total_balance += float(value)
+    return total_balance
+
 
 class LiquidationMonitor:
     """Monitor positions and send liquidation alerts"""
@@ -41,14 +62,34 @@ class LiquidationMonitor:
         self.risk_calculator = risk_calculator
 
         # Track last alert times to prevent spam
-        self.last_alert_times: Dict[str, Dict[str, datetime]] = {}
-        # wallet_address -> {position_symbol -> last_alert_time}
+        self.last_alert_times: Dict[Tuple[str, str, str], float] = {}
+        # (wallet_address, position_symbol, severity) -> time.monotonic() of last alert
 
         # Store telegram bot reference (will be set later)
         self.telegram_bot = None
 
-        # Monitoring tasks
-        self.monitoring_tasks: Dict[str, asyncio.Task] = {}
+        # Monitored wallets, refreshed together by a single scheduler task
+        self.monitored_wallets: Set[str] = set()
+        self._scheduler_task: Optional[asyncio.Task] = None
+
+        # Wallet records for monitored wallets (wallet_address -> Wallet)
+        self._wallet_cache: Dict[str, Wallet] = {}
+
+        # Last WebSocket payload fingerprints, used to skip no-op updates
+        self._last_balance_fp: Dict[str, float] = {}
+        self._last_position_fp: Dict[Tuple[str, str], tuple] = {}
+
+        # Last risk-checked position values written to the database,
+        # keyed by (wallet_id, symbol); used to skip identical rewrites
+        self._stored_position_fp: Dict[Tuple[int, str], tuple] = {}
+
+        # Recent wallet snapshots (wallet_address -> (time.monotonic(), snapshot))
+        # and in-flight loads, so concurrent status/portfolio requests share one read
+        self._snapshot_cache: Dict[str, Tuple[float, WalletSnapshot]] = {}
+        self._snapshot_loads: Dict[str, asyncio.Task] = {}
+
+        # time.monotonic() of each wallet's last completed REST refresh
+        self._last_fetch_times: Dict[str, float] = {}
 
     def set_telegram_bot(self, telegram_bot):
         """Set telegram bot reference for sending alerts"""
@@ -63,21 +104,26 @@ class LiquidationMonitor:
         """
         wallet_address = wallet_address.lower()
 
-        if wallet_address in self.monitoring_tasks:
+        if wallet_address in self.monitored_wallets:
             logger.warning(f"Already monitoring wallet: {wallet_address}")
             return
 
         logger.info(f"Starting monitoring for wallet: {wallet_address}")
 
+        # Cache the wallet record for the update paths
+        wallet = await asyncio.to_thread(self.user_manager.get_wallet_by_address, wallet_address)
+        if wallet:
+            self._wallet_cache[wallet_address] = wallet
+
         # Fetch initial data
         await self._fetch_wallet_data(wallet_address)
 
         # Subscribe to WebSocket updates
-        await self._subscribe_wallet_websockets(wallet_address)
+        await self._subscribe_wallet_websockets([wallet_address])
 
-        # Start periodic update task (fallback)
-        task = asyncio.create_task(self._periodic_update_task(wallet_address))
-        self.monitoring_tasks[wallet_address] = task
+        # Include wallet in the periodic update tick (fallback)
+        self.monitored_wallets.add(wallet_address)
+        self._ensure_scheduler()
 
         logger.info(f"Monitoring started for wallet: {wallet_address}")
 
@@ -85,14 +131,17 @@ class LiquidationMonitor:
         """Stop monitoring a wallet"""
         wallet_address = wallet_address.lower()
 
-        # Cancel monitoring task
-        if wallet_address in self.monitoring_tasks:
-            self.monitoring_tasks[wallet_address].cancel()
-            try:
-                await self.monitoring_tasks[wallet_address]
-            except asyncio.CancelledError:
-                pass
-            del self.monitoring_tasks[wallet_address]
+        # Remove wallet from the periodic update tick
+        self.monitored_wallets.discard(wallet_address)
+        wallet = self._wallet_cache.pop(wallet_address, None)
+        if wallet:
+            for key in [k for k in self._stored_position_fp if k[0] == wallet.id]:
+                del self._stored_position_fp[key]
+        self._last_balance_fp.pop(wallet_address, None)
+        self._snapshot_cache.pop(wallet_address, None)
+        self._last_fetch_times.pop(wallet_address, None)
+        for key in [k for k in self._last_position_fp if k[0] == wallet_address]:
+            del self._last_position_fp[key]
 
         # Unsubscribe from WebSocket
         await self.ws_manager.unsubscribe("wallet_positions", wallet_address)
@@ -100,138 +149,199 @@ class LiquidationMonitor:
 
         logger.info(f"Stopped monitoring wallet: {wallet_address}")
 
-    async def _subscribe_wallet_websockets(self, wallet_address: str):
-        """Subscribe to WebSocket channels for a wallet"""
+    async def _subscribe_wallet_websockets(self, wallet_addresses: List[str]):
+        """Subscribe to WebSocket channels for one or more wallets"""
+        if not wallet_addresses:
+            return
+
+        # Subscribe to each channel type for all wallets in one pass
+        await self.ws_manager.subscribe_wallets_positions({
+            wallet_address: self._position_update_callback(wallet_address)
+            for wallet_address in wallet_addresses
+        })
 
-        # Position updates callback
-        async def position_update_callback(data: dict):
+        await self.ws_manager.subscribe_wallets_balances({
+            wallet_address: self._balance_update_callback(wallet_address)
+            for wallet_address in wallet_addresses
+        })
+
+        logger.info(f"Subscribed to WebSocket updates for {len(wallet_addresses)} wallet(s)")
+
+    def _position_update_callback(self, wallet_address: str):
+        """Build the position updates callback for a wallet"""
+        async def position_update_callback(data: List[dict]):
             await self._handle_position_update(wallet_address, data)
 
-        # Balance updates callback
-        async def balance_update_callback(data: dict):
+        return position_update_callback
+
+    def _balance_update_callback(self, wallet_address: str):
+        """Build the balance updates callback for a wallet"""
+        async def balance_update_callback(data: List[dict]):
             await self._handle_balance_update(wallet_address, data)
 
-        # Subscribe to channels
-        await self.ws_manager.subscribe_wallet_positions(
-            wallet_address,
-            position_update_callback
-        )
+        return balance_update_callback
 
-        await self.ws_manager.subscribe_wallet_balances(
-            wallet_address,
-            balance_update_callback
-        )
+    async def _get_wallet(self, wallet_address: str) -> Optional[Wallet]:
+        """Get wallet record, served from cache for monitored wallets"""
+        wallet = self._wallet_cache.get(wallet_address)
+        if wallet is None:
+            wallet = await asyncio.to_thread(self.user_manager.get_wallet_by_address, wallet_address)
+        return wallet
 
-        logger.info(f"Subscribed to WebSocket updates for {wallet_address}")
+    def _ensure_scheduler(self):
+        """Start the shared periodic update task if it is not running"""
+        if self._scheduler_task is None or self._scheduler_task.done():
+            self._scheduler_task = asyncio.create_task(self._periodic_update_task())
 
-    async def _periodic_update_task(self, wallet_address: str):
-        """Periodic update task (fallback if WebSocket fails)"""
+    async def _periodic_update_task(self):
+        """Periodic update task for all wallets (fallback if WebSocket fails)"""
         try:
             while True:
-                await asyncio.sleep(60)  # Update every minute
-                await self._fetch_wallet_data(wallet_address)
+                await asyncio.sleep(POSITION_UPDATE_INTERVAL)
+                await self._tick()
         except asyncio.CancelledError:
-            logger.info(f"Periodic update task cancelled for {wallet_address}")
+            logger.info("Periodic update task cancelled")
             raise
 
+    async def _tick(self):
+        """Refresh every monitored wallet"""
+        await self._refresh_wallets(list(self.monitored_wallets))
+
+    async def _refresh_wallets(self, wallets: List[str]):
+        """Fetch data for the given wallets with bounded concurrency"""
+        if not wallets:
+            return
+
+        semaphore = asyncio.Semaphore(MONITOR_MAX_CONCURRENCY)
+
+        async def fetch_one(wallet_address: str):
+            async with semaphore:
+                await self._fetch_wallet_data(wallet_address)
+
+        async with asyncio.TaskGroup() as task_group:
+            for wallet_address in wallets:
+                task_group.create_task(fetch_one(wallet_address))
+
     async def _fetch_wallet_data(self, wallet_address: str):
         """Fetch wallet data from REST API"""
         try:
-            logger.warning(f"Fetching data for wallet {wallet_address}")
+            logger.debug("Fetching data for wallet %s", wallet_address)
 
             # Get wallet from database
-            wallet = self.user_manager.get_wallet_by_address(wallet_address)
+            wallet = await self._get_wallet(wallet_address)
             if not wallet:
                 logger.warning(f"Wallet not found in database: {wallet_address}")
                 return
 
-            # Fetch accounts
-            accounts = await self.reya_client.get_wallet_accounts(wallet_address)
-            logger.warning(f"Found {len(accounts) if accounts else 0} accounts")
-
-            # Fetch positions
-            positions_data = await self.reya_client.get_wallet_positions(wallet_address)
-            logger.warning(f"Found {len(positions_data) if positions_data else 0} positions")
-
-            # Fetch balances
-            balance_data = await self.reya_client.get_wallet_balances(wallet_address)
-            logger.warning(f"Balance data: {balance_data}")
+            # Fetch accounts, positions and balances concurrently
+            snapshot = await self.reya_client.get_portfolio_snapshot(wallet_address)
+            accounts = snapshot['accounts']
+            positions_data = snapshot['positions']
+            balance_data = snapshot['balances']
+
+            logger.debug(
+                "Fetched %d accounts, %d positions for %s",
+                len(accounts) if accounts else 0,
+                len(positions_data) if positions_data else 0,
+                wallet_address
+            )
 
             # Sync positions - delete closed positions not in API response
-            current_symbols = [pos.get('symbol') for pos in positions_data] if positions_data else []
-            deleted = self.db.sync_wallet_positions(wallet.id, current_symbols)
-            if deleted > 0:
-                logger.warning(f"Removed {deleted} closed positions from database")
+            # (skipped when the positions fetch failed, so an outage never reads as all positions closed)
+            if positions_data is not None:
+                current_symbols = [pos.get('symbol') for pos in positions_data]
+                deleted = await asyncio.to_thread(self.db.sync_wallet_positions, wallet.id, current_symbols)
+                if deleted > 0:
+                    logger.info(f"Removed {deleted} closed positions from database")
 
             # Process data
             if balance_data:
                 await self._process_balance_data(wallet_address, balance_data)
 
             if positions_data:
-                for position_data in positions_data:
-                    await self._process_position_data(wallet_address, position_data)
+                await self._process_positions_data(wallet, positions_data)
 
             # Check risks and send alerts
             await self._check_and_alert(wallet_address)
 
-        except Exception as e:
-            logger.error(f"Error fetching wallet data for {wallet_address}: {e}", exc_info=True)
+            self._last_fetch_times[wallet_address] = time.monotonic()
 
-    async def _process_position_data(self, wallet_address: str, position_data: dict):
-        """Process position data and update database"""
-        try:
-            wallet = self.user_manager.get_wallet_by_address(wallet_address)
-            if not wallet:
-                logger.warning(f"Wallet not found in database: {wallet_address}")
-                return
+        except Exception as e:
+            logger.error(f"Error fetching wallet data for {wallet_address}: {type(e).__name__}: {e}")
+            logger.debug("Traceback:", exc_info=True)
+
+        finally:
+            # Stored state may have changed, so the next snapshot must be re-read
+            self._snapshot_cache.pop(wallet_address, None)
+
+    @staticmethod
+    def _position_from_data(wallet_id: int, position_data: dict) -> Position:
+        """Build a Position from Reya position data"""
+        logger.debug("Processing position data: %s", position_data)
+
+        # Map Reya's side format: 'B' (Buy) = LONG, 'S' (Sell) = SHORT
+        raw_side = position_data.get('side', 'B')
+        side = 'LONG' if raw_side == 'B' else 'SHORT'
+
+        # Reya API uses 'avgEntryPrice'
+        entry_price = float(position_data.get('avgEntryPrice', 0))
+
+        logger.debug("Mapped side: %s -> %s, entry_price: %s", raw_side, side, entry_price)
+
+        return Position(
+            wallet_id=wallet_id,
+            symbol=position_data.get('symbol', ''),
+            qty=float(position_data.get('qty', 0)),
+            side=side,
+            entry_price=entry_price,
+            mark_price=float(position_data.get('mark_price', 0)) if position_data.get('mark_price') else None,
+            unrealized_pnl=float(position_data.get('unrealized_pnl', 0)) if position_data.get('unrealized_pnl') else None
+        )
 
-            logger.warning(f"Processing position data: {position_data}")
+    async def _process_positions_data(self, wallet: Wallet, positions_data: List[dict]) -> bool:
+        """Store a wallet's positions in one transaction; returns whether the write succeeded"""
+        positions = []
+        for position_data in positions_data:
+            try:
+                positions.append(self._position_from_data(wallet.id, position_data))
+            except Exception as e:
+                logger.error(f"Error processing position data: {type(e).__name__}: {e}")
+                logger.debug("Traceback:", exc_info=True)
 
-            # Map Reya's side format: 'B' (Buy) = LONG, 'S' (Sell) = SHORT
-            raw_side = position_data.get('side', 'B')
-            side = 'LONG' if raw_side == 'B' else 'SHORT'
+        try:
+            await asyncio.to_thread(self.db.upsert_positions, positions)
+        except Exception as e:
+            logger.error(f"Error saving positions for {wallet.wallet_address}: {type(e).__name__}: {e}")
+            logger.debug("Traceback:", exc_info=True)
+            return False
 
-            # Reya API uses 'avgEntryPrice'
-            entry_price = float(position_data.get('avgEntryPrice', 0))
+        # Raw API data overwrote the risk columns; force the next rewrite
+        for position in positions:
+            self._stored_position_fp.pop((wallet.id, position.symbol), None)
+        return True
 
-            logger.warning(f"Mapped side: {raw_side} -> {side}, entry_price: {entry_price}")
+    async def _process_balance_data(self, wallet_address: str, balance_data: List[dict]):
+        """Process balance data and update database"""
+        try:
+            logger.debug("Processing balance data: %s", balance_data)
 
-            position = Position(
-                wallet_id=wallet.id,
-                symbol=position_data.get('symbol', ''),
-                qty=float(position_data.get('qty', 0)),
-                side=side,
-                entry_price=entry_price,
-                mark_price=float(position_data.get('mark_price', 0)) if position_data.get('mark_price') else None,
-                unrealized_pnl=float(position_data.get('unrealized_pnl', 0)) if position_data.get('unrealized_pnl') else None
-            )
+            # Reya returns list of account balances
+            total_balance = parse_total_balance(balance_data)
+            logger.debug("Calculated total balance: $%s", total_balance)
 
-            self.db.upsert_position(position)
-            logger.warning(f"Updated position: {position.symbol} {position.side} @ ${position.entry_price}")
+            await self._save_total_balance(wallet_address, total_balance)
 
         except Exception as e:
-            logger.error(f"Error processing position data: {e}", exc_info=True)
+            logger.error(f"Error processing balance data: {type(e).__name__}: {e}")
+            logger.debug("Traceback:", exc_info=True)
 
-    async def _process_balance_data(self, wallet_address: str, balance_data):
-        """Process balance data and update database"""
+    async def _save_total_balance(self, wallet_address: str, total_balance: float) -> bool:
+        """Store a wallet's total balance in the database; returns whether it was stored"""
         try:
-            wallet = self.user_manager.get_wallet_by_address(wallet_address)
+            wallet = await self._get_wallet(wallet_address)
             if not wallet:
                 logger.warning(f"Wallet not found in database: {wallet_address}")
-                return
-
-            logger.warning(f"Processing balance data: {balance_data}")
-
-            # Reya returns list of account balances
-            total_balance = 0.0
-
-            if isinstance(balance_data, list):
-                for account_balance in balance_data:
-                    if 'realBalance' in account_balance:
-                        total_balance += float(account_balance['realBalance'])
-                logger.warning(f"Calculated total balance: ${total_balance}")
-            elif isinstance(balance_data, dict):
-                total_balance = float(balance_data.get('realBalance', 0))
+                return False
 
             balance = AccountBalance(
                 wallet_id=wallet.id,
@@ -241,50 +351,90 @@ class LiquidationMonitor:
                 unrealized_pnl=0.0
             )
 
-            self.db.upsert_account_balance(balance)
-            logger.warning(f"Saved balance: total=${balance.total_margin:.2f}, available=${balance.available_margin:.2f}")
+            await asyncio.to_thread(self.db.upsert_account_balance, balance)
+            logger.debug("Saved balance: total=$%.2f, available=$%.2f", balance.total_margin, balance.available_margin)
+            return True
 
         except Exception as e:
-            logger.error(f"Error processing balance data: {e}", exc_info=True)
+            logger.error(f"Error saving balance: {e}", exc_info=True)
+            return False
 
-    async def _handle_position_update(self, wallet_address: str, data: dict):
-        """Handle real-time position update from WebSocket"""
+    async def _handle_position_update(self, wallet_address: str, data: List[dict]):
+        """Handle real-time position update from WebSocket (a list of positions)"""
         logger.info(f"Position update received for {wallet_address}")
 
+        # Keep only positions whose values changed since the previous update
+        changed = []
+        fingerprints = {}
+        for position_data in data:
+            symbol = position_data.get('symbol')
+            if not symbol:
+                continue
+            fingerprint = tuple(position_data.get(k) for k in POSITION_KEYS)
+            key = (wallet_address, symbol)
+            if self._last_position_fp.get(key) != fingerprint:
+                fingerprints[key] = fingerprint
+                changed.append(position_data)
+
+        if not changed:
+            logger.debug("Unchanged position update for %s, skipping", wallet_address)
+            return
+
         # Process the update
-        await self._process_position_data(wallet_address, data)
+        wallet = await self._get_wallet(wallet_address)
+        if not wallet:
+            logger.warning(f"Wallet not found in database: {wallet_address}")
+            return
+
+        # Remember the values only once stored, so a failed write is retried on the next push
+        if await self._process_positions_data(wallet, changed):
+            self._last_position_fp.update(fingerprints)
 
         # Check risks and send alerts
-        await self._check_and_alert(wallet_address)
+        await self._check_and_alert(wallet_address, full_refresh=False)
 
-    async def _handle_balance_update(self, wallet_address: str, data: dict):
+    async def _handle_balance_update(self, wallet_address: str, data: List[dict]):
         """Handle real-time balance update from WebSocket"""
         logger.info(f"Balance update received for {wallet_address}")
 
-        # Process the update
-        await self._process_balance_data(wallet_address, data)
+        # Parse once; skip updates that carry the same total as the previous one
+        total_balance = parse_total_balance(data)
+        if self._last_balance_fp.get(wallet_address) == total_balance:
+            logger.debug("Unchanged balance update for %s, skipping", wallet_address)
+            return
+
+        # Process the update; the total is remembered only once stored, so a failed write is retried
+        if await self._save_total_balance(wallet_address, total_balance):
+            self._last_balance_fp[wallet_address] = total_balance
 
         # Check risks and send alerts
-        await self._check_and_alert(wallet_address)
+        await self._check_and_alert(wallet_address, full_refresh=False)
+
+    async def _check_and_alert(self, wallet_address: str, full_refresh: bool = True):
+        """
+        Check positions for liquidation risk and send alerts
 
-    async def _check_and_alert(self, wallet_address: str):
-        """Check positions for liquidation risk and send alerts"""
+        Args:
+            wallet_address: Ethereum wallet address
+            full_refresh: Recalculate and store per-position risk even when
+                no alert threshold is reached (the periodic REST refresh).
+                WebSocket updates pass False so healthy wallets return early.
+        """
         try:
             # Get wallet from database
-            wallet = self.user_manager.get_wallet_by_address(wallet_address)
+            wallet = await self._get_wallet(wallet_address)
             if not wallet:
                 return
 
             # Get positions and balance
-            positions = self.db.get_wallet_positions(wallet.id)
-            balance = self.db.get_account_balance(wallet.id)
+            positions, balance = await asyncio.to_thread(self.db.get_wallet_state, wallet.id)
 
             if not balance:
-                logger.debug(f"No balance data for {wallet_address}")
+                logger.debug("No balance data for %s", wallet_address)
                 return
 
             if not positions:
-                logger.debug(f"No positions for {wallet_address}")
+                logger.debug("No positions for %s", wallet_address)
                 return
 
             # Calculate used margin from positions
@@ -299,35 +449,44 @@ class LiquidationMonitor:
             balance.available_margin = balance.total_margin - balance.used_margin
 
             # Save updated balance
-            self.db.upsert_account_balance(balance)
+            await asyncio.to_thread(self.db.upsert_account_balance, balance)
 
             logger.warning(f"📊 MARGIN CHECK - Total: ${balance.total_margin:.2f}, Used: ${balance.used_margin:.2f}, Ratio: {balance.margin_ratio:.2f}%")
 
             # Get threshold settings
-            threshold = self.user_manager.get_wallet_threshold(wallet.id)
+            threshold = await asyncio.to_thread(self.user_manager.get_wallet_threshold, wallet.id)
             logger.warning(f"🔔 THRESHOLDS - Warning: {threshold.threshold_warning}%, Critical: {threshold.threshold_critical}%, Urgent: {threshold.threshold_urgent}%")
 
-            # Check each position
+            # Alert level depends only on the wallet margin ratio
+            margin_ratio = balance.margin_ratio
+            alert_level = threshold.get_alert_level(margin_ratio)
+            if alert_level is None and not full_refresh:
+                logger.debug("Margin ratio below thresholds for %s, skipping position checks", wallet_address)
+                return
+
+            # Skip positions with invalid data
+            valid_positions = []
             for position in positions:
-                # Skip positions with invalid data
                 if not position.entry_price or position.entry_price == 0:
                     logger.warning(f"Skipping position {position.symbol} - invalid entry price")
                     continue
+                valid_positions.append(position)
 
-                try:
-                    # Calculate risk metrics
-                    risk_metrics = self.risk_calculator.calculate_risk_metrics(
-                        position,
-                        balance
-                    )
-
-                    # Update position in database with calculated values
-                    self.db.upsert_position(risk_metrics.position)
+            # Calculate risk metrics for all positions against the shared balance
+            all_risk_metrics = self.risk_calculator.calculate_risk_metrics_batch(
+                valid_positions,
+                balance
+            )
 
-                    # Determine alert level
-                    alert_level = threshold.get_alert_level(balance.margin_ratio)
+            # Check each position
+            updated_positions = []
+            for risk_metrics in all_risk_metrics:
+                position = risk_metrics.position
+                try:
+                    # Queue position for a single bulk write with calculated values
+                    updated_positions.append(position)
 
-                    logger.warning(f"🎯 Alert check for {position.symbol}: margin_ratio={balance.margin_ratio:.2f}%, alert_level={alert_level}")
+                    logger.warning(f"🎯 Alert check for {position.symbol}: margin_ratio={margin_ratio:.2f}%, alert_level={alert_level}")
 
                     if alert_level:
                         logger.warning(f"🚨 ALERT TRIGGERED! Level: {alert_level.value}, Position: {position.symbol}")
@@ -345,7 +504,7 @@ class LiquidationMonitor:
                             alert_recommendations = self.risk_calculator.generate_recommendations(
                                 position,
                                 balance,
-                                balance.margin_ratio,
+                                margin_ratio,
                                 alert_triggered=True,
                                 threshold_warning=threshold.threshold_warning
                             )
@@ -363,11 +522,31 @@ class LiquidationMonitor:
                         else:
                             logger.warning(f"⏭️ Alert skipped (too soon) for {position.symbol}")
                 except Exception as e:
-                    logger.error(f"Error calculating risk for position {position.symbol}: {e}", exc_info=True)
+                    logger.error(f"Error checking alert for position {position.symbol}: {type(e).__name__}: {e}")
+                    logger.debug("Traceback:", exc_info=True)
                     continue
 
+            # Update positions in database with calculated values,
+            # skipping positions identical to what was last written
+            changed_positions = []
+            fingerprints = {}
+            for position in updated_positions:
+                key = (position.wallet_id, position.symbol)
+                fingerprint = (
+                    position.qty, position.side, position.entry_price, position.mark_price,
+                    position.liquidation_price, position.margin_ratio, position.unrealized_pnl
+                )
+                if self._stored_position_fp.get(key) != fingerprint:
+                    fingerprints[key] = fingerprint
+                    changed_positions.append(position)
+
+            if changed_positions:
+                await asyncio.to_thread(self.db.upsert_positions, changed_positions)
+                self._stored_position_fp.update(fingerprints)
+
         except Exception as e:
-            logger.error(f"Error checking alerts for {wallet_address}: {e}", exc_info=True)
+            logger.error(f"Error checking alerts for {wallet_address}: {type(e).__name__}: {e}")
+            logger.debug("Traceback:", exc_info=True)
 
     def _should_send_alert(
         self,
@@ -386,16 +565,12 @@ class LiquidationMonitor:
             min_interval = ALERT_FREQUENCY_WARNING
 
         # Check last alert time
-        if wallet_address not in self.last_alert_times:
-            self.last_alert_times[wallet_address] = {}
-
-        key = f"{position_symbol}:{alert_level.value}"
-        last_time = self.last_alert_times[wallet_address].get(key)
+        key = (wallet_address, position_symbol, alert_level.value)
+        last_time = self.last_alert_times.get(key)
 
-        if last_time:
-            time_elapsed = (datetime.utcnow() - last_time).total_seconds()
-            if time_elapsed < min_interval:
-                logger.debug(f"Skipping alert (too soon): {wallet_address} - {key}")
+        if last_time is not None:
+            if time.monotonic() - last_time < min_interval:
+                logger.debug("Skipping alert (too soon): %s - %s", wallet_address, key)
                 return False
 
         return True
@@ -410,7 +585,7 @@ class LiquidationMonitor:
         """Send alert to user via Telegram"""
         try:
             # Get user
-            user = self.user_manager.get_user_by_wallet(wallet.wallet_address)
+            user = await asyncio.to_thread(self.user_manager.get_user_by_wallet, wallet.wallet_address)
             if not user:
                 logger.error(f"User not found for wallet {wallet.wallet_address}")
                 return
@@ -418,7 +593,6 @@ class LiquidationMonitor:
             # Format alert message with alert level
             message = format_liquidation_alert(risk_metrics, wallet.wallet_address, alert_level.value)
 
-            # Create alert record
             alert = Alert(
                 wallet_id=wallet.id,
                 alert_type="liquidation_risk",
@@ -428,66 +602,162 @@ class LiquidationMonitor:
                 margin_ratio=risk_metrics.account_balance.margin_ratio,
                 liquidation_price=risk_metrics.liquidation_price
             )
-            alert = self.db.create_alert(alert)
-
-            # Send via Telegram
-            if self.telegram_bot:
-                await self.telegram_bot.send_alert(
-                    user.telegram_id,
-                    message,
-                    add_buttons=True
-                )
-                self.db.mark_alert_sent(alert.id)
-
-                # Update last alert time
-                if wallet.wallet_address not in self.last_alert_times:
-                    self.last_alert_times[wallet.wallet_address] = {}
 
-                key = f"{risk_metrics.position.symbol}:{alert_level.value}"
-                self.last_alert_times[wallet.wallet_address][key] = datetime.utcnow()
+            # Create alert record (unsent until Telegram accepts the message)
+            alert = await asyncio.to_thread(self.db.create_alert, alert)
 
-                logger.info(
-                    f"Alert sent: {user.telegram_id} - "
-                    f"{wallet.wallet_address} - {alert_level.value}"
-                )
-            else:
+            if not self.telegram_bot:
                 logger.warning("Telegram bot not set, cannot send alert")
+                return
+
+            # Send via Telegram; send_alert only queues the message, so the record
+            # is marked sent by the sender once delivery succeeds
+            await self.telegram_bot.send_alert(
+                user.telegram_id,
+                message,
+                add_buttons=True,
+                alert_id=alert.id
+            )
+
+            # Update last alert time
+            key = (wallet.wallet_address, risk_metrics.position.symbol, alert_level.value)
+            self.last_alert_times[key] = time.monotonic()
+
+            logger.info(
+                f"Alert queued: {user.telegram_id} - "
+                f"{wallet.wallet_address} - {alert_level.value}"
+            )
 
         except Exception as e:
-            logger.error(f"Error sending alert: {e}", exc_info=True)
+            logger.error(f"Error sending alert: {type(e).__name__}: {e}")
+            logger.debug("Traceback:", exc_info=True)
+
+    @staticmethod
+    def _status_label(margin_ratio: float) -> str:
+        """Map a margin ratio to the status label shown to users"""
+        if margin_ratio >= 95:
+            return "🚨 CRITICAL"
+        elif margin_ratio >= 90:
+            return "🔴 HIGH RISK"
+        elif margin_ratio >= 80:
+            return "🟡 WARNING"
+        return "✅ HEALTHY"
+
+    async def get_wallet_snapshot(self, wallet_address: str) -> Optional[WalletSnapshot]:
+        """
+        Get stored positions and balance of a wallet in one read
+
+        Snapshots are reused for WALLET_SNAPSHOT_TTL seconds, and concurrent
+        callers for the same wallet wait on a single load.
+
+        Args:
+            wallet_address: Wallet address
+
+        Returns: Wallet snapshot, or None if the wallet is unknown
+        """
+        cached = self._snapshot_cache.get(wallet_address)
+        if cached and time.monotonic() - cached[0] < WALLET_SNAPSHOT_TTL:
+            return cached[1]
+
+        load = self._snapshot_loads.get(wallet_address)
+        if load is None:
+            load = asyncio.create_task(self._load_wallet_snapshot(wallet_address))
+            self._snapshot_loads[wallet_address] = load
+            load.add_done_callback(lambda _: self._snapshot_loads.pop(wallet_address, None))
+
+        # Shielded so a cancelled caller doesn't cancel the load for the others
+        return await asyncio.shield(load)
+
+    async def _load_wallet_snapshot(self, wallet_address: str) -> Optional[WalletSnapshot]:
+        """Read a wallet's positions and balance from the database and cache the snapshot"""
+        wallet = await self._get_wallet(wallet_address)
+        if not wallet:
+            return None
+
+        positions, balance = await asyncio.to_thread(self.db.get_wallet_state, wallet.id)
+        return self._cache_snapshot(wallet_address, positions, balance)
+
+    async def load_wallet_snapshots(self, wallet_addresses: List[str]):
+        """
+        Read snapshots for several wallets with one batched database query
+
+        Wallets with a fresh cached snapshot (or a load in flight) are skipped;
+        the rest are cached for the get_wallet_snapshot calls that follow. On a
+        database error nothing is cached and those calls load wallets one by one.
+
+        Args:
+            wallet_addresses: Wallet addresses
+        """
+        now = time.monotonic()
+        wallets = {}
+        for wallet_address in dict.fromkeys(wallet_addresses):
+            cached = self._snapshot_cache.get(wallet_address)
+            if (cached and now - cached[0] < WALLET_SNAPSHOT_TTL) or wallet_address in self._snapshot_loads:
+                continue
+            wallet = await self._get_wallet(wallet_address)
+            if wallet:
+                wallets[wallet_address] = wallet
+
+        # A single wallet is loaded on demand just the same
+        if len(wallets) < 2:
+            return
+
+        try:
+            states = await asyncio.to_thread(self.db.get_wallet_states, [wallet.id for wallet in wallets.values()])
+        except Exception as e:
+            logger.error(f"Error loading wallet snapshots: {e}")
+            return
+
+        for wallet_address, wallet in wallets.items():
+            self._cache_snapshot(wallet_address, *states[wallet.id])
+
+    def _cache_snapshot(
+        self,
+        wallet_address: str,
+        positions: List[Position],
+        balance: Optional[AccountBalance]
+    ) -> WalletSnapshot:
+        """Build a wallet snapshot from stored positions and balance and cache it"""
+        if balance:
+            margin_ratio = balance.margin_ratio
+            status = self._status_label(margin_ratio)
+        else:
+            margin_ratio = 0.0
+            status = "No data"
+
+        snapshot = WalletSnapshot(
+            positions=positions,
+            balance=balance,
+            margin_ratio=margin_ratio,
+            position_count=len(positions),
+            status=status
+        )
+        # Re-insert so the dict stays ordered oldest first, then trim to size
+        self._snapshot_cache.pop(wallet_address, None)
+        self._snapshot_cache[wallet_address] = (time.monotonic(), snapshot)
+        if len(self._snapshot_cache) > WALLET_SNAPSHOT_CACHE_SIZE:
+            del self._snapshot_cache[next(iter(self._snapshot_cache))]
+        return snapshot
 
     async def get_wallet_status(self, wallet_address: str) -> Optional[Dict[str, Any]]:
         """Get current status of a wallet"""
         try:
-            wallet = self.user_manager.get_wallet_by_address(wallet_address)
-            if not wallet:
+            snapshot = await self.get_wallet_snapshot(wallet_address)
+            if not snapshot:
                 return None
 
-            positions = self.db.get_wallet_positions(wallet.id)
-            balance = self.db.get_account_balance(wallet.id)
-
+            balance = snapshot.balance
             if not balance:
                 return {
                     "position_count": 0,
                     "margin_ratio": 0.0,
-                    "status": "No data"
+                    "status": snapshot.status
                 }
 
-            # Determine status
-            margin_ratio = balance.margin_ratio
-            if margin_ratio >= 95:
-                status = "🚨 CRITICAL"
-            elif margin_ratio >= 90:
-                status = "🔴 HIGH RISK"
-            elif margin_ratio >= 80:
-                status = "🟡 WARNING"
-            else:
-                status = "✅ HEALTHY"
-
             return {
-                "position_count": len(positions),
-                "margin_ratio": margin_ratio,
-                "status": status,
+                "position_count": snapshot.position_count,
+                "margin_ratio": snapshot.margin_ratio,
+                "status": snapshot.status,
                 "total_margin": balance.total_margin,
                 "used_margin": balance.used_margin,
                 "available_margin": balance.available_margin
@@ -497,27 +767,37 @@ class LiquidationMonitor:
             logger.error(f"Error getting wallet status: {e}", exc_info=True)
             return None
 
-    async def get_portfolio_summary(self, wallet_address: str) -> Optional[Dict[str, Any]]:
-        """Get portfolio summary for a wallet"""
-        try:
-            wallet = self.user_manager.get_wallet_by_address(wallet_address)
-            if not wallet:
-                return None
+    async def get_portfolio_summary(
+        self,
+        wallet_address: str,
+        refresh: bool = False
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Get portfolio summary for a wallet
+
+        Args:
+            wallet_address: Wallet address
+            refresh: Fetch fresh data from the API first, unless the wallet
+                was refreshed within WALLET_REFRESH_TTL seconds
 
-            positions = self.db.get_wallet_positions(wallet.id)
-            balance = self.db.get_account_balance(wallet.id)
+        Returns: Dict with 'positions' and portfolio 'balance' metrics, or None
+        """
+        try:
+            if refresh:
+                await self._refresh_if_stale(wallet_address)
 
-            if not balance:
+            snapshot = await self.get_wallet_snapshot(wallet_address)
+            if not snapshot or not snapshot.balance:
                 return None
 
             # Calculate portfolio metrics
             portfolio_metrics = self.risk_calculator.assess_portfolio_risk(
-                positions,
-                balance
+                snapshot.positions,
+                snapshot.balance
             )
 
             return {
-                "positions": positions,
+                "positions": snapshot.positions,
                 "balance": portfolio_metrics
             }
 
@@ -525,26 +805,78 @@ class LiquidationMonitor:
             logger.error(f"Error getting portfolio summary: {e}", exc_info=True)
             return None
 
+    async def _refresh_if_stale(self, wallet_address: str):
+        """Fetch fresh data from the API unless the wallet was refreshed within WALLET_REFRESH_TTL seconds"""
+        last_fetch = self._last_fetch_times.get(wallet_address)
+        if last_fetch is None or time.monotonic() - last_fetch >= WALLET_REFRESH_TTL:
+            await self._fetch_wallet_data(wallet_address)
+
+    async def get_portfolio_summaries(
+        self,
+        wallet_addresses: List[str],
+        refresh: bool = False
+    ) -> List[Optional[Dict[str, Any]]]:
+        """
+        Get portfolio summaries for several wallets at once
+
+        The Reya API has no multi-wallet endpoint, so wallets are fetched concurrently
+        over the shared API client's pooled connections; the stored results are then
+        read back with one batched query.
+
+        Args:
+            wallet_addresses: Wallet addresses
+            refresh: Passed through to get_portfolio_summary
+
+        Returns: Summary (or None) per wallet address, in the same order
+        """
+        if refresh:
+            await asyncio.gather(
+                *(self._refresh_if_stale(address) for address in wallet_addresses),
+                return_exceptions=True
+            )
+        await self.load_wallet_snapshots(wallet_addresses)
+
+        return list(await asyncio.gather(
+            *(self.get_portfolio_summary(address) for address in wallet_addresses)
+        ))
+
     async def start_all_monitoring(self):
         """Start monitoring all active wallets"""
-        wallets = self.user_manager.get_all_monitored_wallets()
+        wallets = await asyncio.to_thread(self.user_manager.get_all_monitored_wallets)
 
         logger.info(f"Starting monitoring for {len(wallets)} wallets")
 
+        wallet_addresses = []
         for wallet in wallets:
-            try:
-                await self.start_monitoring_wallet(wallet.wallet_address)
-            except Exception as e:
-                logger.error(
-                    f"Error starting monitoring for {wallet.wallet_address}: {e}",
-                    exc_info=True
-                )
+            wallet_address = wallet.wallet_address.lower()
+            if wallet_address in self.monitored_wallets or wallet_address in wallet_addresses:
+                continue
+            self._wallet_cache[wallet_address] = wallet
+            wallet_addresses.append(wallet_address)
+
+        # Subscribe all wallets at once, then fetch initial data concurrently
+        try:
+            await self._subscribe_wallet_websockets(wallet_addresses)
+        except Exception as e:
+            logger.error(f"Error subscribing wallets to WebSocket updates: {e}", exc_info=True)
+
+        self.monitored_wallets.update(wallet_addresses)
+        await self._refresh_wallets(wallet_addresses)
+        self._ensure_scheduler()
 
         logger.info("All wallet monitoring started")
 
     async def stop_all_monitoring(self):
         """Stop monitoring all wallets"""
-        wallets = list(self.monitoring_tasks.keys())
+        if self._scheduler_task:
+            self._scheduler_task.cancel()
+            try:
+                await self._scheduler_task
+            except asyncio.CancelledError:
+                pass
+            self._scheduler_task = None
+
+        wallets = list(self.monitored_wallets)
 
         for wallet_address in wallets:
             try:
@@ -4,36 +4,88 @@ Handles all HTTP requests to Reya.xyz API
 """
 import aiohttp
 import asyncio
+import json
 import logging
-from typing import Optional, Dict, Any, List
+import random
+import time
+from functools import lru_cache
+from typing import Optional, Dict, Any, List, Tuple, Callable, Awaitable
 from datetime import datetime
-
-from config.settings import REYA_API_URL, API_RATE_LIMIT, API_REQUEST_SPACING
+from yarl import URL
+
+try:
+    # orjson decodes the larger list responses (positions, funding history) much faster
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
+
+from config.settings import (
+    REYA_API_URL,
+    API_RATE_LIMIT,
+    API_REQUEST_BURST,
+    API_RETRY_MAX_DELAY,
+    API_RATE_LIMIT_DEFAULT_WAIT,
+    API_MAX_CONNECTIONS,
+    API_MAX_CONNECTIONS_PER_HOST,
+    API_DNS_CACHE_TTL,
+    API_KEEPALIVE_TIMEOUT,
+    API_REQUEST_TIMEOUT,
+    API_CONNECT_TIMEOUT,
+    API_READ_TIMEOUT,
+    MARKETS_CACHE_TTL,
+    MARKET_SUMMARY_CACHE_TTL,
+    FUNDING_HISTORY_CACHE_TTL
+)
+from utils.validators import normalize_balance_data
+from utils.rate_limiter import TokenBucket
 
 logger = logging.getLogger(__name__)
 
 
+@lru_cache(maxsize=1024)
+def _parse_url(url: str) -> URL:
+    """Parse a request URL once; polled endpoints repeat the same handful of URLs"""
+    return URL(url)
+
+
 class ReyaAPIClient:
     """Client for Reya.xyz REST API"""
 
     def __init__(self, api_url: str = REYA_API_URL):
         self.api_url = api_url.rstrip('/')
         self.session: Optional[aiohttp.ClientSession] = None
-        self.last_request_time = 0
-        self.request_spacing = API_REQUEST_SPACING
+        self.rate_limiter = TokenBucket(rate=API_RATE_LIMIT, capacity=API_REQUEST_BURST)
+        self.timeout = aiohttp.ClientTimeout(
+            total=API_REQUEST_TIMEOUT,
+            connect=API_CONNECT_TIMEOUT,
+            sock_read=API_READ_TIMEOUT
+        )
+        # Keeps concurrent (gathered) requests within the connector's per-host pool
+        self._request_semaphore = asyncio.Semaphore(API_MAX_CONNECTIONS_PER_HOST)
+        # Short-lived cache for quasi-static endpoints: key -> (fetched_at, response)
+        self._cache: Dict[str, Tuple[float, Any]] = {}
+        self._cache_locks: Dict[str, asyncio.Lock] = {}
+
+    def _create_connector(self) -> aiohttp.TCPConnector:
+        """Create a connection pool sized for a single API host"""
+        return aiohttp.TCPConnector(
+            limit=API_MAX_CONNECTIONS,
+            limit_per_host=API_MAX_CONNECTIONS_PER_HOST,
+            ttl_dns_cache=API_DNS_CACHE_TTL,
+            keepalive_timeout=API_KEEPALIVE_TIMEOUT,
+            enable_cleanup_closed=True
+        )
 
     async def _ensure_session(self):
-        """Ensure aiohttp session exists"""
+        """Ensure the shared keep-alive aiohttp session exists"""
         if self.session is None or self.session.closed:
-            self.session = aiohttp.ClientSession()
-
-    async def _rate_limit(self):
-        """Implement rate limiting"""
-        current_time = asyncio.get_event_loop().time()
-        time_since_last = current_time - self.last_request_time
-        if time_since_last < self.request_spacing:
-            await asyncio.sleep(self.request_spacing - time_since_last)
-        self.last_request_time = asyncio.get_event_loop().time()
+            # The connector needs a running loop, so it is created with the session
+            # and closed together with it
+            self.session = aiohttp.ClientSession(
+                connector=self._create_connector(),
+                timeout=self.timeout
+            )
 
     async def _make_request(
         self,
@@ -45,53 +97,86 @@ class ReyaAPIClient:
     ) -> Optional[Dict[str, Any]]:
         """Make HTTP request with retry logic"""
         await self._ensure_session()
-        await self._rate_limit()
+        await self.rate_limiter.acquire()
 
-        url = f"{self.api_url}{endpoint}"
+        url = _parse_url(f"{self.api_url}{endpoint}")
 
         for attempt in range(retry_count):
             try:
-                async with self.session.request(
+                async with self._request_semaphore, self.session.request(
                     method,
                     url,
                     params=params,
-                    json=json_data,
-                    timeout=aiohttp.ClientTimeout(total=30)
+                    json=json_data
                 ) as response:
                     if response.status == 200:
-                        data = await response.json()
-                        logger.debug(f"Request successful: {method} {endpoint}")
+                        # Decode the raw body directly, skipping the intermediate str copy
+                        data = _json_loads(await response.read())
+                        logger.debug("Request successful: %s %s", method, endpoint)
                         return data
                     elif response.status == 429:
-                        # Rate limited, wait and retry
-                        retry_after = int(response.headers.get('Retry-After', 5))
-                        logger.warning(f"Rate limited, waiting {retry_after}s")
-                        await asyncio.sleep(retry_after)
-                        continue
+                        # Rate limited, wait as long as the server asks and retry
+                        retry_delay = self._retry_after(response)
+                        logger.warning(f"Rate limited, waiting {retry_delay}s")
                     else:
                         logger.error(f"Request failed: {response.status} - {await response.text()}")
                         return None
 
             except asyncio.TimeoutError:
                 logger.error(f"Request timeout: {method} {endpoint}")
-                if attempt < retry_count - 1:
-                    await asyncio.sleep(2 ** attempt)  # Exponential backoff
-                    continue
-                return None
+                retry_delay = self._backoff_delay(attempt)
 
             except aiohttp.ClientError as e:
                 logger.error(f"Request error: {e}")
-                if attempt < retry_count - 1:
-                    await asyncio.sleep(2 ** attempt)
-                    continue
-                return None
+                retry_delay = self._backoff_delay(attempt)
 
             except Exception as e:
                 logger.error(f"Unexpected error in request: {e}", exc_info=True)
                 return None
 
+            # Sleep outside the request so the connection and semaphore slot are released
+            if attempt < retry_count - 1:
+                await asyncio.sleep(retry_delay)
+
         return None
 
+    @staticmethod
+    def _backoff_delay(attempt: int) -> float:
+        """Exponential backoff with full jitter, so failed requests don't retry in lockstep"""
+        return random.uniform(0, min(API_RETRY_MAX_DELAY, 2 ** attempt))
+
+    @staticmethod
+    def _retry_after(response: aiohttp.ClientResponse) -> float:
+        """Seconds to wait from a 429 response's Retry-After header (defaults if missing or not numeric)"""
+        try:
+            return float(response.headers.get('Retry-After', API_RATE_LIMIT_DEFAULT_WAIT))
+        except ValueError:
+            return API_RATE_LIMIT_DEFAULT_WAIT
+
+    async def _cached_get(self, key: str, ttl: float, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Return a cached response younger than ttl, otherwise fetch and cache it
+
+        Concurrent misses for the same key share one backend call. Empty or
+        failed responses are not cached. Cached values are shared between
+        callers and must not be mutated.
+        """
+        entry = self._cache.get(key)
+        if entry and time.monotonic() - entry[0] < ttl:
+            return entry[1]
+
+        lock = self._cache_locks.setdefault(key, asyncio.Lock())
+        async with lock:
+            # Another caller may have refreshed the entry while we waited
+            entry = self._cache.get(key)
+            if entry and time.monotonic() - entry[0] < ttl:
+                return entry[1]
+
+            value = await fetch()
+            if value:
+                self._cache[key] = (time.monotonic(), value)
+            return value
+
     async def get_wallet_accounts(self, wallet_address: str) -> Optional[List[Dict[str, Any]]]:
         """Get all account IDs for a wallet"""
         endpoint = f"/v2/wallet/{wallet_address}/accounts"
@@ -100,53 +185,66 @@ class ReyaAPIClient:
         if response:
             return response if isinstance(response, list) else [response]
 
-        logger.debug(f"No accounts found for {wallet_address}")
+        logger.debug("No accounts found for %s", wallet_address)
         return []
 
     async def get_wallet_positions(self, wallet_address: str) -> Optional[List[Dict[str, Any]]]:
-        """Get all positions for a wallet across all accounts"""
+        """
+        Get all positions for a wallet across all accounts
+
+        Returns: List of positions ([] when the wallet has none), or None if the request
+        failed or the response wasn't recognized, so callers don't mistake it for no positions
+        """
         endpoint = f"/v2/wallet/{wallet_address}/positions"
         response = await self._make_request('GET', endpoint)
 
-        if response:
-            if isinstance(response, list):
-                logger.debug(f"Fetched {len(response)} positions")
-                return response
-            elif isinstance(response, dict) and 'positions' in response:
-                logger.debug(f"Fetched {len(response['positions'])} positions")
-                return response['positions']
-            else:
-                return []
-
-        logger.debug(f"No positions found for {wallet_address}")
-        return []
+        if response is None:
+            logger.warning(f"Positions request failed for {wallet_address}")
+            return None
 
-    async def get_wallet_balances(self, wallet_address: str) -> Optional[Dict[str, Any]]:
-        """Get account balances for a wallet"""
+        if isinstance(response, list):
+            logger.debug("Fetched %s positions", len(response))
+            return response
+        elif isinstance(response, dict) and 'positions' in response:
+            logger.debug("Fetched %s positions", len(response['positions']))
+            return response['positions']
+
+        logger.warning(f"Unexpected positions response for {wallet_address}: {type(response).__name__}")
+        return None
+
+    async def get_wallet_balances(self, wallet_address: str) -> Optional[List[Dict[str, Any]]]:
+        """Get account balances for a wallet, normalized to a list of accounts"""
         endpoint = f"/v2/wallet/{wallet_address}/accountBalances"
         response = await self._make_request('GET', endpoint)
 
         if response:
-            return response
+            return normalize_balance_data(response)
 
-        logger.debug(f"No balances found for {wallet_address}")
+        logger.debug("No balances found for %s", wallet_address)
         return None
 
     async def get_markets(self) -> Optional[List[Dict[str, Any]]]:
-        """Get all available markets"""
+        """Get all available markets (cached for MARKETS_CACHE_TTL seconds)"""
+        return await self._cached_get("markets", MARKETS_CACHE_TTL, self._fetch_markets)
+
+    async def _fetch_markets(self) -> List[Dict[str, Any]]:
+        """Fetch the market list from the API"""
         endpoint = "/api/trading/markets"
         response = await self._make_request('GET', endpoint)
 
         if response and 'markets' in response:
-            logger.debug(f"Fetched {len(response['markets'])} markets")
+            logger.debug("Fetched %s markets", len(response['markets']))
             return response['markets']
         return []
 
     async def get_market_summary(self, symbol: str) -> Optional[Dict[str, Any]]:
-        """Get market summary including funding rate"""
+        """Get market summary including funding rate (cached for MARKET_SUMMARY_CACHE_TTL seconds)"""
         endpoint = f"/api/trading/market/{symbol}/summary"
-        response = await self._make_request('GET', endpoint)
-        return response
+        return await self._cached_get(
+            f"summary:{symbol}",
+            MARKET_SUMMARY_CACHE_TTL,
+            lambda: self._make_request('GET', endpoint)
+        )
 
     async def get_market_price(self, symbol: str) -> Optional[Dict[str, Any]]:
         """Get current market price"""
@@ -161,7 +259,15 @@ class ReyaAPIClient:
         return response
 
     async def get_funding_history(self, symbol: str, limit: int = 100) -> Optional[List[Dict[str, Any]]]:
-        """Get funding rate history"""
+        """Get funding rate history (cached for FUNDING_HISTORY_CACHE_TTL seconds)"""
+        return await self._cached_get(
+            f"funding:{symbol}:{limit}",
+            FUNDING_HISTORY_CACHE_TTL,
+            lambda: self._fetch_funding_history(symbol, limit)
+        )
+
+    async def _fetch_funding_history(self, symbol: str, limit: int) -> List[Dict[str, Any]]:
+        """Fetch funding rate history from the API"""
         endpoint = f"/api/trading/market/{symbol}/funding"
         params = {'limit': limit}
         response = await self._make_request('GET', endpoint, params=params)
@@ -170,12 +276,59 @@ class ReyaAPIClient:
             return response['funding_history']
         return []
 
+    async def get_many_market_prices(self, symbols: List[str]) -> Dict[str, Optional[Dict[str, Any]]]:
+        """
+        Get current market prices for several symbols concurrently
+
+        Args:
+            symbols: Market symbols to fetch
+
+        Returns: Dict of symbol -> price response (None if the request failed)
+        """
+        results = await asyncio.gather(
+            *(self.get_market_price(symbol) for symbol in symbols),
+            return_exceptions=True
+        )
+
+        prices = {}
+        for symbol, result in zip(symbols, results):
+            if isinstance(result, Exception):
+                logger.error(f"Error fetching price for {symbol}: {result}")
+                result = None
+            prices[symbol] = result
+        return prices
+
+    async def get_portfolio_snapshot(self, wallet_address: str) -> Dict[str, Optional[List[Dict[str, Any]]]]:
+        """
+        Get accounts, positions and balances for a wallet concurrently
+
+        Args:
+            wallet_address: Wallet address
+
+        Returns: Dict with 'accounts', 'positions' and 'balances' (None where a request raised)
+        """
+        keys = ('accounts', 'positions', 'balances')
+        results = await asyncio.gather(
+            self.get_wallet_accounts(wallet_address),
+            self.get_wallet_positions(wallet_address),
+            self.get_wallet_balances(wallet_address),
+            return_exceptions=True
+        )
+
+        snapshot = {}
+        for key, result in zip(keys, results):
+            if isinstance(result, Exception):
+                logger.error(f"Error fetching {key} for {wallet_address}: {result}")
+                result = None
+            snapshot[key] = result
+        return snapshot
+
     async def validate_wallet_address(self, wallet_address: str) -> bool:
         """Validate if a wallet address exists on Reya"""
         try:
             response = await self.get_wallet_balances(wallet_address)
             if response is not None:
-                logger.debug(f"Wallet {wallet_address} is valid")
+                logger.debug("Wallet %s is valid", wallet_address)
                 return True
             return False
 
@@ -209,3 +362,11 @@ def get_reya_client() -> ReyaAPIClient:
     if _reya_client is None:
         _reya_client = ReyaAPIClient()
     return _reya_client
+
+
+async def close_reya_client():
+    """Close the singleton Reya API client's session (it is recreated on next use)"""
+    global _reya_client
+    if _reya_client is not None:
+        await _reya_client.close()
+        _reya_client = None
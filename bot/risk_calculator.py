@@ -2,6 +2,8 @@
 Risk Calculator for liquidation price and risk metrics
 """
 import logging
+from collections import OrderedDict
+from functools import lru_cache
 from typing import Optional, List, Tuple
 from dataclasses import dataclass
 
@@ -10,6 +12,35 @@ from config.settings import MAINTENANCE_MARGIN_RATIO, VOLATILITY_CONSTANT
 
 logger = logging.getLogger(__name__)
 
+# Maximum number of memoized risk calculations kept per calculator
+RISK_CACHE_SIZE = 1024
+
+
+@lru_cache(maxsize=64)
+def _liquidation_factors(
+    leverage: Optional[float],
+    maintenance_margin_ratio: float
+) -> Tuple[float, float]:
+    """
+    Get the (long, short) multipliers applied to entry price for liquidation
+
+    Depends only on leverage and maintenance margin, so it is memoized across
+    positions and calculators. See RiskCalculator.calculate_liquidation_price
+    for the formulas.
+    """
+    if leverage:
+        # More precise calculation with leverage
+        return (
+            1 - (1 / leverage) + maintenance_margin_ratio,
+            1 + (1 / leverage) - maintenance_margin_ratio
+        )
+
+    # Simplified calculation
+    return (
+        1 - maintenance_margin_ratio,
+        1 + maintenance_margin_ratio
+    )
+
 
 class RiskCalculator:
     """Calculate liquidation risk and provide recommendations"""
@@ -22,6 +53,9 @@ class RiskCalculator:
         self.maintenance_margin_ratio = maintenance_margin_ratio
         self.volatility_constant = volatility_constant
 
+        # Memoized risk results keyed by the position/balance inputs they depend on
+        self._risk_cache: OrderedDict = OrderedDict()
+
     def calculate_liquidation_price(
         self,
         position: Position,
@@ -38,24 +72,37 @@ class RiskCalculator:
         - Long: liq_price = entry_price * (1 - 1/leverage + maintenance_margin_ratio)
         - Short: liq_price = entry_price * (1 + 1/leverage - maintenance_margin_ratio)
         """
-        entry_price = position.entry_price
-
-        if leverage:
-            # More precise calculation with leverage
-            if position.position_side == PositionSide.LONG:
-                liq_price = entry_price * (1 - (1 / leverage) + self.maintenance_margin_ratio)
-            else:  # SHORT
-                liq_price = entry_price * (1 + (1 / leverage) - self.maintenance_margin_ratio)
-        else:
-            # Simplified calculation
-            if position.position_side == PositionSide.LONG:
-                liq_price = entry_price * (1 - self.maintenance_margin_ratio)
-            else:  # SHORT
-                liq_price = entry_price * (1 + self.maintenance_margin_ratio)
+        long_factor, short_factor = self._liquidation_factors(leverage)
+        factor = long_factor if position.position_side is PositionSide.LONG else short_factor
+        liq_price = position.entry_price * factor
 
-        logger.debug(f"Liquidation price for {position.symbol} {position.side}: ${liq_price:.2f}")
+        logger.debug("Liquidation price for %s %s: $%.2f", position.symbol, position.side, liq_price)
         return liq_price
 
+    def calculate_liquidation_prices(
+        self,
+        positions: List[Position],
+        leverage: Optional[float] = None
+    ) -> List[float]:
+        """
+        Calculate liquidation prices for many positions at the same leverage
+
+        The long/short price multipliers are computed once for the whole batch.
+
+        Returns: List of liquidation prices, one per position
+        """
+        long_factor, short_factor = self._liquidation_factors(leverage)
+        return [
+            position.entry_price * (
+                long_factor if position.position_side is PositionSide.LONG else short_factor
+            )
+            for position in positions
+        ]
+
+    def _liquidation_factors(self, leverage: Optional[float]) -> Tuple[float, float]:
+        """Get the (long, short) liquidation multipliers for this calculator's maintenance margin"""
+        return _liquidation_factors(leverage, self.maintenance_margin_ratio)
+
     def calculate_distance_to_liquidation(
         self,
         current_price: float,
@@ -98,7 +145,7 @@ class RiskCalculator:
         distance = self.calculate_distance_to_liquidation(current_price, liquidation_price)
 
         # Determine if price is moving toward liquidation
-        if position_side == PositionSide.LONG:
+        if position_side is PositionSide.LONG:
             is_approaching = current_price > liquidation_price and (price_trend or 0) < 0
         else:  # SHORT
             is_approaching = current_price < liquidation_price and (price_trend or 0) > 0
@@ -115,7 +162,7 @@ class RiskCalculator:
         # Calculate hours
         hours = distance / hourly_change_rate
 
-        logger.debug(f"Estimated time to liquidation: {hours:.1f} hours")
+        logger.debug("Estimated time to liquidation: %.1f hours", hours)
         return hours
 
     def calculate_margin_impact(
@@ -128,11 +175,24 @@ class RiskCalculator:
 
         Returns: New margin ratio percentage
         """
-        new_total_margin = account_balance.total_margin + additional_margin
+        return self._margin_impact_raw(
+            account_balance.total_margin,
+            account_balance.used_margin,
+            additional_margin
+        )
+
+    @staticmethod
+    def _margin_impact_raw(
+        total_margin: float,
+        used_margin: float,
+        additional_margin: float
+    ) -> float:
+        """Margin ratio percentage after adding collateral, from raw margin values"""
+        new_total_margin = total_margin + additional_margin
         if new_total_margin == 0:
             return 0.0
 
-        new_margin_ratio = (account_balance.used_margin / new_total_margin) * 100
+        new_margin_ratio = (used_margin / new_total_margin) * 100
         return new_margin_ratio
 
     def calculate_position_reduction_impact(
@@ -200,11 +260,18 @@ class RiskCalculator:
             recommendations.append(f"✅ Position is healthy (Risk: {current_margin_ratio:.1f}%)")
             return recommendations
 
+        total_margin = account_balance.total_margin
+        used_margin = account_balance.used_margin
+
+        # Shared by options 1 and 2 (one division each instead of per use)
+        current_scale = 100 / current_margin_ratio
+        target_scale = 100 / target_ratio
+
         # Calculate required reduction
         risk_reduction_needed = current_margin_ratio - target_ratio
 
         # Option 1: Close percentage of position
-        close_percentage = (risk_reduction_needed / current_margin_ratio) * 100
+        close_percentage = risk_reduction_needed * current_scale
         close_percentage = min(100, max(10, close_percentage))  # Between 10-100%
 
         new_ratio_close = self.calculate_position_reduction_impact(
@@ -217,9 +284,7 @@ class RiskCalculator:
         )
 
         # Option 2: Add collateral
-        additional_margin_needed = account_balance.used_margin * (
-            (100 / target_ratio) - (100 / current_margin_ratio)
-        )
+        additional_margin_needed = used_margin * (target_scale - current_scale)
 
         if additional_margin_needed > 0:
             new_ratio_margin = self.calculate_margin_impact(
@@ -235,16 +300,9 @@ class RiskCalculator:
         moderate_close = min(50, close_percentage / 2)
         moderate_margin = additional_margin_needed / 2
 
-        new_ratio_combo = self.calculate_position_reduction_impact(
-            position, account_balance, moderate_close
-        )
-        new_ratio_combo = self.calculate_margin_impact(
-            AccountBalance(
-                wallet_id=account_balance.wallet_id,
-                total_margin=account_balance.total_margin,
-                used_margin=account_balance.used_margin * (1 - moderate_close / 100),
-                available_margin=account_balance.available_margin
-            ),
+        new_ratio_combo = self._margin_impact_raw(
+            total_margin,
+            used_margin * (1 - moderate_close / 100),
             moderate_margin
         )
 
@@ -256,7 +314,7 @@ class RiskCalculator:
         # Option 4: Set stop-loss
         if position.liquidation_price:
             stop_loss_buffer = 0.05  # 5% buffer above liquidation
-            if position.position_side == PositionSide.LONG:
+            if position.position_side is PositionSide.LONG:
                 suggested_stop = position.liquidation_price * (1 + stop_loss_buffer)
             else:
                 suggested_stop = position.liquidation_price * (1 - stop_loss_buffer)
@@ -274,13 +332,22 @@ class RiskCalculator:
         account_balance: AccountBalance,
         current_price: Optional[float] = None,
         leverage: Optional[float] = None,
-        price_trend: Optional[float] = None
+        price_trend: Optional[float] = None,
+        margin_ratio: Optional[float] = None,
+        liquidation_price: Optional[float] = None
     ) -> RiskMetrics:
         """
         Calculate comprehensive risk metrics for a position
 
+        Args:
+            margin_ratio: Precomputed account margin ratio (computed if omitted)
+            liquidation_price: Precomputed liquidation price at this leverage (computed if omitted)
+
         Returns: RiskMetrics object with all calculations
         """
+        if margin_ratio is None:
+            margin_ratio = account_balance.margin_ratio
+
         # Use current price or mark price
         mark_price = current_price or position.mark_price or position.entry_price
 
@@ -296,31 +363,49 @@ class RiskCalculator:
                 recommended_actions=["Unable to calculate risk - no price data available"]
             )
 
-        # Calculate liquidation price
-        liquidation_price = self.calculate_liquidation_price(position, leverage)
-
-        # Calculate distance to liquidation
-        distance = self.calculate_distance_to_liquidation(mark_price, liquidation_price)
-
-        # Estimate time to liquidation
-        hours_to_liq = self.estimate_time_to_liquidation(
-            mark_price,
-            liquidation_price,
-            position.position_side,
-            price_trend
+        # Reuse the previous result when none of the inputs changed
+        cache_key = (
+            position.symbol, position.side, position.qty, position.entry_price,
+            position.mark_price, position.liquidation_price, mark_price,
+            account_balance.total_margin, account_balance.used_margin,
+            margin_ratio, leverage, price_trend,
+            self.maintenance_margin_ratio, self.volatility_constant
         )
+        cached = self._risk_cache.get(cache_key)
+        if cached is not None:
+            self._risk_cache.move_to_end(cache_key)
+            liquidation_price, distance, hours_to_liq, recommendations = cached
+        else:
+            # Calculate liquidation price
+            if liquidation_price is None:
+                liquidation_price = self.calculate_liquidation_price(position, leverage)
+
+            # Calculate distance to liquidation
+            distance = self.calculate_distance_to_liquidation(mark_price, liquidation_price)
+
+            # Estimate time to liquidation
+            hours_to_liq = self.estimate_time_to_liquidation(
+                mark_price,
+                liquidation_price,
+                position.position_side,
+                price_trend
+            )
 
-        # Generate recommendations
-        recommendations = self.generate_recommendations(
-            position,
-            account_balance,
-            account_balance.margin_ratio
-        )
+            # Generate recommendations
+            recommendations = tuple(self.generate_recommendations(
+                position,
+                account_balance,
+                margin_ratio
+            ))
+
+            self._risk_cache[cache_key] = (liquidation_price, distance, hours_to_liq, recommendations)
+            if len(self._risk_cache) > RISK_CACHE_SIZE:
+                self._risk_cache.popitem(last=False)
 
         # Update position with calculated values
         position.mark_price = mark_price
         position.liquidation_price = liquidation_price
-        position.margin_ratio = account_balance.margin_ratio
+        position.margin_ratio = margin_ratio
 
         return RiskMetrics(
             position=position,
@@ -328,9 +413,34 @@ class RiskCalculator:
             liquidation_price=liquidation_price,
             distance_to_liquidation=distance,
             estimated_hours_to_liquidation=hours_to_liq,
-            recommended_actions=recommendations
+            recommended_actions=list(recommendations)
         )
 
+    def calculate_risk_metrics_batch(
+        self,
+        positions: List[Position],
+        account_balance: AccountBalance
+    ) -> List[RiskMetrics]:
+        """
+        Calculate risk metrics for all positions sharing one account balance
+
+        Balance-derived values and liquidation multipliers are computed once
+        for the whole batch.
+
+        Returns: List of RiskMetrics objects, one per position
+        """
+        margin_ratio = account_balance.margin_ratio
+        liquidation_prices = self.calculate_liquidation_prices(positions)
+        return [
+            self.calculate_risk_metrics(
+                position,
+                account_balance,
+                margin_ratio=margin_ratio,
+                liquidation_price=liquidation_price
+            )
+            for position, liquidation_price in zip(positions, liquidation_prices)
+        ]
+
     def assess_portfolio_risk(
         self,
         positions: List[Position],
@@ -356,22 +466,20 @@ class RiskCalculator:
                 "unrealized_pnl": account_balance.unrealized_pnl
             }
 
-        total_exposure = sum(
-            abs(pos.qty) * (pos.mark_price or pos.entry_price)
-            for pos in positions
-        )
-
-        positions_at_risk = sum(
-            1 for pos in positions
-            if pos.margin_ratio and pos.margin_ratio >= 80
-        )
-
-        # Find most risky position
-        most_risky = max(
-            positions,
-            key=lambda p: p.margin_ratio or 0,
-            default=None
-        )
+        # Exposure, at-risk count and most risky position in a single pass
+        total_exposure = 0.0
+        positions_at_risk = 0
+        most_risky = None
+        highest_ratio = 0
+        for pos in positions:
+            total_exposure += abs(pos.qty) * (pos.mark_price or pos.entry_price)
+
+            ratio = pos.margin_ratio or 0
+            if ratio >= 80:
+                positions_at_risk += 1
+            if most_risky is None or ratio > highest_ratio:
+                most_risky = pos
+                highest_ratio = ratio
 
         return {
             "total_positions": len(positions),
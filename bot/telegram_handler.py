@@ -2,9 +2,21 @@
 Telegram Bot Handler
 Manages all Telegram bot commands and interactions
 """
+import asyncio
 import logging
-from typing import Optional
-from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup, ReplyKeyboardMarkup, KeyboardButton
+import time
+from collections import OrderedDict, deque
+from typing import Deque, Optional, Dict, List, Set, Tuple
+from telegram import (
+    Update,
+    InlineKeyboardButton,
+    InlineKeyboardMarkup,
+    ReplyKeyboardMarkup,
+    KeyboardButton,
+    LinkPreviewOptions
+)
+from telegram.error import RetryAfter
+from telegram.request import HTTPXRequest
 from telegram.ext import (
     Application,
     CommandHandler,
@@ -12,11 +24,13 @@ from telegram.ext import (
     CallbackQueryHandler,
     MessageHandler,
     ConversationHandler,
+    Defaults,
     filters
 )
 
 from bot.user_manager import UserManager
 from bot.liquidation_monitor import LiquidationMonitor
+from data.models import Wallet, shorten_address
 from utils.formatters import (
     format_welcome_message,
     format_help_message,
@@ -26,13 +40,54 @@ from utils.formatters import (
     format_alert_history,
     format_portfolio_summary
 )
-from utils.validators import validate_threshold
-from config.settings import TELEGRAM_BOT_TOKEN
+from utils.validators import validate_threshold, validate_wallet_address
+from utils.rate_limiter import TokenBucket
+from config.settings import (
+    TELEGRAM_BOT_TOKEN,
+    TELEGRAM_GLOBAL_RATE_LIMIT,
+    TELEGRAM_CHAT_MIN_INTERVAL,
+    TELEGRAM_CHAT_RATE_LIMIT,
+    TELEGRAM_SEND_RETRIES,
+    TELEGRAM_SEND_CONCURRENCY,
+    TELEGRAM_SEND_DRAIN_TIMEOUT,
+    TELEGRAM_CONNECTION_POOL_SIZE,
+    TELEGRAM_POOL_TIMEOUT,
+    TELEGRAM_CONNECT_TIMEOUT,
+    TELEGRAM_READ_TIMEOUT,
+    TELEGRAM_WEBHOOK_URL,
+    TELEGRAM_WEBHOOK_PATH,
+    TELEGRAM_WEBHOOK_LISTEN,
+    TELEGRAM_WEBHOOK_PORT,
+    TELEGRAM_WEBHOOK_SECRET,
+    TELEGRAM_POLL_TIMEOUT,
+    ALERT_HISTORY_PAGE_SIZE
+)
 
 logger = logging.getLogger(__name__)
 
+# Seconds between sweeps of refilled per-chat rate limiters
+CHAT_LIMITER_PRUNE_INTERVAL = 60
+
+# Seconds of deliveries collected into one write marking their alerts sent
+ALERT_SENT_FLUSH_DELAY = 1.0
+
 # Conversation states
 WAITING_FOR_WALLET_ADDRESS = 1
+WAITING_FOR_WALLET_REMOVAL = 2
+WAITING_FOR_THRESHOLD = 3
+
+# Only these update types are handled, so Telegram doesn't need to deliver any others
+ALLOWED_UPDATES = [Update.MESSAGE, Update.CALLBACK_QUERY]
+
+# /start skips re-registering users seen within this window under the same username
+REGISTERED_USER_TTL = 3600  # seconds
+REGISTERED_USER_CACHE_SIZE = 10000
+
+# Seconds a user's wallet list is reused from context.user_data between commands
+USER_WALLETS_CACHE_TTL = 30
+
+# A repeat press of the same keyboard button within this many seconds is ignored
+BUTTON_DEBOUNCE_WINDOW = 0.3
 
 
 class TelegramBot:
@@ -55,27 +110,8 @@ class TelegramBot:
             [KeyboardButton("❓ Help")]
         ], resize_keyboard=True)
 
-    async def start_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
-        """Handle /start command"""
-        user = update.effective_user
-        if not user:
-            return
-
-        # Register user
-        self.user_manager.register_user(user.id, user.username)
-
-        # Send welcome message with keyboard
-        await update.message.reply_text(
-            format_welcome_message(),
-            parse_mode='Markdown',
-            reply_markup=self.main_keyboard
-        )
-
-        logger.info(f"User started bot: {user.id} (@{user.username})")
-
-    async def show_main_menu(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
-        """Show main menu with action buttons"""
-        keyboard = [
+        # Inline menu keyboard (static, built once)
+        self.menu_markup = InlineKeyboardMarkup([
             [
                 InlineKeyboardButton("➕ Add Wallet", callback_data="menu_add_wallet"),
                 InlineKeyboardButton("➖ Remove Wallet", callback_data="menu_remove_wallet")
@@ -91,8 +127,96 @@ class TelegramBot:
             [
                 InlineKeyboardButton("❓ Help", callback_data="menu_help")
             ]
-        ]
-        reply_markup = InlineKeyboardMarkup(keyboard)
+        ])
+
+        # Action buttons attached to alerts (static, built once)
+        self.alert_markup = InlineKeyboardMarkup([
+            [
+                InlineKeyboardButton("📊 View Portfolio", callback_data="portfolio"),
+                InlineKeyboardButton("⚙️ Settings", callback_data="settings")
+            ]
+        ])
+
+        # Alerts are queued and delivered by the sender task within Telegram's rate limits
+        self._send_queue: asyncio.Queue = asyncio.Queue()
+        self._send_limiter = TokenBucket(rate=TELEGRAM_GLOBAL_RATE_LIMIT, capacity=TELEGRAM_GLOBAL_RATE_LIMIT)
+        # Pending alerts per chat with a sender running (telegram_id -> FIFO of (message, add_buttons, alert_id));
+        # a chat's entry is removed when its sender finishes
+        self._chat_queues: Dict[int, Deque[Tuple[str, bool, Optional[int]]]] = {}
+        # Per-chat TELEGRAM_CHAT_RATE_LIMIT buckets; kept until refilled, since they outlive the chat's sender
+        self._chat_limiters: Dict[int, TokenBucket] = {}
+        self._chat_limiters_pruned_at = time.monotonic()
+        self._send_slots = asyncio.Semaphore(TELEGRAM_SEND_CONCURRENCY)
+        self._send_tasks: Set[asyncio.Task] = set()
+        self._sender_task: Optional[asyncio.Task] = None
+        # Stored alerts delivered but not yet marked sent; written in batches by one flush task at a time
+        self._delivered_alert_ids: List[int] = []
+        self._sent_flush_task: Optional[asyncio.Task] = None
+
+        # Persistent keyboard button handlers by button label
+        self._button_handlers = {
+            "📊 Status": self.status_command,
+            "💼 Portfolio": self.portfolio_command,
+            "📜 History": self.history_command,
+            "❓ Help": self.help_command,
+        }
+
+        # Keyboard buttons that prompt for input, by button label (they enter the input conversation)
+        self._conversation_buttons = {
+            "➕ Add Wallet": self._button_add_wallet,
+            "➖ Remove Wallet": self._button_remove_wallet,
+            "⚙️ Settings": self._button_settings,
+        }
+
+        # Callback query handlers by action (the part of callback_data before ':')
+        self._callback_handlers = {
+            "menu_remove_wallet": self._callback_remove_wallet_menu,
+            "menu_status": lambda update, context, payload: self._show_status_via_callback(update, context),
+            "menu_portfolio": lambda update, context, payload: self._show_portfolio_via_callback(update, context),
+            "menu_history": lambda update, context, payload: self._show_history_via_callback(update, context),
+            "history_page": lambda update, context, payload: self._show_history_via_callback(
+                update, context, int(payload) if payload.isdigit() else 0
+            ),
+            "menu_help": self._callback_help,
+            "back_to_menu": lambda update, context, payload: self.show_main_menu(update, context),
+            "remove_wallet": self._callback_remove_wallet,
+            "close_position": self._callback_close_position,
+            "add_margin": self._callback_add_margin,
+            "portfolio": lambda update, context, payload: self._show_portfolio_via_callback(update, context),
+            "settings": self._callback_settings,
+        }
+
+        # telegram_id -> (monotonic time of last registration, username registered with)
+        self._registered_users: OrderedDict = OrderedDict()
+
+    async def start_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """Handle /start command"""
+        user = update.effective_user
+        if not user:
+            return
+
+        # Register user (skipped if registered recently; a changed username is always stored)
+        now = time.monotonic()
+        registered = self._registered_users.get(user.id)
+        if registered is None or now - registered[0] > REGISTERED_USER_TTL or registered[1] != user.username:
+            await asyncio.to_thread(self.user_manager.register_user, user.id, user.username)
+            self._registered_users[user.id] = (now, user.username)
+            self._registered_users.move_to_end(user.id)
+            if len(self._registered_users) > REGISTERED_USER_CACHE_SIZE:
+                self._registered_users.popitem(last=False)
+
+        # Send welcome message with keyboard (plain text: it has no formatting,
+        # and Markdown would read the underscores in command names as italics)
+        await update.message.reply_text(
+            format_welcome_message(),
+            reply_markup=self.main_keyboard
+        )
+
+        logger.info(f"User started bot: {user.id} (@{user.username})")
+
+    async def show_main_menu(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """Show main menu with action buttons"""
+        reply_markup = self.menu_markup
 
         menu_text = (
             "🎛️ *Main Menu*\n\n"
@@ -148,53 +272,40 @@ class TelegramBot:
         if not user:
             return
 
-        # Send processing message
-        if update.callback_query:
-            processing_msg = await update.callback_query.message.reply_text(
-                "🔍 Validating wallet address..."
-            )
-        else:
-            processing_msg = await update.message.reply_text(
-                "🔍 Validating wallet address..."
-            )
+        chat_message = update.callback_query.message if update.callback_query else update.message
+
+        # Reject malformed addresses before touching the database or monitor
+        is_valid, result = validate_wallet_address(wallet_address)
+        if not is_valid:
+            await chat_message.reply_text(format_error_message(result))
+            return
 
-        # Add wallet
-        success, message, wallet = self.user_manager.add_wallet(
+        # Add wallet (a quick local write, so the outcome is the first reply;
+        # it is only edited later if monitoring fails to start)
+        success, message, wallet = await asyncio.to_thread(
+            self.user_manager.add_wallet,
             user.id,
             wallet_address
         )
+        self._invalidate_user_wallets(context)
 
         if success:
-            await processing_msg.edit_text(
+            processing_msg = await chat_message.reply_text(
                 f"✅ *Wallet Added Successfully!*\n\n"
                 f"📍 Address: `{wallet_address[:10]}...{wallet_address[-8:]}`\n"
-                f"📊 Status: Active\n\n"
-                f"Starting monitoring...",
+                f"📊 Status: Monitoring Active\n"
+                f"🔔 Alerts: Enabled\n\n"
+                f"You'll receive alerts when positions are at risk of liquidation.",
                 parse_mode='Markdown'
             )
 
-            # Start monitoring this wallet
-            try:
-                await self.liquidation_monitor.start_monitoring_wallet(wallet.wallet_address)
-                await processing_msg.edit_text(
-                    f"✅ *Wallet Added Successfully!*\n\n"
-                    f"📍 Address: `{wallet_address[:10]}...{wallet_address[-8:]}`\n"
-                    f"📊 Status: Monitoring Active\n"
-                    f"🔔 Alerts: Enabled\n\n"
-                    f"You'll receive alerts when positions are at risk of liquidation.",
-                    parse_mode='Markdown'
-                )
-            except Exception as e:
-                logger.error(f"Error starting monitoring: {e}", exc_info=True)
-                await processing_msg.edit_text(
-                    f"⚠️ *Wallet Added with Warning*\n\n"
-                    f"📍 Address: `{wallet_address[:10]}...{wallet_address[-8:]}`\n"
-                    f"❌ Monitoring failed to start: {str(e)}\n\n"
-                    f"Please contact support if this persists.",
-                    parse_mode='Markdown'
-                )
+            # Start monitoring in the background so the handler returns right away
+            context.application.create_task(
+                self._start_wallet_monitoring(processing_msg, wallet.wallet_address, wallet_address),
+                update=update
+            )
         else:
-            await processing_msg.edit_text(
+            await chat_message.reply_text(
                 f"❌ *Failed to Add Wallet*\n\n"
                 f"{message}\n\n"
                 f"Please check the address and try again.",
@@ -203,6 +314,27 @@ class TelegramBot:
 
         logger.info(f"Add wallet request: {user.id} - {wallet_address} - {message}")
 
+    async def _start_wallet_monitoring(self, processing_msg, monitored_address: str, wallet_address: str):
+        """
+        Start monitoring a newly added wallet, reporting a failure to the user
+
+        Args:
+            processing_msg: Message to edit if monitoring fails to start
+            monitored_address: Normalized address of the stored wallet
+            wallet_address: Address as entered by the user, for display
+        """
+        try:
+            await self.liquidation_monitor.start_monitoring_wallet(monitored_address)
+        except Exception as e:
+            logger.error(f"Error starting monitoring: {e}", exc_info=True)
+            await processing_msg.edit_text(
+                f"⚠️ *Wallet Added with Warning*\n\n"
+                f"📍 Address: `{wallet_address[:10]}...{wallet_address[-8:]}`\n"
+                f"❌ Monitoring failed to start: {str(e)}\n\n"
+                f"Please contact support if this persists.",
+                parse_mode='Markdown'
+            )
+
     async def remove_wallet_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle /remove_wallet command"""
         user = update.effective_user
@@ -221,11 +353,19 @@ class TelegramBot:
 
         wallet_address = context.args[0]
 
+        # Reject malformed addresses before touching the database
+        is_valid, result = validate_wallet_address(wallet_address)
+        if not is_valid:
+            await update.message.reply_text(format_error_message(result))
+            return
+
         # Remove wallet
-        success, message = self.user_manager.remove_wallet(
+        success, message = await asyncio.to_thread(
+            self.user_manager.remove_wallet,
             user.id,
             wallet_address
         )
+        self._invalidate_user_wallets(context)
 
         if success:
             await update.message.reply_text(format_success_message(message))
@@ -247,7 +387,7 @@ class TelegramBot:
             return
 
         # Get user's wallets
-        wallets = self.user_manager.get_user_wallets(user.id)
+        wallets = await self._get_user_wallets(context, user.id)
 
         if not wallets:
             await update.message.reply_text(
@@ -258,35 +398,66 @@ class TelegramBot:
             )
             return
 
-        # Get status for each wallet
-        status_messages = []
-        for wallet in wallets:
-            try:
-                status = await self.liquidation_monitor.get_wallet_status(wallet.wallet_address)
-
-                if status:
-                    wallet_short = f"{wallet.wallet_address[:6]}...{wallet.wallet_address[-4:]}"
-                    status_messages.append(
-                        f"📊 Wallet: `{wallet_short}`\n"
-                        f"   Positions: {status['position_count']}\n"
-                        f"   Margin Ratio: {status['margin_ratio']:.2f}%\n"
-                        f"   Status: {status['status']}\n"
-                    )
-                else:
-                    status_messages.append(
-                        f"⚠️ Wallet: `{wallet.wallet_address[:10]}...`\n"
-                        f"   No data available\n"
-                    )
+        # Get status for all wallets concurrently
+        status_messages = await self._collect_wallet_statuses(wallets)
 
-            except Exception as e:
-                logger.error(f"Error getting status for {wallet.wallet_address}: {e}")
-                status_messages.append(
+        message = "📈 MONITORING STATUS\n\n" + "\n".join(status_messages)
+        await update.message.reply_text(message, parse_mode='Markdown', reply_markup=self.main_keyboard)
+
+    async def _get_user_wallets(self, context: ContextTypes.DEFAULT_TYPE, telegram_id: int) -> List[Wallet]:
+        """Get a user's active wallets, reusing the list cached in user_data for USER_WALLETS_CACHE_TTL"""
+        now = time.monotonic()
+        wallets = context.user_data.get('wallets')
+        if wallets is not None and now - context.user_data.get('wallets_at', 0) < USER_WALLETS_CACHE_TTL:
+            return wallets
+
+        wallets = await asyncio.to_thread(self.user_manager.get_user_wallets, telegram_id)
+        context.user_data['wallets'] = wallets
+        context.user_data['wallets_at'] = now
+        return wallets
+
+    @staticmethod
+    def _invalidate_user_wallets(context: ContextTypes.DEFAULT_TYPE):
+        """Drop the cached wallet list after the user's wallets change"""
+        context.user_data.pop('wallets', None)
+        context.user_data.pop('wallets_at', None)
+
+    async def _collect_wallet_statuses(self, wallets: List[Wallet]) -> List[str]:
+        """
+        Fetch status for all wallets concurrently and format one block per wallet
+
+        Returns: List of formatted status blocks, in wallet order
+        """
+        # Read every wallet's stored state in one query; the status calls below then hit the cache
+        await self.liquidation_monitor.load_wallet_snapshots([wallet.wallet_address for wallet in wallets])
+
+        statuses = await asyncio.gather(
+            *(self.liquidation_monitor.get_wallet_status(wallet.wallet_address) for wallet in wallets),
+            return_exceptions=True
+        )
+
+        status_messages = [None] * len(wallets)
+        for i, (wallet, status) in enumerate(zip(wallets, statuses)):
+            if isinstance(status, Exception):
+                logger.error(f"Error getting status for {wallet.wallet_address}: {status}")
+                status_messages[i] = (
                     f"❌ Wallet: `{wallet.wallet_address[:10]}...`\n"
                     f"   Error retrieving status\n"
                 )
+            elif status:
+                status_messages[i] = (
+                    f"📊 Wallet: `{wallet.short_address}`\n"
+                    f"   Positions: {status['position_count']}\n"
+                    f"   Margin Ratio: {status['margin_ratio']:.2f}%\n"
+                    f"   Status: {status['status']}\n"
+                )
+            else:
+                status_messages[i] = (
+                    f"⚠️ Wallet: `{wallet.wallet_address[:10]}...`\n"
+                    f"   No data available\n"
+                )
 
-        message = "📈 MONITORING STATUS\n\n" + "\n".join(status_messages)
-        await update.message.reply_text(message, parse_mode='Markdown', reply_markup=self.main_keyboard)
+        return status_messages
 
     async def portfolio_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle /portfolio command"""
@@ -294,10 +465,10 @@ class TelegramBot:
         if not user:
             return
 
-        logger.debug(f"Portfolio command from user {user.id}")
+        logger.debug("Portfolio command from user %s", user.id)
 
         # Get user's wallets
-        wallets = self.user_manager.get_user_wallets(user.id)
+        wallets = await self._get_user_wallets(context, user.id)
 
         if not wallets:
             await update.message.reply_text(
@@ -309,36 +480,42 @@ class TelegramBot:
             )
             return
 
-        # Show all wallets' portfolios
-        for wallet in wallets:
-            try:
-                # Force fetch fresh data first
-                await self.liquidation_monitor._fetch_wallet_data(wallet.wallet_address)
+        # Get summaries for all wallets in one call, refreshing any that aren't fresh
+        summaries = await self.liquidation_monitor.get_portfolio_summaries(
+            [wallet.wallet_address for wallet in wallets],
+            refresh=True
+        )
 
-                portfolio_data = await self.liquidation_monitor.get_portfolio_summary(
-                    wallet.wallet_address
-                )
+        # Show all wallets' portfolios, in wallet order
+        for wallet, portfolio_data in zip(wallets, summaries):
+            await update.message.reply_text(
+                self._format_wallet_portfolio(wallet, portfolio_data),
+                parse_mode='Markdown',
+                reply_markup=self.main_keyboard
+            )
 
-                if portfolio_data and portfolio_data.get('balance'):
-                    message = format_portfolio_summary(
-                        portfolio_data.get('positions', []),
-                        portfolio_data['balance'],
-                        wallet.wallet_address
-                    )
-                    await update.message.reply_text(message, parse_mode='Markdown', reply_markup=self.main_keyboard)
-                else:
-                    await update.message.reply_text(
-                        f"ℹ️ Wallet `{wallet.wallet_address[:10]}...`: No data available",
-                        parse_mode='Markdown',
-                        reply_markup=self.main_keyboard
-                    )
+    @staticmethod
+    def _format_wallet_portfolio(wallet: Wallet, portfolio_data) -> str:
+        """
+        Format one wallet's portfolio summary for the portfolio views
 
-            except Exception as e:
-                logger.error(f"Error getting portfolio for {wallet.wallet_address}: {e}", exc_info=True)
-                await update.message.reply_text(
-                    format_error_message(f"Failed to retrieve data for {wallet.wallet_address[:10]}..."),
-                    reply_markup=self.main_keyboard
-                )
+        Args:
+            wallet: Wallet the summary belongs to
+            portfolio_data: Result of get_portfolio_summary, or the exception it raised
+
+        Returns: Portfolio message, or a short notice if there is nothing to show
+        """
+        if isinstance(portfolio_data, Exception):
+            return format_error_message(f"Failed to retrieve data for {wallet.wallet_address[:10]}...")
+
+        if portfolio_data and portfolio_data.get('balance'):
+            return format_portfolio_summary(
+                portfolio_data.get('positions', []),
+                portfolio_data['balance'],
+                wallet.wallet_address
+            )
+
+        return f"ℹ️ Wallet `{wallet.wallet_address[:10]}...`: No data available"
 
     async def set_alert_threshold_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle /set_alert_threshold command"""
@@ -372,7 +549,7 @@ class TelegramBot:
             return
 
         # Get user's wallets
-        wallets = self.user_manager.get_user_wallets(user.id)
+        wallets = await self._get_user_wallets(context, user.id)
 
         if not wallets:
             await update.message.reply_text(
@@ -380,27 +557,19 @@ class TelegramBot:
             )
             return
 
-        # Set threshold for all user's wallets
-        results = []
-        for wallet in wallets:
-            success, message = self.user_manager.set_wallet_threshold(
-                user.id,
-                wallet.wallet_address,
-                threshold
-            )
-            results.append((wallet.wallet_address, success, message))
+        # Set threshold for all user's wallets in one write
+        updated = await asyncio.to_thread(self.user_manager.set_all_wallet_thresholds, user.id, threshold)
 
         # Send response
-        if all(r[1] for r in results):
+        if updated:
             await update.message.reply_text(
                 format_success_message(
                     f"Alert threshold set to {threshold}% for all wallets!"
                 )
             )
         else:
-            error_messages = [f"❌ {r[0][:10]}...: {r[2]}" for r in results if not r[1]]
             await update.message.reply_text(
-                format_error_message("\n".join(error_messages))
+                format_error_message("Failed to update alert threshold. Please try again.")
             )
 
         logger.info(f"Set threshold: {user.id} - {threshold}%")
@@ -412,7 +581,7 @@ class TelegramBot:
             return
 
         # Get user's wallets
-        wallets = self.user_manager.get_user_wallets(user.id)
+        wallets = await self._get_user_wallets(context, user.id)
 
         if not wallets:
             await update.message.reply_text(
@@ -420,18 +589,50 @@ class TelegramBot:
             )
             return
 
-        # Get alerts for all wallets
-        all_alerts = []
-        for wallet in wallets:
-            alerts = self.liquidation_monitor.db.get_recent_alerts(wallet.id, hours=24)
-            all_alerts.extend(alerts)
+        # Format first page and send
+        message, page_markup = await self._alert_history_page(wallets, 0)
+        await update.message.reply_text(
+            message,
+            parse_mode='Markdown',
+            reply_markup=page_markup or self.main_keyboard
+        )
 
-        # Sort by created_at descending
-        all_alerts.sort(key=lambda a: a.created_at, reverse=True)
+    async def _alert_history_page(self, wallets: List[Wallet], page: int) -> Tuple[str, Optional[InlineKeyboardMarkup]]:
+        """
+        Fetch and format one page of alert history for a user's wallets
 
-        # Format and send
-        message = format_alert_history(all_alerts)
-        await update.message.reply_text(message, parse_mode='Markdown', reply_markup=self.main_keyboard)
+        Args:
+            wallets: User's wallets
+            page: Zero-based page number
+
+        Returns: Tuple of (message, page navigation markup or None if there is only one page)
+        """
+        db = self.liquidation_monitor.db
+        wallet_ids = [wallet.id for wallet in wallets]
+        offset = page * ALERT_HISTORY_PAGE_SIZE
+
+        # Most users have no recent alerts, so count first and skip the fetch when there are none
+        total = await asyncio.to_thread(db.count_recent_alerts_for_wallets, wallet_ids, hours=24)
+        if not total:
+            return format_alert_history([]), None
+
+        alerts = await asyncio.to_thread(
+            db.get_recent_alerts_for_wallets,
+            wallet_ids,
+            hours=24,
+            limit=ALERT_HISTORY_PAGE_SIZE,
+            offset=offset
+        )
+        has_older = total > offset + ALERT_HISTORY_PAGE_SIZE
+        message = format_alert_history(alerts, page)
+
+        buttons = []
+        if page > 0:
+            buttons.append(InlineKeyboardButton("⬅️ Newer", callback_data=f"history_page:{page - 1}"))
+        if has_older:
+            buttons.append(InlineKeyboardButton("Older ➡️", callback_data=f"history_page:{page + 1}"))
+
+        return message, InlineKeyboardMarkup([buttons]) if buttons else None
 
     async def handle_callback_query(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle button callbacks"""
@@ -439,148 +640,146 @@ class TelegramBot:
         await query.answer()
 
         # Parse callback data
-        # Format: "action:wallet_address:optional_data"
-        data_parts = query.data.split(':')
-        action = data_parts[0]
+        # Format: "action:payload"
+        action, _, payload = query.data.partition(':')
+
+        handler = self._callback_handlers.get(action)
+        if handler:
+            await handler(update, context, payload)
+
+    async def _callback_add_wallet(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
+        """Prompt for a wallet address to add"""
+        await update.callback_query.answer()
+        await update.callback_query.edit_message_text(
+            "➕ *Add Wallet*\n\n"
+            "Please send your wallet address in the next message.\n\n"
+            "Format: `0x1234...`\n\n"
+            "You can also use: `/add_wallet 0x1234...`",
+            parse_mode='Markdown'
+        )
+        return WAITING_FOR_WALLET_ADDRESS
+
+    async def _callback_remove_wallet_menu(self, update: Update, context: ContextTypes.DEFAULT_TYPE, payload: str):
+        """Show the user's wallets as removal buttons"""
+        query = update.callback_query
+        user = query.from_user
+        if not user:
+            return
 
-        # Handle menu actions
-        if action == "menu_add_wallet":
+        wallets = await self._get_user_wallets(context, user.id)
+        if not wallets:
             await query.edit_message_text(
-                "➕ *Add Wallet*\n\n"
-                "Please send your wallet address in the next message.\n\n"
-                "Format: `0x1234...`\n\n"
-                "You can also use: `/add_wallet 0x1234...`",
+                "❌ You have no wallets to remove.\n\n"
+                "Use the menu to add a wallet first.",
                 parse_mode='Markdown'
             )
-            # Store state for next message
-            context.user_data['awaiting_wallet'] = True
-
-        elif action == "menu_remove_wallet":
-            user = update.effective_user
-            if not user:
-                return
+            return
 
-            wallets = self.user_manager.get_user_wallets(user.id)
-            if not wallets:
-                await query.edit_message_text(
-                    "❌ You have no wallets to remove.\n\n"
-                    "Use the menu to add a wallet first.",
-                    parse_mode='Markdown'
+        # Show wallet selection buttons
+        keyboard = []
+        for wallet in wallets:
+            keyboard.append([
+                InlineKeyboardButton(
+                    f"🗑️ {wallet.short_address}",
+                    callback_data=f"remove_wallet:{wallet.wallet_address}"
                 )
-                return
+            ])
+        keyboard.append([InlineKeyboardButton("🔙 Back to Menu", callback_data="back_to_menu")])
+        reply_markup = InlineKeyboardMarkup(keyboard)
 
-            # Show wallet selection buttons
-            keyboard = []
-            for wallet in wallets:
-                wallet_short = f"{wallet.wallet_address[:6]}...{wallet.wallet_address[-4:]}"
-                keyboard.append([
-                    InlineKeyboardButton(
-                        f"🗑️ {wallet_short}",
-                        callback_data=f"remove_wallet:{wallet.wallet_address}"
-                    )
-                ])
-            keyboard.append([InlineKeyboardButton("🔙 Back to Menu", callback_data="back_to_menu")])
-            reply_markup = InlineKeyboardMarkup(keyboard)
+        await query.edit_message_text(
+            "➖ *Remove Wallet*\n\n"
+            "Select a wallet to remove:",
+            parse_mode='Markdown',
+            reply_markup=reply_markup
+        )
 
-            await query.edit_message_text(
-                "➖ *Remove Wallet*\n\n"
-                "Select a wallet to remove:",
-                parse_mode='Markdown',
-                reply_markup=reply_markup
-            )
+    async def _callback_threshold(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
+        """Prompt for a new alert threshold"""
+        await update.callback_query.answer()
+        await update.callback_query.edit_message_text(
+            "🔔 *Set Alert Threshold*\n\n"
+            "Send a message with your desired threshold percentage.\n\n"
+            "Example: `75` (for 75% margin ratio)\n\n"
+            "Or use: `/set_alert_threshold 75`",
+            parse_mode='Markdown'
+        )
+        return WAITING_FOR_THRESHOLD
+
+    async def _callback_help(self, update: Update, context: ContextTypes.DEFAULT_TYPE, payload: str):
+        """Show the help message"""
+        await update.callback_query.edit_message_text(
+            format_help_message(),
+            parse_mode='Markdown'
+        )
 
-        elif action == "menu_status":
-            await self._show_status_via_callback(update, context)
+    async def _callback_remove_wallet(self, update: Update, context: ContextTypes.DEFAULT_TYPE, payload: str):
+        """Remove the wallet whose address is the callback payload"""
+        query = update.callback_query
+        if not payload:
+            await query.answer("Invalid wallet address")
+            return
 
-        elif action == "menu_portfolio":
-            await self._show_portfolio_via_callback(update, context)
+        wallet_address = payload
+        user = query.from_user
+        if not user:
+            return
 
-        elif action == "menu_threshold":
-            await query.edit_message_text(
-                "🔔 *Set Alert Threshold*\n\n"
-                "Send a message with your desired threshold percentage.\n\n"
-                "Example: `75` (for 75% margin ratio)\n\n"
-                "Or use: `/set_alert_threshold 75`",
-                parse_mode='Markdown'
-            )
-            context.user_data['awaiting_threshold'] = True
+        # Remove wallet
+        success, message = await asyncio.to_thread(self.user_manager.remove_wallet, user.id, wallet_address)
+        self._invalidate_user_wallets(context)
 
-        elif action == "menu_history":
-            await self._show_history_via_callback(update, context)
+        if success:
+            try:
+                await self.liquidation_monitor.stop_monitoring_wallet(wallet_address)
+            except Exception as e:
+                logger.error(f"Error stopping monitoring: {e}", exc_info=True)
 
-        elif action == "menu_help":
             await query.edit_message_text(
-                format_help_message(),
+                f"✅ *Wallet Removed*\n\n"
+                f"📍 Address: `{wallet_address[:10]}...{wallet_address[-8:]}`\n"
+                f"📊 Status: Monitoring Stopped\n\n"
+                f"The wallet has been removed from monitoring.",
                 parse_mode='Markdown'
             )
-
-        elif action == "back_to_menu":
-            await self.show_main_menu(update, context)
-
-        elif action == "remove_wallet":
-            if len(data_parts) < 2:
-                await query.answer("Invalid wallet address")
-                return
-
-            wallet_address = data_parts[1]
-            user = update.effective_user
-            if not user:
-                return
-
-            # Remove wallet
-            success, message = self.user_manager.remove_wallet(user.id, wallet_address)
-
-            if success:
-                try:
-                    await self.liquidation_monitor.stop_monitoring_wallet(wallet_address)
-                except Exception as e:
-                    logger.error(f"Error stopping monitoring: {e}", exc_info=True)
-
-                await query.edit_message_text(
-                    f"✅ *Wallet Removed*\n\n"
-                    f"📍 Address: `{wallet_address[:10]}...{wallet_address[-8:]}`\n"
-                    f"📊 Status: Monitoring Stopped\n\n"
-                    f"The wallet has been removed from monitoring.",
-                    parse_mode='Markdown'
-                )
-            else:
-                await query.edit_message_text(
-                    f"❌ *Failed to Remove Wallet*\n\n"
-                    f"{message}",
-                    parse_mode='Markdown'
-                )
-
-        elif action == "close_position":
-            # TODO: Implement position closing (requires write access)
+        else:
             await query.edit_message_text(
-                "⚠️ Position closing requires wallet connection and is not yet implemented.\n"
-                "Please close positions manually on Reya.xyz"
+                f"❌ *Failed to Remove Wallet*\n\n"
+                f"{message}",
+                parse_mode='Markdown'
             )
 
-        elif action == "add_margin":
-            # TODO: Implement margin addition (requires write access)
-            await query.edit_message_text(
-                "⚠️ Adding margin requires wallet connection and is not yet implemented.\n"
-                "Please add margin manually on Reya.xyz"
-            )
+    async def _callback_close_position(self, update: Update, context: ContextTypes.DEFAULT_TYPE, payload: str):
+        """Explain that closing positions isn't supported"""
+        # TODO: Implement position closing (requires write access)
+        await update.callback_query.edit_message_text(
+            "⚠️ Position closing requires wallet connection and is not yet implemented.\n"
+            "Please close positions manually on Reya.xyz"
+        )
 
-        elif action == "portfolio":
-            await self._show_portfolio_via_callback(update, context)
+    async def _callback_add_margin(self, update: Update, context: ContextTypes.DEFAULT_TYPE, payload: str):
+        """Explain that adding margin isn't supported"""
+        # TODO: Implement margin addition (requires write access)
+        await update.callback_query.edit_message_text(
+            "⚠️ Adding margin requires wallet connection and is not yet implemented.\n"
+            "Please add margin manually on Reya.xyz"
+        )
 
-        elif action == "settings":
-            await query.edit_message_text(
-                "⚙️ Settings\n\n"
-                "Use /set_alert_threshold to customize alert thresholds.\n"
-                "Use /remove_wallet to stop monitoring a wallet."
-            )
+    async def _callback_settings(self, update: Update, context: ContextTypes.DEFAULT_TYPE, payload: str):
+        """Point the user at the settings commands"""
+        await update.callback_query.edit_message_text(
+            "⚙️ Settings\n\n"
+            "Use /set_alert_threshold to customize alert thresholds.\n"
+            "Use /remove_wallet to stop monitoring a wallet."
+        )
 
     async def _show_status_via_callback(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Show status via callback query"""
-        user = update.effective_user
+        user = update.callback_query.from_user
         if not user:
             return
 
-        wallets = self.user_manager.get_user_wallets(user.id)
+        wallets = await self._get_user_wallets(context, user.id)
 
         if not wallets:
             await update.callback_query.edit_message_text(
@@ -590,43 +789,19 @@ class TelegramBot:
             )
             return
 
-        # Get status for each wallet
-        status_messages = []
-        for wallet in wallets:
-            try:
-                status = await self.liquidation_monitor.get_wallet_status(wallet.wallet_address)
-
-                if status:
-                    wallet_short = f"{wallet.wallet_address[:6]}...{wallet.wallet_address[-4:]}"
-                    status_messages.append(
-                        f"📊 Wallet: `{wallet_short}`\n"
-                        f"   Positions: {status['position_count']}\n"
-                        f"   Margin Ratio: {status['margin_ratio']:.2f}%\n"
-                        f"   Status: {status['status']}\n"
-                    )
-                else:
-                    status_messages.append(
-                        f"⚠️ Wallet: `{wallet.wallet_address[:10]}...`\n"
-                        f"   No data available\n"
-                    )
-
-            except Exception as e:
-                logger.error(f"Error getting status for {wallet.wallet_address}: {e}")
-                status_messages.append(
-                    f"❌ Wallet: `{wallet.wallet_address[:10]}...`\n"
-                    f"   Error retrieving status\n"
-                )
+        # Get status for all wallets concurrently
+        status_messages = await self._collect_wallet_statuses(wallets)
 
         message = "📈 *MONITORING STATUS*\n\n" + "\n".join(status_messages)
         await update.callback_query.edit_message_text(message, parse_mode='Markdown')
 
     async def _show_portfolio_via_callback(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Show portfolio via callback query"""
-        user = update.effective_user
+        user = update.callback_query.from_user
         if not user:
             return
 
-        wallets = self.user_manager.get_user_wallets(user.id)
+        wallets = await self._get_user_wallets(context, user.id)
 
         if not wallets:
             await update.callback_query.edit_message_text(
@@ -642,34 +817,22 @@ class TelegramBot:
             portfolio_data = await self.liquidation_monitor.get_portfolio_summary(
                 wallet.wallet_address
             )
-
-            if portfolio_data:
-                message = format_portfolio_summary(
-                    portfolio_data['positions'],
-                    portfolio_data['balance'],
-                    wallet.wallet_address
-                )
-                await update.callback_query.edit_message_text(message, parse_mode='Markdown')
-            else:
-                await update.callback_query.edit_message_text(
-                    "ℹ️ No positions found for this wallet.",
-                    parse_mode='Markdown'
-                )
-
         except Exception as e:
             logger.error(f"Error getting portfolio: {e}", exc_info=True)
-            await update.callback_query.edit_message_text(
-                "❌ Failed to retrieve portfolio data.",
-                parse_mode='Markdown'
-            )
+            portfolio_data = e
 
-    async def _show_history_via_callback(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
-        """Show history via callback query"""
-        user = update.effective_user
+        await update.callback_query.edit_message_text(
+            self._format_wallet_portfolio(wallet, portfolio_data),
+            parse_mode='Markdown'
+        )
+
+    async def _show_history_via_callback(self, update: Update, context: ContextTypes.DEFAULT_TYPE, page: int = 0):
+        """Show a page of history via callback query"""
+        user = update.callback_query.from_user
         if not user:
             return
 
-        wallets = self.user_manager.get_user_wallets(user.id)
+        wallets = await self._get_user_wallets(context, user.id)
 
         if not wallets:
             await update.callback_query.edit_message_text(
@@ -678,288 +841,453 @@ class TelegramBot:
             )
             return
 
-        # Get alerts for all wallets
-        all_alerts = []
-        for wallet in wallets:
-            alerts = self.liquidation_monitor.db.get_recent_alerts(wallet.id, hours=24)
-            all_alerts.extend(alerts)
-
-        # Sort by created_at descending
-        all_alerts.sort(key=lambda a: a.created_at, reverse=True)
-
         # Format and send
-        message = format_alert_history(all_alerts)
-        await update.callback_query.edit_message_text(message, parse_mode='Markdown')
+        message, page_markup = await self._alert_history_page(wallets, page)
+        await update.callback_query.edit_message_text(message, parse_mode='Markdown', reply_markup=page_markup)
 
-    async def handle_text_message(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
-        """Handle text messages for wallet address or threshold input"""
+    async def _button_add_wallet(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
+        """Prompt for a wallet address to add"""
+        await update.message.reply_text(
+            "➕ *ADD WALLET FOR MONITORING*\n\n"
+            "🔒 *100% Safe & Non-Custodial*\n"
+            "We only *read* your public wallet data.\n"
+            "No private keys needed. Cannot execute trades.\n\n"
+            "━━━━━━━━━━━━━━━━━━━━━\n\n"
+            "📝 *Instructions:*\n"
+            "Send your Ethereum wallet address\n\n"
+            "Format: `0x1234567890abcdef...`\n\n"
+            "Example:\n"
+            "`0x742d35Cc6634C0532925a3b844Bc9e7595f0bEb`\n\n"
+            "━━━━━━━━━━━━━━━━━━━━━\n\n"
+            "✅ Once added, you'll receive real-time alerts for:\n"
+            "  • Liquidation risks\n"
+            "  • Position changes\n"
+            "  • Margin ratio updates",
+            parse_mode='Markdown',
+            reply_markup=self.main_keyboard
+        )
+        return WAITING_FOR_WALLET_ADDRESS
+
+    async def _button_remove_wallet(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
+        """List the user's wallets and prompt for one to remove"""
         user = update.effective_user
-        if not user:
-            return
 
-        text = update.message.text.strip()
+        # Show list of wallets to remove
+        wallets = await self._get_user_wallets(context, user.id)
 
-        # Handle keyboard button presses
-        if text == "➕ Add Wallet":
+        if not wallets:
             await update.message.reply_text(
-                "➕ *ADD WALLET FOR MONITORING*\n\n"
-                "🔒 *100% Safe & Non-Custodial*\n"
-                "We only *read* your public wallet data.\n"
-                "No private keys needed. Cannot execute trades.\n\n"
-                "━━━━━━━━━━━━━━━━━━━━━\n\n"
-                "📝 *Instructions:*\n"
-                "Send your Ethereum wallet address\n\n"
-                "Format: `0x1234567890abcdef...`\n\n"
-                "Example:\n"
-                "`0x742d35Cc6634C0532925a3b844Bc9e7595f0bEb`\n\n"
-                "━━━━━━━━━━━━━━━━━━━━━\n\n"
-                "✅ Once added, you'll receive real-time alerts for:\n"
-                "  • Liquidation risks\n"
-                "  • Position changes\n"
-                "  • Margin ratio updates",
-                parse_mode='Markdown',
+                format_info_message("You have no wallets to remove."),
                 reply_markup=self.main_keyboard
             )
-            context.user_data['awaiting_wallet'] = True
-            return
-        elif text == "➖ Remove Wallet":
-            # Show list of wallets to remove
-            wallets = self.user_manager.get_user_wallets(user.id)
+            return ConversationHandler.END
+
+        # Show wallet selection
+        wallet_list = []
+        for i, wallet in enumerate(wallets, 1):
+            wallet_list.append(f"{i}. `{wallet.short_address}` - Full: `{wallet.wallet_address}`")
+
+        remove_msg = (
+            "➖ *REMOVE WALLET*\n\n"
+            "📋 *Your Monitored Wallets:*\n"
+            + "\n".join(wallet_list) +
+            "\n\n━━━━━━━━━━━━━━━━━━━━━\n\n"
+            "🗑️ *To remove a wallet:*\n"
+            "Send the full wallet address\n\n"
+            "Or use command:\n"
+            "`/remove_wallet 0x1234...`\n\n"
+            "⚠️ *Warning:* This will stop all monitoring and alerts for that wallet."
+        )
 
-            if not wallets:
-                await update.message.reply_text(
-                    format_info_message("You have no wallets to remove."),
-                    reply_markup=self.main_keyboard
-                )
-                return
+        await update.message.reply_text(
+            remove_msg,
+            parse_mode='Markdown',
+            reply_markup=self.main_keyboard
+        )
+        return WAITING_FOR_WALLET_REMOVAL
 
-            # Show wallet selection
-            wallet_list = []
-            for i, wallet in enumerate(wallets, 1):
-                wallet_short = f"{wallet.wallet_address[:6]}...{wallet.wallet_address[-4:]}"
-                wallet_list.append(f"{i}. `{wallet_short}` - Full: `{wallet.wallet_address}`")
+    async def _button_settings(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
+        """Show current alert thresholds and prompt for a new one"""
+        user = update.effective_user
 
-            remove_msg = (
-                "➖ *REMOVE WALLET*\n\n"
-                "📋 *Your Monitored Wallets:*\n"
-                + "\n".join(wallet_list) +
-                "\n\n━━━━━━━━━━━━━━━━━━━━━\n\n"
-                "🗑️ *To remove a wallet:*\n"
-                "Send the full wallet address\n\n"
-                "Or use command:\n"
-                "`/remove_wallet 0x1234...`\n\n"
-                "⚠️ *Warning:* This will stop all monitoring and alerts for that wallet."
-            )
+        # Get user's wallets to show current settings
+        wallets = await self._get_user_wallets(context, user.id)
 
+        if not wallets:
             await update.message.reply_text(
-                remove_msg,
-                parse_mode='Markdown',
+                format_info_message("You have no wallets. Add one first!"),
                 reply_markup=self.main_keyboard
             )
-            context.user_data['awaiting_wallet_removal'] = True
-            return
-        elif text == "📊 Status":
-            await self.status_command(update, context)
-            return
-        elif text == "💼 Portfolio":
-            await self.portfolio_command(update, context)
-            return
-        elif text == "📜 History":
-            await self.history_command(update, context)
+            return ConversationHandler.END
+
+        # Get current threshold for first wallet
+        wallet = wallets[0]
+        threshold = await asyncio.to_thread(self.user_manager.get_wallet_threshold, wallet.id)
+
+        settings_msg = (
+            "⚙️ *ALERT SETTINGS*\n\n"
+            "📊 *Current Thresholds:*\n"
+            f"  🟡 Warning: {threshold.threshold_warning}%\n"
+            f"  🔴 Critical: {threshold.threshold_critical}%\n"
+            f"  🚨 Urgent: {threshold.threshold_urgent}%\n\n"
+            "━━━━━━━━━━━━━━━━━━━━━\n\n"
+            "💡 *How Alerts Work:*\n"
+            "Alerts trigger when your margin usage reaches these levels.\n\n"
+            "  • *Warning*: Early heads-up\n"
+            "  • *Critical*: Action recommended\n"
+            "  • *Urgent*: Immediate action needed\n\n"
+            "━━━━━━━━━━━━━━━━━━━━━\n\n"
+            "🔧 *Change Threshold:*\n"
+            "Send a number (0-100) to set new warning level.\n\n"
+            "Examples:\n"
+            "  • `75` = Warning at 75%\n"
+            "  • `0.1` = Warning at 0.1% (testing)\n\n"
+            "Critical and Urgent levels adjust automatically (+10%, +15%)."
+        )
+
+        await update.message.reply_text(
+            settings_msg,
+            parse_mode='Markdown',
+            reply_markup=self.main_keyboard
+        )
+        return WAITING_FOR_THRESHOLD
+
+    def _is_repeat_press(self, context: ContextTypes.DEFAULT_TYPE, text: str) -> bool:
+        """
+        Record a keyboard button press and check whether it repeats the previous one
+
+        Args:
+            context: Callback context holding the user's last press
+            text: Button label
+
+        Returns: True if the same button was pressed within BUTTON_DEBOUNCE_WINDOW
+        """
+        now = time.monotonic()
+        last_text, last_pressed = context.user_data.get('last_button', (None, 0.0))
+        context.user_data['last_button'] = (text, now)
+        return text == last_text and now - last_pressed < BUTTON_DEBOUNCE_WINDOW
+
+    async def handle_conversation_button(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> Optional[int]:
+        """Handle keyboard buttons that prompt for input"""
+        text = update.message.text.strip()
+
+        # Drop duplicate presses (e.g. a double tap); None keeps the conversation state as it is
+        if self._is_repeat_press(context, text):
+            return None
+
+        return await self._conversation_buttons[text](update, context)
+
+    async def handle_menu_button(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """Handle keyboard buttons that show information"""
+        text = update.message.text.strip()
+
+        # Drop duplicate presses (e.g. a double tap) before they reach the database or API
+        if self._is_repeat_press(context, text):
             return
-        elif text == "⚙️ Settings":
-            # Get user's wallets to show current settings
-            wallets = self.user_manager.get_user_wallets(user.id)
 
-            if not wallets:
-                await update.message.reply_text(
-                    format_info_message("You have no wallets. Add one first!"),
-                    reply_markup=self.main_keyboard
-                )
-                return
+        await self._button_handlers[text](update, context)
 
-            # Get current threshold for first wallet
-            wallet = wallets[0]
-            threshold = self.user_manager.get_wallet_threshold(wallet.id)
-
-            settings_msg = (
-                "⚙️ *ALERT SETTINGS*\n\n"
-                "📊 *Current Thresholds:*\n"
-                f"  🟡 Warning: {threshold.threshold_warning}%\n"
-                f"  🔴 Critical: {threshold.threshold_critical}%\n"
-                f"  🚨 Urgent: {threshold.threshold_urgent}%\n\n"
-                "━━━━━━━━━━━━━━━━━━━━━\n\n"
-                "💡 *How Alerts Work:*\n"
-                "Alerts trigger when your margin usage reaches these levels.\n\n"
-                "  • *Warning*: Early heads-up\n"
-                "  • *Critical*: Action recommended\n"
-                "  • *Urgent*: Immediate action needed\n\n"
-                "━━━━━━━━━━━━━━━━━━━━━\n\n"
-                "🔧 *Change Threshold:*\n"
-                "Send a number (0-100) to set new warning level.\n\n"
-                "Examples:\n"
-                "  • `75` = Warning at 75%\n"
-                "  • `0.1` = Warning at 0.1% (testing)\n\n"
-                "Critical and Urgent levels adjust automatically (+10%, +15%)."
-            )
+    async def handle_text_message(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """Handle text that is neither a button nor awaited input"""
+        await update.message.reply_text(
+            "ℹ️ Use the menu buttons below or /help for more information.",
+            parse_mode='Markdown',
+            reply_markup=self.main_keyboard
+        )
+
+    async def receive_wallet_address(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
+        """Add the wallet address sent after an Add Wallet prompt"""
+        await self._add_wallet_flow(update, context, update.message.text.strip())
+        return ConversationHandler.END
+
+    async def receive_wallet_removal(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
+        """Remove the wallet address sent after a Remove Wallet prompt"""
+        user = update.effective_user
+        if not user:
+            return ConversationHandler.END
 
+        # Validate wallet address
+        is_valid, result = validate_wallet_address(update.message.text.strip())
+        if not is_valid:
             await update.message.reply_text(
-                settings_msg,
-                parse_mode='Markdown',
+                format_error_message(result),
                 reply_markup=self.main_keyboard
             )
-            context.user_data['awaiting_threshold'] = True
-            return
-        elif text == "❓ Help":
-            await self.help_command(update, context)
-            return
-
-        # Check if awaiting wallet address
-        if context.user_data.get('awaiting_wallet'):
-            context.user_data['awaiting_wallet'] = False
-            await self._add_wallet_flow(update, context, text)
-            return
+            return ConversationHandler.END
 
-        # Check if awaiting wallet removal
-        if context.user_data.get('awaiting_wallet_removal'):
-            context.user_data['awaiting_wallet_removal'] = False
+        wallet_address = result
 
-            # Validate wallet address
-            is_valid, result = validate_wallet_address(text)
-            if not is_valid:
-                await update.message.reply_text(
-                    format_error_message(result),
-                    reply_markup=self.main_keyboard
-                )
-                return
+        # Remove wallet
+        success, _ = await asyncio.to_thread(self.user_manager.remove_wallet, user.id, wallet_address)
+        self._invalidate_user_wallets(context)
 
-            wallet_address = result
+        if success:
+            await update.message.reply_text(
+                f"✅ *Wallet Removed Successfully!*\n\n"
+                f"🗑️ Stopped monitoring: `{shorten_address(wallet_address)}`\n\n"
+                f"All alerts for this wallet have been disabled.",
+                parse_mode='Markdown',
+                reply_markup=self.main_keyboard
+            )
+        else:
+            await update.message.reply_text(
+                format_error_message("Wallet not found or already removed."),
+                reply_markup=self.main_keyboard
+            )
+        return ConversationHandler.END
 
-            # Remove wallet
-            success = self.user_manager.remove_wallet(user.id, wallet_address)
+    async def receive_threshold(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
+        """Apply the threshold sent after a Set Threshold prompt"""
+        user = update.effective_user
+        if not user:
+            return ConversationHandler.END
 
-            if success:
-                await update.message.reply_text(
-                    f"✅ *Wallet Removed Successfully!*\n\n"
-                    f"🗑️ Stopped monitoring: `{wallet_address[:6]}...{wallet_address[-4:]}`\n\n"
-                    f"All alerts for this wallet have been disabled.",
-                    parse_mode='Markdown',
-                    reply_markup=self.main_keyboard
-                )
-            else:
+        try:
+            threshold = float(update.message.text.strip())
+            if not validate_threshold(threshold):
                 await update.message.reply_text(
-                    format_error_message("Wallet not found or already removed."),
+                    format_error_message("Threshold must be between 0 and 100."),
                     reply_markup=self.main_keyboard
                 )
-            return
+                return ConversationHandler.END
 
-        # Check if awaiting threshold
-        if context.user_data.get('awaiting_threshold'):
-            context.user_data['awaiting_threshold'] = False
-            try:
-                threshold = float(text)
-                if not validate_threshold(threshold):
-                    await update.message.reply_text(
-                        format_error_message("Threshold must be between 0 and 100."),
-                        reply_markup=self.main_keyboard
-                    )
-                    return
-
-                wallets = self.user_manager.get_user_wallets(user.id)
-
-                if not wallets:
-                    await update.message.reply_text(
-                        format_info_message("You have no wallets. Add one first!"),
-                        reply_markup=self.main_keyboard
-                    )
-                    return
-
-                # Set threshold for all user's wallets
-                results = []
-                for wallet in wallets:
-                    success, message = self.user_manager.set_wallet_threshold(
-                        user.id,
-                        wallet.wallet_address,
-                        threshold
-                    )
-                    results.append((success, message))
-
-                # Get new threshold values to confirm
-                wallet = wallets[0]
-                new_threshold = self.user_manager.get_wallet_threshold(wallet.id)
+            wallets = await self._get_user_wallets(context, user.id)
 
+            if not wallets:
                 await update.message.reply_text(
-                    f"✅ *Threshold Updated Successfully!*\n\n"
-                    f"📊 *New Alert Levels:*\n"
-                    f"  🟡 Warning: {new_threshold.threshold_warning}%\n"
-                    f"  🔴 Critical: {new_threshold.threshold_critical}%\n"
-                    f"  🚨 Urgent: {new_threshold.threshold_urgent}%\n\n"
-                    f"━━━━━━━━━━━━━━━━━━━━━\n\n"
-                    f"✅ Applied to {len(wallets)} wallet(s)\n"
-                    f"📡 Alerts will now trigger at these margin usage levels.",
-                    parse_mode='Markdown',
-                    reply_markup=self.main_keyboard
-                )
-            except ValueError:
-                await update.message.reply_text(
-                    format_error_message("Invalid threshold value. Please provide a number."),
+                    format_info_message("You have no wallets. Add one first!"),
                     reply_markup=self.main_keyboard
                 )
-            return
+                return ConversationHandler.END
 
-        # Default response if no state is set
-        await update.message.reply_text(
-            "ℹ️ Use the menu buttons below or /help for more information.",
-            parse_mode='Markdown',
-            reply_markup=self.main_keyboard
-        )
+            # Set threshold for all user's wallets in one write
+            updated = await asyncio.to_thread(self.user_manager.set_all_wallet_thresholds, user.id, threshold)
+            warning, critical, urgent = self.user_manager.threshold_levels(threshold)
+
+            await update.message.reply_text(
+                f"✅ *Threshold Updated Successfully!*\n\n"
+                f"📊 *New Alert Levels:*\n"
+                f"  🟡 Warning: {warning}%\n"
+                f"  🔴 Critical: {critical}%\n"
+                f"  🚨 Urgent: {urgent}%\n\n"
+                f"━━━━━━━━━━━━━━━━━━━━━\n\n"
+                f"✅ Applied to {updated} wallet(s)\n"
+                f"📡 Alerts will now trigger at these margin usage levels.",
+                parse_mode='Markdown',
+                reply_markup=self.main_keyboard
+            )
+        except ValueError:
+            await update.message.reply_text(
+                format_error_message("Invalid threshold value. Please provide a number."),
+                reply_markup=self.main_keyboard
+            )
+        return ConversationHandler.END
 
     async def send_alert(
         self,
         telegram_id: int,
         message: str,
-        add_buttons: bool = True
+        add_buttons: bool = True,
+        alert_id: Optional[int] = None
     ):
         """
-        Send alert message to user
+        Queue alert message for a user
+
+        Alerts to the same chat are delivered in order by the sender task, which stays within
+        Telegram's global and per-chat rate limits.
 
         Args:
             telegram_id: Telegram user ID
             message: Alert message text
             add_buttons: Whether to add action buttons
+            alert_id: ID of the stored alert, marked sent once Telegram has accepted the message
+        """
+        await self._send_queue.put((telegram_id, message, add_buttons, alert_id))
+
+    async def broadcast_alert(
+        self,
+        telegram_ids: List[int],
+        message: str,
+        add_buttons: bool = True
+    ):
         """
+        Queue the same alert message for several users
+
+        Args:
+            telegram_ids: Telegram user IDs
+            message: Alert message text
+            add_buttons: Whether to add action buttons
+        """
+        for telegram_id in telegram_ids:
+            await self._send_queue.put((telegram_id, message, add_buttons, None))
+
+    async def _sender_loop(self):
+        """Route queued alerts to one sender per chat, so a busy chat never holds up the others"""
+        while True:
+            telegram_id, *alert = await self._send_queue.get()
+
+            chat_queue = self._chat_queues.get(telegram_id)
+            if chat_queue is not None:
+                chat_queue.append(alert)
+                continue
+
+            self._chat_queues[telegram_id] = deque([alert])
+            task = asyncio.create_task(self._chat_sender(telegram_id))
+            self._send_tasks.add(task)
+            task.add_done_callback(self._send_tasks.discard)
+            self._prune_chat_limiters()
+
+    def _chat_limiter(self, telegram_id: int) -> TokenBucket:
+        """Per-chat bucket allowing TELEGRAM_CHAT_RATE_LIMIT messages a minute"""
+        limiter = self._chat_limiters.get(telegram_id)
+        if limiter is None:
+            limiter = self._chat_limiters[telegram_id] = TokenBucket(
+                rate=TELEGRAM_CHAT_RATE_LIMIT / 60,
+                capacity=TELEGRAM_CHAT_RATE_LIMIT
+            )
+        return limiter
+
+    def _prune_chat_limiters(self):
+        """Drop buckets of idle chats that have refilled, at most once per CHAT_LIMITER_PRUNE_INTERVAL"""
+        now = time.monotonic()
+        if now - self._chat_limiters_pruned_at < CHAT_LIMITER_PRUNE_INTERVAL:
+            return
+        self._chat_limiters_pruned_at = now
+
+        for telegram_id in [
+            telegram_id for telegram_id, limiter in self._chat_limiters.items()
+            if telegram_id not in self._chat_queues and limiter.is_full()
+        ]:
+            del self._chat_limiters[telegram_id]
+
+    async def _chat_sender(self, telegram_id: int):
+        """
+        Deliver a chat's queued alerts in order, spaced TELEGRAM_CHAT_MIN_INTERVAL apart
+        and within TELEGRAM_CHAT_RATE_LIMIT per minute
+
+        A send slot is only held while a message is going out, never while waiting on the
+        per-chat limits. The sender stays until the spacing after its last message has
+        passed; only the chat's rate limiter outlives it.
+        """
+        chat_queue = self._chat_queues[telegram_id]
+        chat_limiter = self._chat_limiter(telegram_id)
+        last_sent = None
+
+        while True:
+            if last_sent is not None:
+                wait = TELEGRAM_CHAT_MIN_INTERVAL - (time.monotonic() - last_sent)
+                if wait > 0:
+                    await asyncio.sleep(wait)
+
+            if not chat_queue:
+                del self._chat_queues[telegram_id]
+                return
+
+            message, add_buttons, alert_id = chat_queue.popleft()
+            try:
+                await chat_limiter.acquire()
+                async with self._send_slots:
+                    await self._send_limiter.acquire()
+                    delivered = await self._deliver_alert(telegram_id, message, add_buttons)
+                last_sent = time.monotonic()
+
+                if delivered and alert_id is not None:
+                    self._delivered_alert_ids.append(alert_id)
+                    if self._sent_flush_task is None:
+                        self._sent_flush_task = asyncio.create_task(self._flush_delivered_alerts())
+            finally:
+                self._send_queue.task_done()
+
+    async def _flush_delivered_alerts(self):
+        """
+        Mark delivered alerts sent, one UPDATE per batch
+
+        Deliveries within ALERT_SENT_FLUSH_DELAY of each other (a round of sends across
+        chats) share one batch, so a burst of alerts costs one commit rather than one per alert.
+        """
+        try:
+            while self._delivered_alert_ids:
+                await asyncio.sleep(ALERT_SENT_FLUSH_DELAY)
+                await self._write_delivered_alerts()
+        finally:
+            self._sent_flush_task = None
+
+    async def _write_delivered_alerts(self):
+        """Mark every alert delivered so far as sent in one write"""
+        if not self._delivered_alert_ids:
+            return
+
+        alert_ids, self._delivered_alert_ids = self._delivered_alert_ids, []
         try:
-            if add_buttons:
-                keyboard = [
-                    [
-                        InlineKeyboardButton("📊 View Portfolio", callback_data="portfolio"),
-                        InlineKeyboardButton("⚙️ Settings", callback_data="settings")
-                    ]
-                ]
-                reply_markup = InlineKeyboardMarkup(keyboard)
+            await asyncio.to_thread(self.liquidation_monitor.db.mark_alerts_sent, alert_ids)
+        except Exception as e:
+            logger.error(f"Error marking {len(alert_ids)} alerts sent: {type(e).__name__}: {e}")
+            logger.debug("Traceback:", exc_info=True)
 
+    async def _deliver_alert(
+        self,
+        telegram_id: int,
+        message: str,
+        add_buttons: bool
+    ) -> bool:
+        """Send one alert, waiting out Telegram flood control when asked to; returns whether it was delivered"""
+        for attempt in range(TELEGRAM_SEND_RETRIES):
+            try:
                 await self.application.bot.send_message(
                     chat_id=telegram_id,
                     text=message,
                     parse_mode='Markdown',
-                    reply_markup=reply_markup
-                )
-            else:
-                await self.application.bot.send_message(
-                    chat_id=telegram_id,
-                    text=message,
-                    parse_mode='Markdown'
+                    reply_markup=self.alert_markup if add_buttons else None,
+                    disable_notification=False
                 )
 
-            logger.info(f"Alert sent to user {telegram_id}")
+                logger.info(f"Alert sent to user {telegram_id}")
+                return True
 
-        except Exception as e:
-            logger.error(f"Error sending alert to {telegram_id}: {e}", exc_info=True)
+            except RetryAfter as e:
+                logger.warning(f"Flood control hit, retrying alert to {telegram_id} in {e.retry_after}s")
+                await asyncio.sleep(e.retry_after)
+
+            except Exception as e:
+                logger.error(f"Error sending alert to {telegram_id}: {type(e).__name__}: {e}")
+                logger.debug("Traceback:", exc_info=True)
+                return False
+
+        logger.error(f"Dropping alert to {telegram_id} after {TELEGRAM_SEND_RETRIES} flood control retries")
+        return False
 
     def setup(self):
         """Setup bot handlers"""
-        # Create application
-        self.application = Application.builder().token(TELEGRAM_BOT_TOKEN).build()
+        # Create application. Bot API calls share one pooled keep-alive client;
+        # getUpdates gets its own so a pending long poll never holds a send connection
+        request = HTTPXRequest(
+            connection_pool_size=TELEGRAM_CONNECTION_POOL_SIZE,
+            pool_timeout=TELEGRAM_POOL_TIMEOUT,
+            connect_timeout=TELEGRAM_CONNECT_TIMEOUT,
+            read_timeout=TELEGRAM_READ_TIMEOUT,
+            http_version="1.1"
+        )
+        get_updates_request = HTTPXRequest(
+            connection_pool_size=1,
+            connect_timeout=TELEGRAM_CONNECT_TIMEOUT,
+            read_timeout=TELEGRAM_READ_TIMEOUT,
+            http_version="1.1"
+        )
+        # Replies to commands arrive while the user is looking at the chat, so they
+        # are sent silently; link previews are off since no message needs one.
+        # Alerts opt back in to notifications in _deliver_alert.
+        defaults = Defaults(
+            disable_notification=True,
+            link_preview_options=LinkPreviewOptions(is_disabled=True)
+        )
+        self.application = (
+            Application.builder()
+            .token(TELEGRAM_BOT_TOKEN)
+            .defaults(defaults)
+            .request(request)
+            .get_updates_request(get_updates_request)
+            .build()
+        )
 
         # Add command handlers
         self.application.add_handler(CommandHandler("start", self.start_command))
@@ -972,11 +1300,34 @@ class TelegramBot:
         self.application.add_handler(CommandHandler("set_alert_threshold", self.set_alert_threshold_command))
         self.application.add_handler(CommandHandler("history", self.history_command))
 
+        # Input prompts (add/remove wallet, threshold) are a conversation, so only users who were
+        # prompted have their next text message routed to an input handler.
+        # Menu buttons and commands are not input and fall through to their own handlers.
+        menu_buttons = filters.Text(list(self._button_handlers) + list(self._conversation_buttons))
+        user_input = filters.TEXT & ~filters.COMMAND & ~menu_buttons
+        self.application.add_handler(ConversationHandler(
+            entry_points=[
+                MessageHandler(filters.Text(list(self._conversation_buttons)), self.handle_conversation_button),
+                CallbackQueryHandler(self._callback_add_wallet, pattern="^menu_add_wallet$"),
+                CallbackQueryHandler(self._callback_threshold, pattern="^menu_threshold$"),
+            ],
+            states={
+                WAITING_FOR_WALLET_ADDRESS: [MessageHandler(user_input, self.receive_wallet_address)],
+                WAITING_FOR_WALLET_REMOVAL: [MessageHandler(user_input, self.receive_wallet_removal)],
+                WAITING_FOR_THRESHOLD: [MessageHandler(user_input, self.receive_threshold)],
+            },
+            fallbacks=[],
+            allow_reentry=True
+        ))
+
         # Add callback query handler
         self.application.add_handler(CallbackQueryHandler(self.handle_callback_query))
 
-        # Add text message handler (for wallet address and threshold input)
-        # This should be last to avoid catching commands
+        # Add keyboard button handler, matched by PTB on the exact button labels
+        self.application.add_handler(MessageHandler(filters.Text(list(self._button_handlers)), self.handle_menu_button))
+
+        # Add fallback text handler for anything else
+        # This should be last to avoid catching commands and buttons
         self.application.add_handler(MessageHandler(filters.TEXT & ~filters.COMMAND, self.handle_text_message))
 
         logger.info("Telegram bot handlers configured")
@@ -985,11 +1336,49 @@ class TelegramBot:
         """Start the bot"""
         await self.application.initialize()
         await self.application.start()
-        await self.application.updater.start_polling()
-        logger.info("Telegram bot started")
+        self._sender_task = asyncio.create_task(self._sender_loop())
+
+        if TELEGRAM_WEBHOOK_URL:
+            # Push mode: Telegram delivers updates as they happen
+            await self.application.updater.start_webhook(
+                listen=TELEGRAM_WEBHOOK_LISTEN,
+                port=TELEGRAM_WEBHOOK_PORT,
+                url_path=TELEGRAM_WEBHOOK_PATH,
+                webhook_url=f"{TELEGRAM_WEBHOOK_URL.rstrip('/')}/{TELEGRAM_WEBHOOK_PATH}",
+                secret_token=TELEGRAM_WEBHOOK_SECRET,
+                allowed_updates=ALLOWED_UPDATES
+            )
+            logger.info("Telegram bot started (webhook)")
+        else:
+            # Long polling: each request waits server-side until an update arrives
+            await self.application.updater.start_polling(
+                poll_interval=0.0,
+                timeout=TELEGRAM_POLL_TIMEOUT,
+                bootstrap_retries=-1,
+                allowed_updates=ALLOWED_UPDATES
+            )
+            logger.info("Telegram bot started (polling)")
 
     async def stop(self):
         """Stop the bot"""
+        if self._sender_task:
+            # Give queued alerts a moment to go out before shutting down
+            try:
+                await asyncio.wait_for(self._send_queue.join(), timeout=TELEGRAM_SEND_DRAIN_TIMEOUT)
+            except asyncio.TimeoutError:
+                logger.warning(f"Dropping {self._send_queue.qsize()} queued alerts on shutdown")
+
+            self._sender_task.cancel()
+            for task in self._send_tasks:
+                task.cancel()
+            await asyncio.gather(self._sender_task, *self._send_tasks, return_exceptions=True)
+            self._sender_task = None
+
+            # Record what was delivered before the senders stopped
+            if self._sent_flush_task:
+                await self._sent_flush_task
+            await self._write_delivered_alerts()
+
         if self.application:
             await self.application.updater.stop()
             await self.application.stop()
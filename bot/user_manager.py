@@ -2,7 +2,10 @@
 User and Wallet Management System
 """
 import logging
-from typing import Optional, List
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional, List, Dict
 
 from data.storage import Database
 from data.models import User, Wallet, Threshold
@@ -15,6 +18,10 @@ from config.settings import (
 
 logger = logging.getLogger(__name__)
 
+# Seconds a user looked up by Telegram ID is reused before reading the database again
+USER_CACHE_TTL = 30
+USER_CACHE_SIZE = 10000
+
 
 class UserManager:
     """Manage users and their wallets"""
@@ -22,6 +29,14 @@ class UserManager:
     def __init__(self, database: Database):
         self.db = database
 
+        # telegram_id -> (monotonic time fetched, User)
+        # Handlers call in from worker threads, so access is locked
+        self._user_cache: OrderedDict = OrderedDict()
+        self._user_cache_lock = threading.Lock()
+
+        # wallet_id -> Threshold; thresholds only change through this class, so entries stay current
+        self._thresholds: Dict[int, Threshold] = {}
+
     def register_user(self, telegram_id: int, username: Optional[str] = None) -> User:
         """
         Register a new user or get existing user
@@ -34,12 +49,28 @@ class UserManager:
         """
         user = User(telegram_id=telegram_id, username=username)
         user = self.db.create_user(user)
+        with self._user_cache_lock:
+            self._user_cache.pop(telegram_id, None)
         logger.info(f"User registered: {telegram_id} (username: {username})")
         return user
 
     def get_user(self, telegram_id: int) -> Optional[User]:
-        """Get user by Telegram ID"""
-        return self.db.get_user_by_telegram_id(telegram_id)
+        """Get user by Telegram ID (reused for USER_CACHE_TTL seconds)"""
+        now = time.monotonic()
+        with self._user_cache_lock:
+            cached = self._user_cache.get(telegram_id)
+            if cached and now - cached[0] < USER_CACHE_TTL:
+                return cached[1]
+
+        user = self.db.get_user_by_telegram_id(telegram_id)
+        if user:
+            # Unknown users aren't cached, so they are found as soon as they /start
+            with self._user_cache_lock:
+                self._user_cache[telegram_id] = (now, user)
+                self._user_cache.move_to_end(telegram_id)
+                if len(self._user_cache) > USER_CACHE_SIZE:
+                    self._user_cache.popitem(last=False)
+        return user
 
     def add_wallet(
         self,
@@ -64,31 +95,23 @@ class UserManager:
         wallet_address = result
 
         # Get or create user
-        user = self.db.get_user_by_telegram_id(telegram_id)
+        user = self.get_user(telegram_id)
         if not user:
             logger.error(f"User not found: {telegram_id}")
             return False, "User not found. Please use /start first.", None
 
-        # Check if user already has this wallet
-        existing_wallets = self.db.get_user_wallets(user.id, active_only=False)
-        for w in existing_wallets:
-            if w.wallet_address == wallet_address:
-                if w.active:
-                    return False, "This wallet is already being monitored.", None
-                else:
-                    # Reactivate wallet
-                    wallet = self.db.add_wallet(
-                        Wallet(user_id=user.id, wallet_address=wallet_address)
-                    )
-                    logger.info(f"Reactivated wallet for user {telegram_id}: {wallet_address}")
-                    return True, "Wallet monitoring reactivated!", wallet
-
-        # Add new wallet
-        wallet = Wallet(user_id=user.id, wallet_address=wallet_address)
-        wallet = self.db.add_wallet(wallet)
-
-        # Create default thresholds for this wallet
-        self._create_default_thresholds(wallet.id)
+        # Add (or reactivate) the wallet with default thresholds in one transaction
+        wallet, outcome = self.db.add_wallet_with_threshold(
+            Wallet(user_id=user.id, wallet_address=wallet_address),
+            (DEFAULT_ALERT_THRESHOLD_WARNING, DEFAULT_ALERT_THRESHOLD_CRITICAL, DEFAULT_ALERT_THRESHOLD_URGENT)
+        )
+
+        if outcome == "active":
+            return False, "This wallet is already being monitored.", None
+
+        if outcome == "reactivated":
+            logger.info(f"Reactivated wallet for user {telegram_id}: {wallet_address}")
+            return True, "Wallet monitoring reactivated!", wallet
 
         logger.info(f"Added wallet for user {telegram_id}: {wallet_address}")
         return True, "Wallet added successfully! Monitoring started.", wallet
@@ -115,7 +138,7 @@ class UserManager:
         wallet_address = result
 
         # Get user
-        user = self.db.get_user_by_telegram_id(telegram_id)
+        user = self.get_user(telegram_id)
         if not user:
             return False, "User not found."
 
@@ -142,15 +165,20 @@ class UserManager:
 
         Returns: List of Wallet objects
         """
-        user = self.db.get_user_by_telegram_id(telegram_id)
+        user = self.get_user(telegram_id)
         if not user:
             return []
 
         return self.db.get_user_wallets(user.id, active_only=active_only)
 
     def get_all_monitored_wallets(self) -> List[Wallet]:
-        """Get all active wallets being monitored"""
-        return self.db.get_all_active_wallets()
+        """Get all active wallets being monitored, prefetching their thresholds in the same query"""
+        wallets = []
+        for wallet, threshold in self.db.get_active_wallets_with_thresholds():
+            wallets.append(wallet)
+            if threshold:
+                self._thresholds[wallet.id] = threshold
+        return wallets
 
     def set_wallet_threshold(
         self,
@@ -173,7 +201,7 @@ class UserManager:
             return False, "Threshold must be between 0 and 100."
 
         # Get user
-        user = self.db.get_user_by_telegram_id(telegram_id)
+        user = self.get_user(telegram_id)
         if not user:
             return False, "User not found."
 
@@ -185,17 +213,13 @@ class UserManager:
         wallet_address = result
 
         # Find wallet
-        wallets = self.db.get_user_wallets(user.id, active_only=True)
-        wallet = next((w for w in wallets if w.wallet_address == wallet_address), None)
+        wallet = self.db.get_user_wallet(user.id, wallet_address)
 
         if not wallet:
             return False, "Wallet not found or not active."
 
         # Update thresholds
-        # Adjust critical and urgent thresholds proportionally
-        warning = threshold
-        critical = min(threshold + 10, 100)
-        urgent = min(threshold + 15, 100)
+        warning, critical, urgent = self.threshold_levels(threshold)
 
         threshold_obj = Threshold(
             wallet_id=wallet.id,
@@ -204,10 +228,65 @@ class UserManager:
             threshold_urgent=urgent
         )
         self.db.upsert_threshold(threshold_obj)
+        self._thresholds[wallet.id] = threshold_obj
 
         logger.info(f"Updated threshold for wallet {wallet_address}: {warning}%")
         return True, f"Alert threshold set to {warning}% (critical: {critical}%, urgent: {urgent}%)"
 
+    def set_all_wallet_thresholds(
+        self,
+        telegram_id: int,
+        threshold: float
+    ) -> int:
+        """
+        Set custom alert threshold for all of a user's active wallets at once
+
+        Args:
+            telegram_id: Telegram user ID
+            threshold: Custom threshold percentage
+
+        Returns: Number of wallets updated
+        """
+        if not (0 <= threshold <= 100):
+            return 0
+
+        user = self.get_user(telegram_id)
+        if not user:
+            return 0
+
+        wallets = self.db.get_user_wallets(user.id, active_only=True)
+        warning, critical, urgent = self.threshold_levels(threshold)
+
+        thresholds = [
+            Threshold(
+                wallet_id=wallet.id,
+                threshold_warning=warning,
+                threshold_critical=critical,
+                threshold_urgent=urgent
+            )
+            for wallet in wallets
+        ]
+        updated = self.db.upsert_thresholds(thresholds)
+        for threshold_obj in thresholds:
+            self._thresholds[threshold_obj.wallet_id] = threshold_obj
+
+        logger.info(f"Updated threshold for {updated} wallets of user {telegram_id}: {warning}%")
+        return updated
+
+    @staticmethod
+    def threshold_levels(threshold: float) -> tuple[float, float, float]:
+        """
+        Derive the warning, critical and urgent levels from a custom threshold
+
+        Critical and urgent sit 10 and 15 points above the warning level, capped at 100.
+
+        Args:
+            threshold: Custom threshold percentage
+
+        Returns: Tuple of (warning, critical, urgent)
+        """
+        return threshold, min(threshold + 10, 100), min(threshold + 15, 100)
+
     def get_wallet_threshold(
         self,
         wallet_id: int
@@ -220,8 +299,13 @@ class UserManager:
 
         Returns: Threshold object (creates default if not exists)
         """
+        threshold = self._thresholds.get(wallet_id)
+        if threshold:
+            return threshold
+
         threshold = self.db.get_threshold(wallet_id)
         if threshold:
+            self._thresholds[wallet_id] = threshold
             return threshold
 
         # Create default
@@ -235,32 +319,16 @@ class UserManager:
             threshold_critical=DEFAULT_ALERT_THRESHOLD_CRITICAL,
             threshold_urgent=DEFAULT_ALERT_THRESHOLD_URGENT
         )
-        return self.db.upsert_threshold(threshold)
+        threshold = self.db.upsert_threshold(threshold)
+        self._thresholds[wallet_id] = threshold
+        return threshold
 
     def get_wallet_by_address(self, wallet_address: str) -> Optional[Wallet]:
-        """Get wallet by address (searches all active wallets)"""
-        all_wallets = self.db.get_all_active_wallets()
-        return next(
-            (w for w in all_wallets if w.wallet_address == wallet_address.lower()),
-            None
-        )
+        """Get the active wallet with an address"""
+        found = self.db.get_wallet_and_user_by_address(wallet_address)
+        return found[0] if found else None
 
     def get_user_by_wallet(self, wallet_address: str) -> Optional[User]:
         """Get user who owns a wallet"""
-        wallet = self.get_wallet_by_address(wallet_address)
-        if not wallet:
-            return None
-
-        # Get user by user_id
-        # Need to query database directly since we only have user_id
-        with self.db.get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute("SELECT * FROM users WHERE id = ?", (wallet.user_id,))
-            row = cursor.fetchone()
-            if row:
-                return User(
-                    id=row['id'],
-                    telegram_id=row['telegram_id'],
-                    username=row['username']
-                )
-        return None
+        found = self.db.get_wallet_and_user_by_address(wallet_address)
+        return found[1] if found else None
@@ -0,0 +1,7 @@
+"""
+Configuration package for Meridian Bot
+"""
+
+
+class SettingsError(Exception):
+    """Raised when a required setting is missing or invalid"""
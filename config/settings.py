@@ -2,10 +2,15 @@
 Configuration settings for Meridian Bot
 """
 import os
-import sys
-from dotenv import load_dotenv
+import re
+
+from config import SettingsError
+
+# Deployments (e.g. Railway) set variables in the environment; only local runs need .env
+if "TELEGRAM_BOT_TOKEN" not in os.environ:
+    from dotenv import load_dotenv
+    load_dotenv()
 
-load_dotenv()
 
 def _clean_env_value(value: str) -> str:
     """Clean environment variable value by stripping quotes and whitespace"""
@@ -19,49 +24,55 @@ def _clean_env_value(value: str) -> str:
         value = value[1:-1]
     return value
 
+# Telegram bot tokens have format: <numeric bot_id>:<at least 35 token characters>
+# Example: 123456789:ABCdefGHIjklMNOpqrsTUVwxyz
+_TELEGRAM_TOKEN_PATTERN = re.compile(r"\d+:[A-Za-z0-9_-]{35,}")
+
 def _validate_telegram_token(token: str) -> bool:
     """Validate Telegram bot token format"""
-    if not token:
-        return False
-    # Telegram bot tokens have format: <bot_id>:<token>
-    # Example: 123456789:ABCdefGHIjklMNOpqrsTUVwxyz
-    parts = token.split(':')
-    if len(parts) != 2:
-        return False
-    # First part should be numeric (bot ID)
-    if not parts[0].isdigit():
-        return False
-    # Second part should be at least 35 characters
-    if len(parts[1]) < 35:
-        return False
-    return True
+    return bool(token) and _TELEGRAM_TOKEN_PATTERN.fullmatch(token) is not None
 
 # Telegram Configuration
 _raw_token = os.getenv("TELEGRAM_BOT_TOKEN", "")
 TELEGRAM_BOT_TOKEN = _clean_env_value(_raw_token)
 
-# Validate token at startup
+# Validate token at startup (main.py reports the error and exits)
 if not TELEGRAM_BOT_TOKEN:
-    print("\n❌ ERROR: TELEGRAM_BOT_TOKEN environment variable is not set!")
-    print("Please set the TELEGRAM_BOT_TOKEN environment variable.")
-    print("\nFor Railway deployment:")
-    print("  1. Go to your Railway project")
-    print("  2. Click on 'Variables' tab")
-    print("  3. Add variable: TELEGRAM_BOT_TOKEN")
-    print("  4. Set value to your bot token (WITHOUT quotes)")
-    print("     Example: 123456789:ABCdefGHIjklMNOpqrsTUVwxyz")
-    print("  5. Redeploy your application\n")
-    sys.exit(1)
+    raise SettingsError(
+        "TELEGRAM_BOT_TOKEN environment variable is not set!\n"
+        "Please set the TELEGRAM_BOT_TOKEN environment variable.\n"
+        "\nFor Railway deployment:\n"
+        "  1. Go to your Railway project\n"
+        "  2. Click on 'Variables' tab\n"
+        "  3. Add variable: TELEGRAM_BOT_TOKEN\n"
+        "  4. Set value to your bot token (WITHOUT quotes)\n"
+        "     Example: 123456789:ABCdefGHIjklMNOpqrsTUVwxyz\n"
+        "  5. Redeploy your application"
+    )
 
 if not _validate_telegram_token(TELEGRAM_BOT_TOKEN):
-    print(f"\n❌ ERROR: Invalid TELEGRAM_BOT_TOKEN format!")
-    print(f"Token received: {TELEGRAM_BOT_TOKEN[:20]}..." if len(TELEGRAM_BOT_TOKEN) > 20 else f"Token: {TELEGRAM_BOT_TOKEN}")
-    print("\nCommon issues:")
-    print("  - Token should NOT have quotes around it in Railway")
-    print("  - Token format: <bot_id>:<token_string>")
-    print("  - Example: 123456789:ABCdefGHIjklMNOpqrsTUVwxyz")
-    print("\nGet your token from @BotFather on Telegram\n")
-    sys.exit(1)
+    _token_shown = (
+        f"Token received: {TELEGRAM_BOT_TOKEN[:20]}..." if len(TELEGRAM_BOT_TOKEN) > 20
+        else f"Token: {TELEGRAM_BOT_TOKEN}"
+    )
+    raise SettingsError(
+        "Invalid TELEGRAM_BOT_TOKEN format!\n"
+        f"{_token_shown}\n"
+        "\nCommon issues:\n"
+        "  - Token should NOT have quotes around it in Railway\n"
+        "  - Token format: <bot_id>:<token_string>\n"
+        "  - Example: 123456789:ABCdefGHIjklMNOpqrsTUVwxyz\n"
+        "\nGet your token from @BotFather on Telegram"
+    )
+
+# Telegram Update Delivery
+# Set TELEGRAM_WEBHOOK_URL (public https base URL) to receive updates by webhook instead of polling
+TELEGRAM_WEBHOOK_URL = _clean_env_value(os.getenv("TELEGRAM_WEBHOOK_URL", ""))
+TELEGRAM_WEBHOOK_PATH = "telegram"
+TELEGRAM_WEBHOOK_LISTEN = "0.0.0.0"
+TELEGRAM_WEBHOOK_PORT = int(os.getenv("PORT", "8443"))
+TELEGRAM_WEBHOOK_SECRET = _clean_env_value(os.getenv("TELEGRAM_WEBHOOK_SECRET", "")) or None
+TELEGRAM_POLL_TIMEOUT = 50  # seconds Telegram holds a long poll open waiting for updates
 
 # Reya API Configuration
 REYA_API_URL = os.getenv("REYA_API_URL", "https://api.reya.xyz")
@@ -69,6 +80,8 @@ REYA_WS_URL = os.getenv("REYA_WS_URL", "wss://ws.reya.xyz")
 
 # Database Configuration
 DATABASE_PATH = os.getenv("DATABASE_PATH", "./data/meridian.db")
+DB_POOL_SIZE = 8  # idle SQLite connections kept open for reuse
+DB_OPTIMIZE_INTERVAL = 6 * 3600  # seconds between PRAGMA optimize runs
 
 # Logging Configuration
 LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
@@ -85,8 +98,22 @@ ALERT_FREQUENCY_CRITICAL = 1800  # 30 minutes for critical alerts
 ALERT_FREQUENCY_URGENT = 300  # 5 minutes for urgent alerts
 
 # API Rate Limiting
-API_RATE_LIMIT = 30  # requests per minute
-API_REQUEST_SPACING = 0.1  # seconds between requests
+API_RATE_LIMIT = 10  # requests per second (sustained)
+API_REQUEST_BURST = 10  # requests that may start together before the rate limit applies
+API_MAX_CONNECTIONS = 64  # total pooled HTTP connections
+API_MAX_CONNECTIONS_PER_HOST = 32  # pooled connections to the Reya API host
+API_DNS_CACHE_TTL = 300  # seconds to cache DNS lookups
+API_KEEPALIVE_TIMEOUT = 75  # seconds to keep idle connections open
+API_REQUEST_TIMEOUT = 30  # seconds for a whole request
+API_CONNECT_TIMEOUT = 5  # seconds to acquire/open a connection
+API_READ_TIMEOUT = 25  # seconds between reads from the socket
+API_RETRY_MAX_DELAY = 10  # seconds, cap for jittered retry backoff
+API_RATE_LIMIT_DEFAULT_WAIT = 5  # seconds to wait on 429 without a usable Retry-After
+
+# API Response Caching (seconds to reuse quasi-static responses)
+MARKETS_CACHE_TTL = 30
+MARKET_SUMMARY_CACHE_TTL = 5
+FUNDING_HISTORY_CACHE_TTL = 60
 
 # WebSocket Configuration
 WS_RECONNECT_INITIAL_DELAY = 1  # seconds
@@ -98,6 +125,10 @@ WS_PING_TIMEOUT = 10  # seconds
 # Position Monitoring
 POSITION_UPDATE_INTERVAL = 60  # seconds for REST API fallback
 PRICE_UPDATE_INTERVAL = 5  # seconds for price checks
+MONITOR_MAX_CONCURRENCY = 16  # wallets refreshed in parallel per update tick
+WALLET_SNAPSHOT_TTL = 5  # seconds a wallet snapshot is shared between status/portfolio requests
+WALLET_SNAPSHOT_CACHE_SIZE = 5000  # wallet snapshots kept in memory
+WALLET_REFRESH_TTL = 5  # seconds a REST refresh counts as fresh for on-demand portfolio views
 
 # Risk Calculation Constants
 MAINTENANCE_MARGIN_RATIO = 0.03  # 3% maintenance margin (adjust based on Reya's actual values)
@@ -115,6 +146,17 @@ ALERT_EMOJI = {
 
 # Telegram Message Limits
 MAX_MESSAGE_LENGTH = 4096
+ALERT_HISTORY_PAGE_SIZE = 20  # alerts per /history page
+TELEGRAM_GLOBAL_RATE_LIMIT = 30  # messages per second across all chats
+TELEGRAM_CHAT_MIN_INTERVAL = 1.0  # seconds between messages to the same chat
+TELEGRAM_CHAT_RATE_LIMIT = 20  # messages per minute to the same chat
+TELEGRAM_SEND_RETRIES = 3  # attempts per alert when hitting flood control
+TELEGRAM_SEND_CONCURRENCY = 25  # alerts in flight at once (still bounded by the global rate)
+TELEGRAM_SEND_DRAIN_TIMEOUT = 5  # seconds to flush queued alerts on shutdown
+TELEGRAM_CONNECTION_POOL_SIZE = 256  # pooled keep-alive connections for Bot API calls
+TELEGRAM_POOL_TIMEOUT = 10  # seconds to wait for a free pooled connection
+TELEGRAM_CONNECT_TIMEOUT = 5  # seconds
+TELEGRAM_READ_TIMEOUT = 10  # seconds
 
 # Validation
 ETHEREUM_ADDRESS_PATTERN = r"^0x[a-fA-F0-9]{40}$"
@@ -2,11 +2,26 @@
 Data models for Meridian Bot
 """
 from dataclasses import dataclass, field
-from datetime import datetime
+from datetime import datetime, timezone
 from typing import Optional, List
 from enum import Enum
 
 
+# Bound once; model defaults read the clock on every construction
+_now = datetime.now
+_UTC = timezone.utc
+
+
+def utc_now() -> datetime:
+    """Current UTC time as a naive datetime, the form timestamps are stored in"""
+    return _now(_UTC).replace(tzinfo=None)
+
+
+def shorten_address(address: str) -> str:
+    """Display form of a wallet address used in menus, alerts and status lines, e.g. 0x1234...abcd"""
+    return f"{address[:6]}...{address[-4:]}"
+
+
 class PositionSide(Enum):
     """Position side enumeration"""
     LONG = "LONG"
@@ -21,7 +36,7 @@ class AlertSeverity(Enum):
     URGENT = "urgent"
 
 
-@dataclass
+@dataclass(slots=True)
 class User:
     """User model"""
     telegram_id: int
@@ -31,10 +46,10 @@ class User:
 
     def __post_init__(self):
         if self.created_at is None:
-            self.created_at = datetime.utcnow()
+            self.created_at = utc_now()
 
 
-@dataclass
+@dataclass(slots=True)
 class Wallet:
     """Wallet model"""
     user_id: int
@@ -42,15 +57,19 @@ class Wallet:
     active: bool = True
     id: Optional[int] = None
     created_at: Optional[datetime] = None
+    short_address: str = field(init=False, repr=False, compare=False)
 
     def __post_init__(self):
         if self.created_at is None:
-            self.created_at = datetime.utcnow()
-        # Normalize wallet address to lowercase
-        self.wallet_address = self.wallet_address.lower()
+            self.created_at = utc_now()
+        # Normalize wallet address to lowercase (database rows already are, so skip the copy for them)
+        address = self.wallet_address
+        if not address.islower():
+            self.wallet_address = address = address.lower()
+        self.short_address = shorten_address(address)
 
 
-@dataclass
+@dataclass(slots=True)
 class Position:
     """Position model"""
     wallet_id: int
@@ -67,7 +86,7 @@ class Position:
 
     def __post_init__(self):
         if self.updated_at is None:
-            self.updated_at = datetime.utcnow()
+            self.updated_at = utc_now()
 
     @property
     def position_side(self) -> PositionSide:
@@ -80,7 +99,7 @@ class Position:
         return abs(self.qty) * (self.mark_price or self.entry_price)
 
 
-@dataclass
+@dataclass(slots=True)
 class Alert:
     """Alert model"""
     wallet_id: int
@@ -96,7 +115,7 @@ class Alert:
 
     def __post_init__(self):
         if self.created_at is None:
-            self.created_at = datetime.utcnow()
+            self.created_at = utc_now()
 
     @property
     def severity_enum(self) -> AlertSeverity:
@@ -104,7 +123,7 @@ class Alert:
         return AlertSeverity(self.severity)
 
 
-@dataclass
+@dataclass(slots=True)
 class Threshold:
     """Alert threshold configuration"""
     wallet_id: int
@@ -124,7 +143,7 @@ class Threshold:
         return None
 
 
-@dataclass
+@dataclass(slots=True)
 class AccountBalance:
     """Account balance model"""
     wallet_id: int
@@ -137,7 +156,7 @@ class AccountBalance:
 
     def __post_init__(self):
         if self.updated_at is None:
-            self.updated_at = datetime.utcnow()
+            self.updated_at = utc_now()
 
     @property
     def margin_ratio(self) -> float:
@@ -147,7 +166,7 @@ class AccountBalance:
         return (self.used_margin / self.total_margin) * 100
 
 
-@dataclass
+@dataclass(slots=True)
 class MarketSummary:
     """Market summary data"""
     symbol: str
@@ -160,7 +179,7 @@ class MarketSummary:
 
     def __post_init__(self):
         if self.updated_at is None:
-            self.updated_at = datetime.utcnow()
+            self.updated_at = utc_now()
 
     @property
     def funding_rate_pct(self) -> float:
@@ -168,7 +187,7 @@ class MarketSummary:
         return self.funding_rate * 100
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class RiskMetrics:
     """Risk calculation metrics"""
     position: Position
@@ -194,3 +213,13 @@ class RiskMetrics:
         elif ratio >= 80:
             return AlertSeverity.WARNING
         return AlertSeverity.INFO
+
+
+@dataclass(slots=True, frozen=True)
+class WalletSnapshot:
+    """Stored positions and balance of a wallet, read together"""
+    positions: List[Position]
+    balance: Optional[AccountBalance]
+    margin_ratio: float
+    position_count: int
+    status: str
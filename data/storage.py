@@ -2,10 +2,13 @@
 Database storage layer for Meridian Bot
 Uses SQLite for persistent storage
 """
+import os
+import queue
 import sqlite3
 from datetime import datetime
-from typing import Optional, List
+from typing import Optional, List, Tuple, Dict
 from contextlib import contextmanager
+from urllib.request import pathname2url
 import logging
 
 from data.models import User, Wallet, Position, Alert, Threshold, AccountBalance
@@ -16,13 +19,17 @@ logger = logging.getLogger(__name__)
 class Database:
     """Database manager for Meridian Bot"""
 
-    def __init__(self, db_path: str):
+    def __init__(self, db_path: str, pool_size: int = 8):
         self.db_path = db_path
+        # Idle connections, reused instead of reconnecting and re-applying PRAGMAs per query
+        self._pool: queue.LifoQueue = queue.LifoQueue(maxsize=pool_size)
+        # Separate read-only connections for get_* queries; under WAL they never wait on the writer
+        self._read_pool: queue.LifoQueue = queue.LifoQueue(maxsize=pool_size)
         self._init_database()
 
     def _init_database(self):
         """Initialize database schema"""
-        with self.get_connection() as conn:
+        with self.transaction() as conn:
             cursor = conn.cursor()
 
             # Users table
@@ -112,49 +119,95 @@ class Database:
 
             # Create indexes for performance
             cursor.execute("CREATE INDEX IF NOT EXISTS idx_wallets_active ON wallets(active)")
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_wallets_address_active ON wallets(wallet_address, active)")
             cursor.execute("CREATE INDEX IF NOT EXISTS idx_alerts_wallet_created ON alerts(wallet_id, created_at)")
             cursor.execute("CREATE INDEX IF NOT EXISTS idx_positions_wallet ON positions(wallet_id)")
 
-            conn.commit()
             logger.info("Database initialized successfully")
 
-    @contextmanager
-    def get_connection(self):
-        """Get database connection context manager"""
-        conn = sqlite3.connect(self.db_path)
+    def _connect(self, read_only: bool = False) -> sqlite3.Connection:
+        """Open a connection that any worker thread can use"""
+        # Pooled connections live for the whole run, so their compiled statement caches stay warm;
+        # room for every distinct query this class issues
+        if read_only:
+            # The schema (and WAL mode) exist by now, since _init_database runs on the writer first
+            uri = f"file:{pathname2url(os.path.abspath(self.db_path))}?mode=ro"
+            conn = sqlite3.connect(uri, uri=True, check_same_thread=False, cached_statements=256)
+        else:
+            conn = sqlite3.connect(self.db_path, check_same_thread=False, cached_statements=256)
         conn.row_factory = sqlite3.Row
+        if not read_only:
+            # WAL lets readers run alongside a writer; NORMAL sync is safe with WAL
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+        # Keep temp tables/sorts in memory, read pages through mmap, and allow a larger page cache
+        # (64 MB, only filled as the database is read)
+        conn.execute("PRAGMA temp_store=MEMORY")
+        conn.execute("PRAGMA mmap_size=268435456")
+        conn.execute("PRAGMA cache_size=-64000")
+        return conn
+
+    @contextmanager
+    def get_connection(self, read_only: bool = False):
+        """Get pooled database connection context manager (read_only for queries that never write)"""
+        pool = self._read_pool if read_only else self._pool
+        try:
+            conn = pool.get_nowait()
+        except queue.Empty:
+            conn = self._connect(read_only)
         try:
             yield conn
         finally:
-            conn.close()
+            # Never hand an unfinished transaction to the next caller
+            if conn.in_transaction:
+                conn.rollback()
+            try:
+                pool.put_nowait(conn)
+            except queue.Full:
+                conn.close()
+
+    @contextmanager
+    def transaction(self):
+        """Get pooled connection context manager that commits on success and rolls back on error"""
+        with self.get_connection() as conn:
+            with conn:
+                yield conn
+
+    def optimize(self):
+        """Refresh query planner statistics for tables whose contents changed noticeably"""
+        try:
+            with self.get_connection() as conn:
+                conn.execute("PRAGMA optimize")
+        except sqlite3.Error as e:
+            logger.warning("PRAGMA optimize failed: %s", e)
+
+    def close(self):
+        """Refresh planner statistics, then close idle pooled connections"""
+        self.optimize()
+        for pool in (self._pool, self._read_pool):
+            while True:
+                try:
+                    pool.get_nowait().close()
+                except queue.Empty:
+                    break
 
     # User operations
     def create_user(self, user: User) -> User:
-        """Create or get existing user"""
-        with self.get_connection() as conn:
+        """Create or get existing user (refreshing the stored username)"""
+        with self.transaction() as conn:
             cursor = conn.cursor()
-            try:
-                cursor.execute(
-                    "INSERT INTO users (telegram_id, username) VALUES (?, ?)",
-                    (user.telegram_id, user.username)
-                )
-                conn.commit()
-                user.id = cursor.lastrowid
-                logger.info(f"Created user: {user.telegram_id}")
-            except sqlite3.IntegrityError:
-                # User already exists, fetch it
-                cursor.execute(
-                    "SELECT * FROM users WHERE telegram_id = ?",
-                    (user.telegram_id,)
-                )
-                row = cursor.fetchone()
-                user.id = row['id']
-                logger.info(f"User already exists: {user.telegram_id}")
+            cursor.execute("""
+                INSERT INTO users (telegram_id, username) VALUES (?, ?)
+                ON CONFLICT(telegram_id) DO UPDATE SET username = excluded.username
+                RETURNING id
+            """, (user.telegram_id, user.username))
+            user.id = cursor.fetchone()[0]
+            logger.info("Saved user: %s", user.telegram_id)
             return user
 
     def get_user_by_telegram_id(self, telegram_id: int) -> Optional[User]:
         """Get user by Telegram ID"""
-        with self.get_connection() as conn:
+        with self.get_connection(read_only=True) as conn:
             cursor = conn.cursor()
             cursor.execute("SELECT * FROM users WHERE telegram_id = ?", (telegram_id,))
             row = cursor.fetchone()
@@ -169,115 +222,233 @@ class Database:
 
     # Wallet operations
     def add_wallet(self, wallet: Wallet) -> Wallet:
-        """Add a wallet to track"""
+        """Add a wallet to track (reactivating it if it was removed)"""
+        with self.transaction() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                INSERT INTO wallets (user_id, wallet_address, active) VALUES (?, ?, 1)
+                ON CONFLICT(user_id, wallet_address) DO UPDATE SET active = 1
+                RETURNING id
+            """, (wallet.user_id, wallet.wallet_address))
+            wallet.id = cursor.fetchone()[0]
+            wallet.active = True
+            logger.info("Added wallet: %s", wallet.wallet_address)
+            return wallet
+
+    def add_wallet_with_threshold(
+        self,
+        wallet: Wallet,
+        thresholds: Tuple[float, float, float]
+    ) -> Tuple[Wallet, str]:
+        """
+        Add or reactivate a wallet and give it default thresholds, in one transaction
+
+        Args:
+            wallet: Wallet to add (its id is filled in)
+            thresholds: (warning, critical, urgent) levels, kept if the wallet already has thresholds
+
+        Returns: Tuple of (wallet, outcome), outcome being "added", "reactivated" or "active"
+        """
         with self.get_connection() as conn:
             cursor = conn.cursor()
-            try:
-                cursor.execute(
-                    "INSERT INTO wallets (user_id, wallet_address, active) VALUES (?, ?, ?)",
-                    (wallet.user_id, wallet.wallet_address, wallet.active)
-                )
-                conn.commit()
-                wallet.id = cursor.lastrowid
-                logger.info(f"Added wallet: {wallet.wallet_address}")
-            except sqlite3.IntegrityError:
-                # Wallet already exists, reactivate it
-                cursor.execute(
-                    "UPDATE wallets SET active = 1 WHERE user_id = ? AND wallet_address = ?",
-                    (wallet.user_id, wallet.wallet_address)
-                )
-                conn.commit()
+            # Take the write lock up front so the check and the write can't interleave with another add
+            cursor.execute("BEGIN IMMEDIATE")
+            cursor.execute(
+                "SELECT id, active FROM wallets WHERE user_id = ? AND wallet_address = ?",
+                (wallet.user_id, wallet.wallet_address)
+            )
+            row = cursor.fetchone()
+
+            if row and row['active']:
+                conn.rollback()
+                wallet.id = row['id']
+                return wallet, "active"
+
+            if row:
+                cursor.execute("UPDATE wallets SET active = 1 WHERE id = ?", (row['id'],))
+                wallet.id = row['id']
+                outcome = "reactivated"
+            else:
                 cursor.execute(
-                    "SELECT * FROM wallets WHERE user_id = ? AND wallet_address = ?",
+                    "INSERT INTO wallets (user_id, wallet_address, active) VALUES (?, ?, 1)",
                     (wallet.user_id, wallet.wallet_address)
                 )
-                row = cursor.fetchone()
-                wallet.id = row['id']
-                logger.info(f"Reactivated wallet: {wallet.wallet_address}")
-            return wallet
+                wallet.id = cursor.lastrowid
+                outcome = "added"
+
+            cursor.execute(
+                "INSERT OR IGNORE INTO thresholds (wallet_id, threshold_warning, threshold_critical, threshold_urgent) "
+                "VALUES (?, ?, ?, ?)",
+                (wallet.id, *thresholds)
+            )
+            conn.commit()
+            wallet.active = True
+            logger.info("Wallet %s: %s", outcome, wallet.wallet_address)
+            return wallet, outcome
 
     def remove_wallet(self, user_id: int, wallet_address: str) -> bool:
         """Deactivate a wallet"""
-        with self.get_connection() as conn:
+        with self.transaction() as conn:
             cursor = conn.cursor()
             cursor.execute(
                 "UPDATE wallets SET active = 0 WHERE user_id = ? AND wallet_address = ?",
                 (user_id, wallet_address.lower())
             )
-            conn.commit()
-            logger.info(f"Deactivated wallet: {wallet_address}")
+            logger.info("Deactivated wallet: %s", wallet_address)
             return cursor.rowcount > 0
 
     def get_user_wallets(self, user_id: int, active_only: bool = True) -> List[Wallet]:
         """Get all wallets for a user"""
-        with self.get_connection() as conn:
+        with self.get_connection(read_only=True) as conn:
             cursor = conn.cursor()
             if active_only:
                 cursor.execute(
-                    "SELECT * FROM wallets WHERE user_id = ? AND active = 1",
+                    f"SELECT {self._WALLET_COLUMNS} FROM wallets WHERE user_id = ? AND active = 1",
                     (user_id,)
                 )
             else:
-                cursor.execute("SELECT * FROM wallets WHERE user_id = ?", (user_id,))
+                cursor.execute(f"SELECT {self._WALLET_COLUMNS} FROM wallets WHERE user_id = ?", (user_id,))
 
-            return [
-                Wallet(
-                    id=row['id'],
-                    user_id=row['user_id'],
-                    wallet_address=row['wallet_address'],
-                    active=bool(row['active']),
-                    created_at=datetime.fromisoformat(row['created_at'])
-                )
-                for row in cursor.fetchall()
-            ]
+            return [self._wallet_from_row(row) for row in cursor.fetchall()]
+
+    def get_user_wallet(self, user_id: int, wallet_address: str) -> Optional[Wallet]:
+        """Get one of a user's active wallets by address"""
+        with self.get_connection(read_only=True) as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                f"SELECT {self._WALLET_COLUMNS} FROM wallets WHERE user_id = ? AND wallet_address = ? AND active = 1",
+                (user_id, wallet_address.lower())
+            )
+            row = cursor.fetchone()
+            if row:
+                return self._wallet_from_row(row)
+            return None
 
     def get_all_active_wallets(self) -> List[Wallet]:
         """Get all active wallets across all users"""
-        with self.get_connection() as conn:
+        with self.get_connection(read_only=True) as conn:
             cursor = conn.cursor()
-            cursor.execute("SELECT * FROM wallets WHERE active = 1")
+            cursor.execute(f"SELECT {self._WALLET_COLUMNS} FROM wallets WHERE active = 1")
+            return [self._wallet_from_row(row) for row in cursor.fetchall()]
+
+    def get_active_wallets_with_thresholds(self) -> List[Tuple[Wallet, Optional[Threshold]]]:
+        """Get all active wallets with their thresholds (None if not set yet) in one query"""
+        with self.get_connection(read_only=True) as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                SELECT w.id, w.user_id, w.wallet_address, w.active, w.created_at,
+                       t.id AS threshold_id, t.threshold_warning, t.threshold_critical, t.threshold_urgent
+                FROM wallets w
+                LEFT JOIN thresholds t ON t.wallet_id = w.id
+                WHERE w.active = 1
+            """)
             return [
-                Wallet(
-                    id=row['id'],
-                    user_id=row['user_id'],
-                    wallet_address=row['wallet_address'],
-                    active=bool(row['active']),
-                    created_at=datetime.fromisoformat(row['created_at'])
+                (
+                    self._wallet_from_row(row),
+                    Threshold(
+                        id=row['threshold_id'],
+                        wallet_id=row['id'],
+                        threshold_warning=row['threshold_warning'],
+                        threshold_critical=row['threshold_critical'],
+                        threshold_urgent=row['threshold_urgent']
+                    ) if row['threshold_id'] is not None else None
                 )
                 for row in cursor.fetchall()
             ]
 
+    def get_wallet_and_user_by_address(self, wallet_address: str) -> Optional[Tuple[Wallet, User]]:
+        """Get the first active wallet with an address, and its owner, in one indexed query"""
+        with self.get_connection(read_only=True) as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                SELECT w.id, w.user_id, w.wallet_address, w.active, w.created_at,
+                       u.telegram_id, u.username, u.created_at AS user_created_at
+                FROM wallets w
+                JOIN users u ON u.id = w.user_id
+                WHERE w.wallet_address = ? AND w.active = 1
+                ORDER BY w.id
+                LIMIT 1
+            """, (wallet_address.lower(),))
+            row = cursor.fetchone()
+            if not row:
+                return None
+
+            wallet = self._wallet_from_row(row)
+            user = User(
+                id=row['user_id'],
+                telegram_id=row['telegram_id'],
+                username=row['username'],
+                created_at=datetime.fromisoformat(row['user_created_at'])
+            )
+            return wallet, user
+
+    # Column order read by _wallet_from_row; the JOIN queries select these first too
+    _WALLET_COLUMNS = "id, user_id, wallet_address, active, created_at"
+
+    @staticmethod
+    def _wallet_from_row(row: sqlite3.Row) -> Wallet:
+        """Build a Wallet from a row starting with _WALLET_COLUMNS, indexing by position"""
+        return Wallet(
+            id=row[0],
+            user_id=row[1],
+            wallet_address=row[2],
+            active=bool(row[3]),
+            created_at=datetime.fromisoformat(row[4])
+        )
+
     # Position operations
+    _UPSERT_POSITION_SQL = """
+        INSERT INTO positions (wallet_id, symbol, qty, side, entry_price,
+                             mark_price, liquidation_price, margin_ratio,
+                             unrealized_pnl)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT(wallet_id, symbol) DO UPDATE SET
+            qty = excluded.qty,
+            side = excluded.side,
+            entry_price = excluded.entry_price,
+            mark_price = excluded.mark_price,
+            liquidation_price = excluded.liquidation_price,
+            margin_ratio = excluded.margin_ratio,
+            unrealized_pnl = excluded.unrealized_pnl,
+            updated_at = CURRENT_TIMESTAMP
+    """
+
+    @staticmethod
+    def _position_params(position: Position) -> tuple:
+        """Build upsert parameters for a position"""
+        return (
+            position.wallet_id, position.symbol, position.qty, position.side,
+            position.entry_price, position.mark_price, position.liquidation_price,
+            position.margin_ratio, position.unrealized_pnl
+        )
+
     def upsert_position(self, position: Position) -> Position:
         """Insert or update position"""
-        with self.get_connection() as conn:
+        with self.transaction() as conn:
             cursor = conn.cursor()
-            cursor.execute("""
-                INSERT INTO positions (wallet_id, symbol, qty, side, entry_price,
-                                     mark_price, liquidation_price, margin_ratio,
-                                     unrealized_pnl, updated_at)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                ON CONFLICT(wallet_id, symbol) DO UPDATE SET
-                    qty = excluded.qty,
-                    side = excluded.side,
-                    entry_price = excluded.entry_price,
-                    mark_price = excluded.mark_price,
-                    liquidation_price = excluded.liquidation_price,
-                    margin_ratio = excluded.margin_ratio,
-                    unrealized_pnl = excluded.unrealized_pnl,
-                    updated_at = excluded.updated_at
-            """, (
-                position.wallet_id, position.symbol, position.qty, position.side,
-                position.entry_price, position.mark_price, position.liquidation_price,
-                position.margin_ratio, position.unrealized_pnl, datetime.utcnow()
-            ))
-            conn.commit()
+            cursor.execute(
+                self._UPSERT_POSITION_SQL,
+                self._position_params(position)
+            )
             position.id = cursor.lastrowid
             return position
 
+    def upsert_positions(self, positions: List[Position]) -> int:
+        """Insert or update several positions in a single transaction"""
+        if not positions:
+            return 0
+
+        with self.transaction() as conn:
+            cursor = conn.cursor()
+            cursor.executemany(
+                self._UPSERT_POSITION_SQL,
+                [self._position_params(position) for position in positions]
+            )
+            return len(positions)
+
     def sync_wallet_positions(self, wallet_id: int, current_symbols: List[str]):
         """Delete positions that are no longer in the API response (closed positions)"""
-        with self.get_connection() as conn:
+        with self.transaction() as conn:
             cursor = conn.cursor()
             if current_symbols:
                 placeholders = ','.join('?' * len(current_symbols))
@@ -290,37 +461,75 @@ class Database:
                 cursor.execute("DELETE FROM positions WHERE wallet_id = ?", (wallet_id,))
 
             deleted = cursor.rowcount
-            conn.commit()
             if deleted > 0:
-                logger.info(f"Deleted {deleted} closed positions for wallet_id {wallet_id}")
+                logger.info("Deleted %d closed positions for wallet_id %s", deleted, wallet_id)
             return deleted
 
     def get_wallet_positions(self, wallet_id: int) -> List[Position]:
         """Get all positions for a wallet"""
-        with self.get_connection() as conn:
+        with self.get_connection(read_only=True) as conn:
+            return self._fetch_wallet_positions(conn.cursor(), wallet_id)
+
+    @staticmethod
+    def _fetch_wallet_positions(cursor: sqlite3.Cursor, wallet_id: int) -> List[Position]:
+        """Load positions for a wallet using an open cursor"""
+        cursor.execute(f"SELECT {Database._POSITION_COLUMNS} FROM positions WHERE wallet_id = ?", (wallet_id,))
+        return [Database._position_from_row(row) for row in cursor.fetchall()]
+
+    # Columns in Position field order, so rows map onto the dataclass positionally
+    _POSITION_COLUMNS = (
+        "wallet_id, symbol, qty, side, entry_price, mark_price, liquidation_price, "
+        "margin_ratio, unrealized_pnl, id, updated_at"
+    )
+
+    @staticmethod
+    def _position_from_row(row: sqlite3.Row) -> Position:
+        """Build a Position from a row of _POSITION_COLUMNS"""
+        return Position(*row[:10], datetime.fromisoformat(row[10]))
+
+    def get_wallet_state(self, wallet_id: int) -> Tuple[List[Position], Optional[AccountBalance]]:
+        """Get positions and account balance for a wallet in one connection"""
+        with self.get_connection(read_only=True) as conn:
             cursor = conn.cursor()
-            cursor.execute("SELECT * FROM positions WHERE wallet_id = ?", (wallet_id,))
-            return [
-                Position(
-                    id=row['id'],
-                    wallet_id=row['wallet_id'],
-                    symbol=row['symbol'],
-                    qty=row['qty'],
-                    side=row['side'],
-                    entry_price=row['entry_price'],
-                    mark_price=row['mark_price'],
-                    liquidation_price=row['liquidation_price'],
-                    margin_ratio=row['margin_ratio'],
-                    unrealized_pnl=row['unrealized_pnl'],
-                    updated_at=datetime.fromisoformat(row['updated_at'])
-                )
-                for row in cursor.fetchall()
-            ]
+            positions = self._fetch_wallet_positions(cursor, wallet_id)
+            balance = self._fetch_account_balance(cursor, wallet_id)
+            return positions, balance
+
+    def get_wallet_states(
+        self,
+        wallet_ids: List[int]
+    ) -> Dict[int, Tuple[List[Position], Optional[AccountBalance]]]:
+        """
+        Get positions and account balances for several wallets with one query per table
+
+        Args:
+            wallet_ids: Wallet IDs
+
+        Returns: Dict of wallet_id -> (positions, balance or None), with an entry for every ID
+        """
+        if not wallet_ids:
+            return {}
+
+        placeholders = ", ".join("?" * len(wallet_ids))
+        positions: Dict[int, List[Position]] = {wallet_id: [] for wallet_id in wallet_ids}
+        balances: Dict[int, AccountBalance] = {}
+        with self.get_connection(read_only=True) as conn:
+            cursor = conn.cursor()
+            cursor.execute(f"SELECT {self._POSITION_COLUMNS} FROM positions WHERE wallet_id IN ({placeholders})", wallet_ids)
+            for row in cursor.fetchall():
+                position = self._position_from_row(row)
+                positions[position.wallet_id].append(position)
+
+            cursor.execute(f"SELECT * FROM account_balances WHERE wallet_id IN ({placeholders})", wallet_ids)
+            for row in cursor.fetchall():
+                balances[row['wallet_id']] = self._balance_from_row(row)
+
+        return {wallet_id: (positions[wallet_id], balances.get(wallet_id)) for wallet_id in wallet_ids}
 
     # Alert operations
     def create_alert(self, alert: Alert) -> Alert:
         """Create a new alert"""
-        with self.get_connection() as conn:
+        with self.transaction() as conn:
             cursor = conn.cursor()
             cursor.execute("""
                 INSERT INTO alerts (wallet_id, alert_type, message, severity,
@@ -330,65 +539,134 @@ class Database:
                 alert.wallet_id, alert.alert_type, alert.message, alert.severity,
                 alert.position_symbol, alert.margin_ratio, alert.liquidation_price, alert.sent
             ))
-            conn.commit()
             alert.id = cursor.lastrowid
-            logger.info(f"Created alert: {alert.alert_type} for wallet_id {alert.wallet_id}")
+            logger.info("Created alert: %s for wallet_id %s", alert.alert_type, alert.wallet_id)
             return alert
 
     def mark_alert_sent(self, alert_id: int):
         """Mark alert as sent"""
-        with self.get_connection() as conn:
+        with self.transaction() as conn:
             cursor = conn.cursor()
             cursor.execute("UPDATE alerts SET sent = 1 WHERE id = ?", (alert_id,))
-            conn.commit()
+
+    def mark_alerts_sent(self, alert_ids: List[int]):
+        """Mark several alerts as sent in one statement and one commit"""
+        if not alert_ids:
+            return
+
+        placeholders = ", ".join("?" * len(alert_ids))
+        with self.transaction() as conn:
+            conn.execute(f"UPDATE alerts SET sent = 1 WHERE id IN ({placeholders})", alert_ids)
 
     def get_recent_alerts(self, wallet_id: int, hours: int = 24) -> List[Alert]:
         """Get recent alerts for a wallet"""
-        with self.get_connection() as conn:
+        with self.get_connection(read_only=True) as conn:
             cursor = conn.cursor()
-            cursor.execute("""
-                SELECT * FROM alerts
+            cursor.execute(f"""
+                SELECT {self._ALERT_COLUMNS} FROM alerts
                 WHERE wallet_id = ?
-                AND datetime(created_at) > datetime('now', '-' || ? || ' hours')
+                AND created_at > datetime('now', '-' || ? || ' hours')
                 ORDER BY created_at DESC
             """, (wallet_id, hours))
-            return [
-                Alert(
-                    id=row['id'],
-                    wallet_id=row['wallet_id'],
-                    alert_type=row['alert_type'],
-                    message=row['message'],
-                    severity=row['severity'],
-                    position_symbol=row['position_symbol'],
-                    margin_ratio=row['margin_ratio'],
-                    liquidation_price=row['liquidation_price'],
-                    sent=bool(row['sent']),
-                    created_at=datetime.fromisoformat(row['created_at'])
-                )
-                for row in cursor.fetchall()
-            ]
+            return [self._alert_from_row(row) for row in cursor.fetchall()]
+
+    def get_recent_alerts_for_wallets(
+        self,
+        wallet_ids: List[int],
+        hours: int = 24,
+        limit: Optional[int] = None,
+        offset: int = 0
+    ) -> List[Alert]:
+        """Get recent alerts for several wallets in one query, newest first, optionally one page at a time"""
+        if not wallet_ids:
+            return []
+
+        where, params = self._recent_alerts_filter(wallet_ids, hours)
+        query = f"""
+            SELECT {self._ALERT_COLUMNS} FROM alerts
+            WHERE {where}
+            ORDER BY created_at DESC, id DESC
+        """
+        if limit is not None:
+            query += " LIMIT ? OFFSET ?"
+            params += [limit, offset]
+
+        with self.get_connection(read_only=True) as conn:
+            cursor = conn.cursor()
+            cursor.execute(query, params)
+            return [self._alert_from_row(row) for row in cursor.fetchall()]
+
+    def count_recent_alerts_for_wallets(self, wallet_ids: List[int], hours: int = 24) -> int:
+        """Count recent alerts for several wallets, answered from the (wallet_id, created_at) index"""
+        if not wallet_ids:
+            return 0
+
+        where, params = self._recent_alerts_filter(wallet_ids, hours)
+        with self.get_connection(read_only=True) as conn:
+            cursor = conn.cursor()
+            cursor.execute(f"SELECT COUNT(*) FROM alerts WHERE {where}", params)
+            return cursor.fetchone()[0]
+
+    @staticmethod
+    def _recent_alerts_filter(wallet_ids: List[int], hours: int) -> Tuple[str, list]:
+        """
+        Build the WHERE clause selecting alerts for wallets within the last `hours`
+
+        created_at is stored as CURRENT_TIMESTAMP text, the same format datetime() returns,
+        so it is compared directly and the range can use idx_alerts_wallet_created.
+        """
+        placeholders = ", ".join("?" * len(wallet_ids))
+        where = f"wallet_id IN ({placeholders}) AND created_at > datetime('now', '-' || ? || ' hours')"
+        return where, [*wallet_ids, hours]
+
+    # Columns in Alert field order, so rows map onto the dataclass positionally
+    _ALERT_COLUMNS = (
+        "wallet_id, alert_type, message, severity, position_symbol, margin_ratio, "
+        "liquidation_price, id, created_at, sent"
+    )
+
+    @staticmethod
+    def _alert_from_row(row: sqlite3.Row) -> Alert:
+        """Build an Alert from a row of _ALERT_COLUMNS"""
+        return Alert(*row[:8], datetime.fromisoformat(row[8]), bool(row[9]))
 
     # Threshold operations
+    _UPSERT_THRESHOLD_SQL = """
+        INSERT INTO thresholds (wallet_id, threshold_warning, threshold_critical, threshold_urgent)
+        VALUES (?, ?, ?, ?)
+        ON CONFLICT(wallet_id) DO UPDATE SET
+            threshold_warning = excluded.threshold_warning,
+            threshold_critical = excluded.threshold_critical,
+            threshold_urgent = excluded.threshold_urgent
+    """
+
     def upsert_threshold(self, threshold: Threshold) -> Threshold:
         """Insert or update threshold"""
-        with self.get_connection() as conn:
+        with self.transaction() as conn:
             cursor = conn.cursor()
-            cursor.execute("""
-                INSERT INTO thresholds (wallet_id, threshold_warning, threshold_critical, threshold_urgent)
-                VALUES (?, ?, ?, ?)
-                ON CONFLICT(wallet_id) DO UPDATE SET
-                    threshold_warning = excluded.threshold_warning,
-                    threshold_critical = excluded.threshold_critical,
-                    threshold_urgent = excluded.threshold_urgent
-            """, (threshold.wallet_id, threshold.threshold_warning,
-                  threshold.threshold_critical, threshold.threshold_urgent))
-            conn.commit()
+            cursor.execute(self._UPSERT_THRESHOLD_SQL, (
+                threshold.wallet_id, threshold.threshold_warning,
+                threshold.threshold_critical, threshold.threshold_urgent
+            ))
             threshold.id = cursor.lastrowid
             return threshold
 
+    def upsert_thresholds(self, thresholds: List[Threshold]) -> int:
+        """Insert or update several thresholds in a single transaction"""
+        if not thresholds:
+            return 0
+
+        with self.transaction() as conn:
+            cursor = conn.cursor()
+            cursor.executemany(self._UPSERT_THRESHOLD_SQL, [
+                (t.wallet_id, t.threshold_warning, t.threshold_critical, t.threshold_urgent)
+                for t in thresholds
+            ])
+            return len(thresholds)
+
     def get_threshold(self, wallet_id: int) -> Optional[Threshold]:
         """Get threshold for a wallet"""
-        with self.get_connection() as conn:
+        with self.get_connection(read_only=True) as conn:
             cursor = conn.cursor()
             cursor.execute("SELECT * FROM thresholds WHERE wallet_id = ?", (wallet_id,))
             row = cursor.fetchone()
@@ -405,40 +683,48 @@ class Database:
     # Account balance operations
     def upsert_account_balance(self, balance: AccountBalance) -> AccountBalance:
         """Insert or update account balance"""
-        with self.get_connection() as conn:
+        with self.transaction() as conn:
             cursor = conn.cursor()
             cursor.execute("""
                 INSERT INTO account_balances (wallet_id, total_margin, used_margin,
-                                             available_margin, unrealized_pnl, updated_at)
-                VALUES (?, ?, ?, ?, ?, ?)
+                                             available_margin, unrealized_pnl)
+                VALUES (?, ?, ?, ?, ?)
                 ON CONFLICT(wallet_id) DO UPDATE SET
                     total_margin = excluded.total_margin,
                     used_margin = excluded.used_margin,
                     available_margin = excluded.available_margin,
                     unrealized_pnl = excluded.unrealized_pnl,
-                    updated_at = excluded.updated_at
+                    updated_at = CURRENT_TIMESTAMP
             """, (
                 balance.wallet_id, balance.total_margin, balance.used_margin,
-                balance.available_margin, balance.unrealized_pnl, datetime.utcnow()
+                balance.available_margin, balance.unrealized_pnl
             ))
-            conn.commit()
             balance.id = cursor.lastrowid
             return balance
 
     def get_account_balance(self, wallet_id: int) -> Optional[AccountBalance]:
         """Get account balance for a wallet"""
-        with self.get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute("SELECT * FROM account_balances WHERE wallet_id = ?", (wallet_id,))
-            row = cursor.fetchone()
-            if row:
-                return AccountBalance(
-                    id=row['id'],
-                    wallet_id=row['wallet_id'],
-                    total_margin=row['total_margin'],
-                    used_margin=row['used_margin'],
-                    available_margin=row['available_margin'],
-                    unrealized_pnl=row['unrealized_pnl'],
-                    updated_at=datetime.fromisoformat(row['updated_at'])
-                )
-            return None
+        with self.get_connection(read_only=True) as conn:
+            return self._fetch_account_balance(conn.cursor(), wallet_id)
+
+    @staticmethod
+    def _fetch_account_balance(cursor: sqlite3.Cursor, wallet_id: int) -> Optional[AccountBalance]:
+        """Load account balance for a wallet using an open cursor"""
+        cursor.execute("SELECT * FROM account_balances WHERE wallet_id = ?", (wallet_id,))
+        row = cursor.fetchone()
+        if row:
+            return Database._balance_from_row(row)
+        return None
+
+    @staticmethod
+    def _balance_from_row(row: sqlite3.Row) -> AccountBalance:
+        """Build an AccountBalance from an account_balances table row"""
+        return AccountBalance(
+            id=row['id'],
+            wallet_id=row['wallet_id'],
+            total_margin=row['total_margin'],
+            used_margin=row['used_margin'],
+            available_margin=row['available_margin'],
+            unrealized_pnl=row['unrealized_pnl'],
+            updated_at=datetime.fromisoformat(row['updated_at'])
+        )
@@ -11,9 +11,16 @@ from pathlib import Path
 # Add project root to path
 sys.path.insert(0, str(Path(__file__).parent))
 
-from config.settings import DATABASE_PATH
+from config import SettingsError
+
+try:
+    from config.settings import DATABASE_PATH, DB_POOL_SIZE, DB_OPTIMIZE_INTERVAL
+except SettingsError as e:
+    print(f"\n❌ ERROR: {e}\n")
+    sys.exit(1)
+
 from data.storage import Database
-from bot.reya_client import ReyaAPIClient
+from bot.reya_client import get_reya_client, close_reya_client
 from bot.risk_calculator import RiskCalculator
 from bot.user_manager import UserManager
 from bot.liquidation_monitor import LiquidationMonitor
@@ -35,6 +42,7 @@ class MeridianBot:
         self.risk_calculator = None
         self.liquidation_monitor = None
         self.telegram_bot = None
+        self.optimize_task = None
         self.shutdown_event = asyncio.Event()
 
     async def initialize(self):
@@ -48,11 +56,12 @@ class MeridianBot:
 
             # Initialize database
             logger.info("Initializing database...")
-            self.db = Database(DATABASE_PATH)
+            self.db = Database(DATABASE_PATH, pool_size=DB_POOL_SIZE)
 
             # Initialize Reya API client
             logger.info("Initializing Reya API client...")
-            self.reya_client = ReyaAPIClient()
+            # Shared with anything else using get_reya_client(), so there is one connection pool
+            self.reya_client = get_reya_client()
 
             # Initialize WebSocket manager
             logger.info("Initializing WebSocket manager...")
@@ -100,18 +109,21 @@ class MeridianBot:
         logger.info("🚀 Starting Meridian Bot...")
 
         try:
-            # Connect WebSocket
-            logger.info("Connecting to WebSocket...")
-            await self.ws_manager.connect()
-
-            # Start Telegram bot
-            logger.info("Starting Telegram bot...")
-            await self.telegram_bot.start()
+            # Connect WebSocket and start Telegram bot concurrently; both are network round trips
+            # and neither depends on the other
+            logger.info("Connecting to WebSocket and starting Telegram bot...")
+            await asyncio.gather(
+                self.ws_manager.connect(),
+                self.telegram_bot.start()
+            )
 
             # Start monitoring existing wallets
             logger.info("Starting position monitoring...")
             await self.liquidation_monitor.start_all_monitoring()
 
+            # Keep query planner statistics current as alerts and positions accumulate
+            self.optimize_task = asyncio.create_task(self._periodic_optimize())
+
             logger.info("✅ Meridian Bot is now running!")
             logger.info("━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━")
             logger.info("Bot is monitoring positions and ready to send alerts")
@@ -125,11 +137,20 @@ class MeridianBot:
             logger.error(f"❌ Error during startup: {e}", exc_info=True)
             raise
 
+    async def _periodic_optimize(self):
+        """Run PRAGMA optimize every DB_OPTIMIZE_INTERVAL seconds"""
+        while True:
+            await asyncio.sleep(DB_OPTIMIZE_INTERVAL)
+            await asyncio.to_thread(self.db.optimize)
+
     async def stop(self):
         """Stop the bot gracefully"""
         logger.info("🛑 Stopping Meridian Bot...")
 
         try:
+            if self.optimize_task:
+                self.optimize_task.cancel()
+
             # Stop monitoring
             if self.liquidation_monitor:
                 logger.info("Stopping position monitoring...")
@@ -148,16 +169,20 @@ class MeridianBot:
             # Close Reya API client
             if self.reya_client:
                 logger.info("Closing Reya API client...")
-                await self.reya_client.close()
+                await close_reya_client()
+
+            # Refresh planner statistics and close pooled database connections
+            if self.db:
+                self.db.close()
 
             logger.info("✅ Meridian Bot stopped successfully")
 
         except Exception as e:
             logger.error(f"Error during shutdown: {e}", exc_info=True)
 
-    def handle_shutdown_signal(self, signum, frame):
-        """Handle shutdown signals"""
-        logger.info(f"Received signal {signum}, initiating shutdown...")
+    def handle_shutdown_signal(self, signum: int):
+        """Handle shutdown signals (called on the event loop)"""
+        logger.info(f"Received signal {signal.Signals(signum).name}, initiating shutdown...")
         self.shutdown_event.set()
 
 
@@ -165,12 +190,14 @@ async def main():
     """Main entry point"""
     bot = MeridianBot()
 
-    # Setup signal handlers
-    def signal_handler(signum, frame):
-        bot.handle_shutdown_signal(signum, frame)
-
-    signal.signal(signal.SIGINT, signal_handler)
-    signal.signal(signal.SIGTERM, signal_handler)
+    # Setup signal handlers on the event loop, so the shutdown event is set from loop context
+    loop = asyncio.get_running_loop()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(signum, bot.handle_shutdown_signal, signum)
+        except NotImplementedError:
+            # Not supported on Windows event loops; Ctrl+C still raises KeyboardInterrupt there
+            pass
 
     try:
         # Initialize
@@ -205,6 +232,13 @@ if __name__ == "__main__":
     Version 1.0.0
     """)
 
+    # Use uvloop's event loop when it is installed
+    try:
+        import uvloop
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    except ImportError:
+        pass
+
     # Run the bot
     try:
         asyncio.run(main())
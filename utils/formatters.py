@@ -3,8 +3,8 @@ Message formatting utilities for Telegram
 """
 from datetime import datetime
 from typing import Optional, List
-from data.models import Position, RiskMetrics, Alert, AlertSeverity
-from config.settings import ALERT_EMOJI, MAX_MESSAGE_LENGTH
+from data.models import Position, RiskMetrics, Alert, AlertSeverity, shorten_address
+from config.settings import ALERT_EMOJI, MAX_MESSAGE_LENGTH, ALERT_HISTORY_PAGE_SIZE
 
 
 def format_price(price: float) -> str:
@@ -30,26 +30,34 @@ def format_position_side(side: str) -> str:
         return "📉 SHORT"
 
 
+_SEPARATOR = "━" * 33
+_LIQUIDATION_ALERT_TITLE = f"{ALERT_EMOJI['urgent']} LIQUIDATION RISK ALERT - MERIDIAN"
+_PORTFOLIO_HEADER = f"📈 PORTFOLIO SUMMARY\n{_SEPARATOR}\n\n"
+
+# Labels resolved once at import: triggered alert levels, then margin ratio bands (highest first)
+_ALERT_LEVEL_LABELS = {
+    "urgent": f"{ALERT_EMOJI['urgent']} 🚨 URGENT ALERT",
+    "critical": f"{ALERT_EMOJI['critical']} 🔴 CRITICAL ALERT",
+    "warning": f"{ALERT_EMOJI['warning']} 🟡 WARNING ALERT",
+}
+_RISK_BANDS = (
+    (95, f"{ALERT_EMOJI['urgent']} CRITICAL"),
+    (90, f"{ALERT_EMOJI['critical']} HIGH RISK"),
+    (80, f"{ALERT_EMOJI['warning']} WARNING"),
+)
+_HEALTHY_LABEL = f"{ALERT_EMOJI['success']} HEALTHY"
+
+
 def format_risk_level(margin_ratio: float, alert_level: Optional[str] = None) -> str:
     """Format risk level with emoji and color indicator"""
     # If an alert was triggered, show the alert level
-    if alert_level:
-        if alert_level == "urgent":
-            return f"{ALERT_EMOJI['urgent']} 🚨 URGENT ALERT ({margin_ratio:.1f}%)"
-        elif alert_level == "critical":
-            return f"{ALERT_EMOJI['critical']} 🔴 CRITICAL ALERT ({margin_ratio:.1f}%)"
-        elif alert_level == "warning":
-            return f"{ALERT_EMOJI['warning']} 🟡 WARNING ALERT ({margin_ratio:.1f}%)"
+    label = _ALERT_LEVEL_LABELS.get(alert_level) if alert_level else None
 
     # Default risk level display (no alert triggered)
-    if margin_ratio >= 95:
-        return f"{ALERT_EMOJI['urgent']} CRITICAL ({margin_ratio:.1f}%)"
-    elif margin_ratio >= 90:
-        return f"{ALERT_EMOJI['critical']} HIGH RISK ({margin_ratio:.1f}%)"
-    elif margin_ratio >= 80:
-        return f"{ALERT_EMOJI['warning']} WARNING ({margin_ratio:.1f}%)"
-    else:
-        return f"{ALERT_EMOJI['success']} HEALTHY ({margin_ratio:.1f}%)"
+    if label is None:
+        label = next((band for floor, band in _RISK_BANDS if margin_ratio >= floor), _HEALTHY_LABEL)
+
+    return f"{label} ({margin_ratio:.1f}%)"
 
 
 def format_liquidation_alert(risk_metrics: RiskMetrics, wallet_address: str, alert_level: Optional[str] = None) -> str:
@@ -67,52 +75,52 @@ def format_liquidation_alert(risk_metrics: RiskMetrics, wallet_address: str, ale
     balance = risk_metrics.account_balance
 
     # Truncate wallet address
-    wallet_short = f"{wallet_address[:6]}...{wallet_address[-4:]}"
-
-    # Build message
-    lines = [
-        f"{ALERT_EMOJI['urgent']} LIQUIDATION RISK ALERT - MERIDIAN",
-        "━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━",
-        "",
-        f"Wallet: `{wallet_short}`",
-        f"Symbol: {position.symbol}",
-        f"Side: {format_position_side(position.side)}",
-        f"Size: {abs(position.qty):.4f}",
-        f"Entry Price: {format_price(position.entry_price)}",
-    ]
+    wallet_short = shorten_address(wallet_address)
 
+    # Optional lines, each with its own newline so absent ones leave no gap
+    current_price_line = ""
     if position.mark_price:
-        lines.append(f"Current Price: {format_price(position.mark_price)}")
-
-    lines.extend([
-        f"Margin Ratio: {format_risk_level(balance.margin_ratio, alert_level)}",
-        f"Liquidation Price: {format_price(risk_metrics.liquidation_price)}",
-        f"Distance to Liquidation: {format_percentage(risk_metrics.distance_to_liquidation)}",
-    ])
+        current_price_line = f"Current Price: {format_price(position.mark_price)}\n"
 
+    time_line = ""
     if risk_metrics.estimated_hours_to_liquidation:
         hours = risk_metrics.estimated_hours_to_liquidation
         if hours < 24:
             time_str = f"~{hours:.1f} hours"
         else:
             time_str = f"~{hours/24:.1f} days"
-        lines.append(f"Time to Liquidation: {time_str} (if trend continues)")
+        time_line = f"Time to Liquidation: {time_str} (if trend continues)\n"
 
+    pnl_line = ""
     if position.unrealized_pnl:
         pnl_emoji = "🟢" if position.unrealized_pnl > 0 else "🔴"
-        lines.append(f"Unrealized P&L: {pnl_emoji} ${position.unrealized_pnl:,.2f}")
-
-    lines.extend([
-        "",
-        "━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━",
-        "💡 Recommendations:",
-    ])
+        pnl_line = f"Unrealized P&L: {pnl_emoji} ${position.unrealized_pnl:,.2f}\n"
 
-    # Add recommendations
-    for i, recommendation in enumerate(risk_metrics.recommended_actions[:3], 1):
-        lines.append(f"{i}. {recommendation}")
+    recommendations = "".join(
+        f"\n{i}. {recommendation}"
+        for i, recommendation in enumerate(risk_metrics.recommended_actions[:3], 1)
+    )
 
-    message = "\n".join(lines)
+    # Build message
+    message = (
+        f"{_LIQUIDATION_ALERT_TITLE}\n"
+        f"{_SEPARATOR}\n"
+        "\n"
+        f"Wallet: `{wallet_short}`\n"
+        f"Symbol: {position.symbol}\n"
+        f"Side: {format_position_side(position.side)}\n"
+        f"Size: {abs(position.qty):.4f}\n"
+        f"Entry Price: {format_price(position.entry_price)}\n"
+        f"{current_price_line}"
+        f"Margin Ratio: {format_risk_level(balance.margin_ratio, alert_level)}\n"
+        f"Liquidation Price: {format_price(risk_metrics.liquidation_price)}\n"
+        f"Distance to Liquidation: {format_percentage(risk_metrics.distance_to_liquidation)}\n"
+        f"{time_line}"
+        f"{pnl_line}"
+        "\n"
+        f"{_SEPARATOR}\n"
+        f"💡 Recommendations:{recommendations}"
+    )
 
     # Truncate if too long
     if len(message) > MAX_MESSAGE_LENGTH:
@@ -121,8 +129,8 @@ def format_liquidation_alert(risk_metrics: RiskMetrics, wallet_address: str, ale
     return message
 
 
-def format_position_summary(position: Position, balance: Optional[dict] = None) -> str:
-    """Format position summary"""
+def _position_lines(position: Position) -> List[str]:
+    """Lines of a position summary, so the portfolio summary can extend its own list with them"""
     lines = [
         f"📊 {position.symbol}",
         f"  {format_position_side(position.side)} | Size: {abs(position.qty):.4f}",
@@ -139,7 +147,12 @@ def format_position_summary(position: Position, balance: Optional[dict] = None)
         pnl_emoji = "🟢" if position.unrealized_pnl > 0 else "🔴"
         lines.append(f"  P&L: {pnl_emoji} ${position.unrealized_pnl:,.2f}")
 
-    return "\n".join(lines)
+    return lines
+
+
+def format_position_summary(position: Position, balance: Optional[dict] = None) -> str:
+    """Format position summary"""
+    return "\n".join(_position_lines(position))
 
 
 def format_portfolio_summary(
@@ -148,13 +161,8 @@ def format_portfolio_summary(
     wallet_address: str
 ) -> str:
     """Format complete portfolio summary"""
-    wallet_short = f"{wallet_address[:6]}...{wallet_address[-4:]}"
-
     lines = [
-        "📈 PORTFOLIO SUMMARY",
-        "━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━",
-        "",
-        f"Wallet: `{wallet_short}`",
+        f"{_PORTFOLIO_HEADER}Wallet: `{shorten_address(wallet_address)}`",
         "",
         "💰 BALANCE:",
     ]
@@ -184,9 +192,9 @@ def format_portfolio_summary(
     if not positions:
         lines.append("  No open positions")
     else:
-        lines.append("━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━")
+        lines.append(_SEPARATOR)
         for position in positions[:10]:
-            lines.append(format_position_summary(position))
+            lines.extend(_position_lines(position))
             lines.append("")
 
         if len(positions) > 10:
@@ -269,18 +277,22 @@ def format_help_message() -> str:
 """
 
 
-def format_alert_history(alerts: List[Alert]) -> str:
-    """Format alert history"""
+def format_alert_history(alerts: List[Alert], page: int = 0) -> str:
+    """Format alert history (page is zero-based and only shown past the first page)"""
     if not alerts:
         return f"{ALERT_EMOJI['info']} No alerts in the last 24 hours. All positions are healthy!"
 
+    title = "📜 ALERT HISTORY (Last 24h)"
+    if page:
+        title += f" - Page {page + 1}"
+
     lines = [
-        "📜 ALERT HISTORY (Last 24h)",
-        "━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━",
+        title,
+        _SEPARATOR,
         ""
     ]
 
-    for alert in alerts[:20]:  # Limit to 20 recent alerts
+    for alert in alerts[:ALERT_HISTORY_PAGE_SIZE]:
         severity_emoji = ALERT_EMOJI.get(alert.severity, "ℹ️")
         timestamp = alert.created_at.strftime("%m/%d %H:%M") if alert.created_at else "N/A"
 
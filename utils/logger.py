@@ -1,9 +1,11 @@
 """
 Logging configuration for Meridian Bot
 """
+import atexit
 import logging
 import os
-from logging.handlers import RotatingFileHandler
+import queue
+from logging.handlers import RotatingFileHandler, QueueHandler, QueueListener
 from config.settings import LOG_LEVEL, LOG_FILE
 
 
@@ -11,6 +13,9 @@ def setup_logger(name: str = "meridian") -> logging.Logger:
     """
     Setup logger with file and console handlers
 
+    Records are queued and written by a background thread, so logging never
+    blocks the event loop on disk or console I/O.
+
     Args:
         name: Logger name
 
@@ -52,9 +57,14 @@ def setup_logger(name: str = "meridian") -> logging.Logger:
     file_handler.setFormatter(formatter)
     console_handler.setFormatter(formatter)
 
-    # Add handlers
-    logger.addHandler(file_handler)
-    logger.addHandler(console_handler)
+    # Add handlers behind a queue; the listener thread does the writes
+    log_queue: queue.Queue = queue.Queue(-1)
+    listener = QueueListener(log_queue, file_handler, console_handler, respect_handler_level=True)
+    listener.start()
+    # Flush whatever is still queued when the process exits
+    atexit.register(listener.stop)
+
+    logger.addHandler(QueueHandler(log_queue))
 
     return logger
 
@@ -0,0 +1,34 @@
+"""
+Async rate limiting utilities
+"""
+import asyncio
+import time
+
+
+class TokenBucket:
+    """Async token bucket: allows short bursts while capping the sustained rate"""
+
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate  # tokens added per second
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated_at = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        """Wait until a token is available and take it"""
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+                self.updated_at = now
+
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+    def is_full(self) -> bool:
+        """True once the bucket has refilled to capacity, when it no longer limits anything"""
+        return self.tokens + (time.monotonic() - self.updated_at) * self.rate >= self.capacity
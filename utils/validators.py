@@ -2,9 +2,20 @@
 Input validation utilities
 """
 import re
-from typing import Optional
+from functools import lru_cache
+from typing import Optional, List
 from config.settings import ETHEREUM_ADDRESS_PATTERN
 
+# Compiled once; address checks run on every wallet command
+_match_ethereum_address = re.compile(ETHEREUM_ADDRESS_PATTERN).match
+
+ETHEREUM_ADDRESS_LENGTH = 42
+
+_INVALID_ADDRESS_MESSAGE = (
+    "Invalid wallet address format. "
+    "Must be 42 characters starting with '0x' followed by 40 hex characters."
+)
+
 
 def is_valid_ethereum_address(address: str) -> bool:
     """
@@ -15,12 +26,12 @@ def is_valid_ethereum_address(address: str) -> bool:
 
     Returns: True if valid, False otherwise
     """
-    if not address:
+    # Reject the wrong length or prefix without running the regex
+    if not address or len(address) != ETHEREUM_ADDRESS_LENGTH or not address.startswith('0x'):
         return False
 
     # Check format using regex
-    pattern = re.compile(ETHEREUM_ADDRESS_PATTERN)
-    return bool(pattern.match(address))
+    return _match_ethereum_address(address) is not None
 
 
 def validate_threshold(threshold: float) -> bool:
@@ -50,17 +61,20 @@ def validate_wallet_address(address: str) -> tuple[bool, Optional[str]]:
     # Remove whitespace
     address = address.strip()
 
-    # Check format
-    if not is_valid_ethereum_address(address):
-        return False, (
-            "Invalid wallet address format. "
-            "Must be 42 characters starting with '0x' followed by 40 hex characters."
-        )
+    # Anything of the wrong length can't match, so skip the regex (and keep the cache to address-sized keys)
+    if len(address) != ETHEREUM_ADDRESS_LENGTH:
+        return False, _INVALID_ADDRESS_MESSAGE
+
+    return _check_wallet_address(address)
 
-    # Normalize to lowercase
-    normalized = address.lower()
 
-    return True, normalized
+@lru_cache(maxsize=4096)
+def _check_wallet_address(address: str) -> tuple[bool, str]:
+    """Check format and normalize to lowercase; the same addresses are revalidated on every wallet action"""
+    if not is_valid_ethereum_address(address):
+        return False, _INVALID_ADDRESS_MESSAGE
+
+    return True, address.lower()
 
 
 def validate_alert_frequency(seconds: int) -> bool:
@@ -76,6 +90,27 @@ def validate_alert_frequency(seconds: int) -> bool:
     return 60 <= seconds <= 86400
 
 
+class _SanitizeTable(dict):
+    """
+    str.translate table that drops non-printable characters except newline and tab
+
+    Entries are filled in the first time a character is seen, so later lookups stay in C.
+    """
+
+    # Cap on cached code points, so unusual input can't grow the table without bound
+    MAX_ENTRIES = 65536
+
+    def __missing__(self, codepoint: int) -> Optional[int]:
+        char = chr(codepoint)
+        value = codepoint if char.isprintable() or char in '\n\t' else None
+        if len(self) < self.MAX_ENTRIES:
+            self[codepoint] = value
+        return value
+
+
+_SANITIZE_TABLE = _SanitizeTable()
+
+
 def sanitize_input(text: str, max_length: int = 1000) -> str:
     """
     Sanitize user input text
@@ -90,10 +125,7 @@ def sanitize_input(text: str, max_length: int = 1000) -> str:
         return ""
 
     # Remove control characters except newline and tab
-    sanitized = ''.join(
-        char for char in text
-        if char.isprintable() or char in ['\n', '\t']
-    )
+    sanitized = text.translate(_SANITIZE_TABLE)
 
     # Truncate to max length
     return sanitized[:max_length]
@@ -108,28 +140,29 @@ def validate_position_data(position_data: dict) -> bool:
 
     Returns: True if valid, False otherwise
     """
-    required_fields = ['symbol', 'qty', 'side', 'entry_price']
-
-    for field in required_fields:
-        if field not in position_data:
-            return False
+    # Read each field once; a missing key fails the same way as an empty value
+    try:
+        symbol = position_data['symbol']
+        qty = position_data['qty']
+        side = position_data['side']
+        entry_price = position_data['entry_price']
+    except KeyError:
+        return False
 
-        # Check for None or empty values
-        if position_data[field] is None or position_data[field] == '':
-            return False
+    if symbol is None or symbol == '' or side is None or side == '':
+        return False
+    if qty is None or qty == '' or entry_price is None or entry_price == '':
+        return False
 
     # Validate numeric fields
     try:
-        float(position_data['qty'])
-        float(position_data['entry_price'])
+        float(qty)
+        float(entry_price)
     except (ValueError, TypeError):
         return False
 
     # Validate side
-    if position_data['side'].upper() not in ['LONG', 'SHORT']:
-        return False
-
-    return True
+    return side.upper() in ('LONG', 'SHORT')
 
 
 def validate_balance_data(balance_data: dict) -> bool:
@@ -141,27 +174,68 @@ def validate_balance_data(balance_data: dict) -> bool:
 
     Returns: True if valid, False otherwise
     """
-    required_fields = ['total_margin', 'used_margin', 'available_margin']
-
-    for field in required_fields:
-        if field not in balance_data:
-            return False
-
-        # Check for None values
-        if balance_data[field] is None:
-            return False
-
-    # Validate numeric fields
     try:
-        total = float(balance_data['total_margin'])
-        used = float(balance_data['used_margin'])
-        available = float(balance_data['available_margin'])
+        total = balance_data['total_margin']
+        used = balance_data['used_margin']
+        available = balance_data['available_margin']
+    except KeyError:
+        return False
 
-        # Basic sanity checks
-        if total < 0 or used < 0 or available < 0:
-            return False
+    if total is None or used is None or available is None:
+        return False
 
+    # Validate numeric fields with basic sanity checks
+    try:
+        return not (float(total) < 0 or float(used) < 0 or float(available) < 0)
     except (ValueError, TypeError):
         return False
 
-    return True
+
+def normalize_balance_data(balance_data) -> List[dict]:
+    """
+    Normalize account balance payloads to a list of account dictionaries
+
+    Accepts a list of accounts, a single account dictionary, or an envelope
+    with the accounts under a 'balances' or 'data' key.
+
+    Args:
+        balance_data: Balance payload from the REST API or WebSocket
+
+    Returns: List of account balance dictionaries
+    """
+    if isinstance(balance_data, list):
+        return balance_data
+
+    if isinstance(balance_data, dict):
+        for key in ('balances', 'data'):
+            if key in balance_data:
+                return normalize_balance_data(balance_data[key])
+        return [balance_data]
+
+    return []
+
+
+def normalize_positions_data(positions_data) -> List[dict]:
+    """
+    Normalize position payloads to a list of position dictionaries
+
+    Accepts a list of positions, a single position dictionary, or an envelope
+    (such as a WebSocket update) with the positions under a 'positions' or 'data' key.
+    An envelope without positions yields an empty list rather than being read as a position.
+
+    Args:
+        positions_data: Position payload from the REST API or WebSocket
+
+    Returns: List of position dictionaries
+    """
+    if isinstance(positions_data, list):
+        return positions_data
+
+    if isinstance(positions_data, dict):
+        for key in ('positions', 'data'):
+            if key in positions_data:
+                return normalize_positions_data(positions_data[key])
+        if 'symbol' in positions_data:
+            return [positions_data]
+
+    return []
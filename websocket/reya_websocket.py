@@ -5,10 +5,22 @@ Handles WebSocket connections to Reya.xyz
 import asyncio
 import json
 import logging
-from typing import Dict, Callable, Any, Optional, Set
+from typing import Dict, Callable, Any, List, NamedTuple, Optional, Union
 import websockets
 from websockets.exceptions import ConnectionClosed, WebSocketException
 
+try:
+    # orjson decodes the small update payloads several times faster than json
+    import orjson
+    _json_loads = orjson.loads
+
+    def _json_dumps(obj: Any) -> str:
+        # Decoded so subscriptions still go out as text frames
+        return orjson.dumps(obj).decode()
+except ImportError:
+    _json_loads = json.loads
+    _json_dumps = json.dumps
+
 from config.settings import (
     REYA_WS_URL,
     WS_RECONNECT_INITIAL_DELAY,
@@ -17,9 +29,26 @@ from config.settings import (
     WS_PING_INTERVAL,
     WS_PING_TIMEOUT
 )
+from utils.validators import normalize_balance_data, normalize_positions_data
 
 logger = logging.getLogger(__name__)
 
+# Server channel path per channel type; updates arrive tagged with the same path
+_CHANNEL_PATHS = {
+    "wallet_positions": "/v2/wallet/{}/positions",
+    "wallet_balances": "/v2/wallet/{}/accounts/balances",
+    "prices": "/v2/prices/{}",
+    "market_summary": "/v2/market/{}/summary",
+}
+
+
+class _Subscription(NamedTuple):
+    """A registered channel: what it was subscribed as, its callback and its encoded subscribe frame"""
+    channel_type: str
+    identifier: str
+    callback: Callable
+    payload: str
+
 
 class ReyaWebSocketManager:
     """Manages WebSocket connections to Reya.xyz"""
@@ -27,8 +56,7 @@ class ReyaWebSocketManager:
     def __init__(self, ws_url: str = REYA_WS_URL):
         self.ws_url = ws_url
         self.websocket: Optional[websockets.WebSocketClientProtocol] = None
-        self.subscriptions: Dict[str, Set[str]] = {}  # channel_type -> set of identifiers
-        self.callbacks: Dict[str, Callable] = {}  # channel -> callback function
+        self._subs: Dict[str, _Subscription] = {}  # server channel path -> subscription
         self.is_connected = False
         self.reconnect_delay = WS_RECONNECT_INITIAL_DELAY
         self.should_reconnect = True
@@ -38,12 +66,14 @@ class ReyaWebSocketManager:
     async def connect(self):
         """Establish WebSocket connection"""
         try:
-            logger.info(f"Connecting to WebSocket: {self.ws_url}")
+            logger.info("Connecting to WebSocket: %s", self.ws_url)
             self.websocket = await websockets.connect(
                 self.ws_url,
                 ping_interval=WS_PING_INTERVAL,
                 ping_timeout=WS_PING_TIMEOUT,
-                close_timeout=10
+                close_timeout=10,
+                # Updates are small JSON frames; per-message deflate costs more CPU than it saves
+                compression=None
             )
             self.is_connected = True
             self.reconnect_delay = WS_RECONNECT_INITIAL_DELAY
@@ -56,7 +86,7 @@ class ReyaWebSocketManager:
             self.connection_task = asyncio.create_task(self._listen())
 
         except Exception as e:
-            logger.error(f"WebSocket connection failed: {e}")
+            logger.error("WebSocket connection failed: %s", e)
             self.is_connected = False
             await self._handle_reconnection()
 
@@ -99,38 +129,42 @@ class ReyaWebSocketManager:
                     break
 
                 except Exception as e:
-                    logger.error(f"Error receiving message: {e}", exc_info=True)
+                    logger.error("Error receiving message: %s: %s", type(e).__name__, e)
+                    logger.debug("Traceback:", exc_info=True)
 
         except asyncio.CancelledError:
             logger.info("WebSocket listener cancelled")
             raise
 
-    async def _handle_message(self, message: str):
-        """Handle incoming WebSocket message"""
+    async def _handle_message(self, message: Union[str, bytes]):
+        """Handle incoming WebSocket message (text or binary frame)"""
         try:
-            data = json.loads(message)
+            # Both decoders take str or bytes, so binary frames are parsed without a decode step
+            data = _json_loads(message)
 
             # Determine message type/channel
             channel = data.get('channel') or data.get('type')
 
             if not channel:
-                logger.warning(f"Message without channel: {data}")
+                logger.warning("Message without channel: %s", data)
                 return
 
-            # Call registered callback for this channel
-            callback = self.callbacks.get(channel)
-            if callback:
+            # Call registered callback for this channel (one lookup on the path the server sent)
+            sub = self._subs.get(channel)
+            if sub:
                 try:
-                    await callback(data)
+                    await sub.callback(data)
                 except Exception as e:
-                    logger.error(f"Error in callback for {channel}: {e}", exc_info=True)
+                    logger.error("Error in callback for %s: %s: %s", channel, type(e).__name__, e)
+                    logger.debug("Traceback:", exc_info=True)
             else:
-                logger.debug(f"No callback registered for channel: {channel}")
+                logger.debug("No callback registered for channel: %s", channel)
 
         except json.JSONDecodeError as e:
-            logger.error(f"Failed to parse message: {e}")
+            logger.error("Failed to parse message: %s", e)
         except Exception as e:
-            logger.error(f"Error handling message: {e}", exc_info=True)
+            logger.error("Error handling message: %s: %s", type(e).__name__, e)
+            logger.debug("Traceback:", exc_info=True)
 
     async def _handle_reconnection(self):
         """Handle reconnection with exponential backoff"""
@@ -139,7 +173,7 @@ class ReyaWebSocketManager:
 
         self.is_connected = False
 
-        logger.info(f"Reconnecting in {self.reconnect_delay}s...")
+        logger.info("Reconnecting in %ss...", self.reconnect_delay)
         await asyncio.sleep(self.reconnect_delay)
 
         # Exponential backoff
@@ -159,111 +193,142 @@ class ReyaWebSocketManager:
             identifier: Identifier for the channel (e.g., wallet address, symbol)
             callback: Async function to call when messages arrive
         """
-        channel = f"{channel_type}:{identifier}"
+        await self.subscribe_many(channel_type, {identifier: callback})
+
+    async def subscribe_many(self, channel_type: str, callbacks: Dict[str, Callable]):
+        """
+        Subscribe to one channel type for many identifiers in a single pass
 
-        # Store subscription
-        if channel_type not in self.subscriptions:
-            self.subscriptions[channel_type] = set()
-        self.subscriptions[channel_type].add(identifier)
+        Args:
+            channel_type: Type of channel (e.g., 'wallet_positions', 'prices')
+            callbacks: Mapping of identifier -> async callback
+        """
+        if not callbacks:
+            return
 
-        # Store callback
-        self.callbacks[channel] = callback
+        # Store subscriptions, each with its subscribe frame encoded once (reconnects resend the same frame)
+        payloads = []
+        for identifier, callback in callbacks.items():
+            payload = self._subscription_payload(channel_type, identifier)
+            self._subs[self._channel_path(channel_type, identifier)] = _Subscription(
+                channel_type, identifier, callback, payload
+            )
+            payloads.append(payload)
 
-        # Send subscribe message if connected
+        # Send subscribe messages together if connected
         if self.is_connected and self.websocket:
-            await self._send_subscription(channel_type, identifier)
+            await asyncio.gather(*map(self._send_subscription, payloads))
 
-        logger.info(f"Subscribed to {channel}")
+        if len(callbacks) == 1:
+            logger.info("Subscribed to %s:%s", channel_type, next(iter(callbacks)))
+        else:
+            logger.info("Subscribed to %d %s channels", len(callbacks), channel_type)
 
     async def unsubscribe(self, channel_type: str, identifier: str):
         """Unsubscribe from a WebSocket channel"""
         channel = f"{channel_type}:{identifier}"
 
         # Remove subscription
-        if channel_type in self.subscriptions:
-            self.subscriptions[channel_type].discard(identifier)
-
-        # Remove callback
-        if channel in self.callbacks:
-            del self.callbacks[channel]
+        self._subs.pop(self._channel_path(channel_type, identifier), None)
 
         # Send unsubscribe message if connected
         if self.is_connected and self.websocket:
             await self._send_unsubscription(channel_type, identifier)
 
-        logger.info(f"Unsubscribed from {channel}")
-
-    async def _send_subscription(self, channel_type: str, identifier: str):
-        """Send subscription message to WebSocket"""
-        try:
-            # Format subscription message based on Reya's WebSocket protocol
-            # This is a placeholder - adjust based on actual Reya WebSocket API
-            subscribe_msg = {
-                "type": "subscribe",
-                "channel": channel_type,
-                "id": identifier
+        logger.info("Unsubscribed from %s", channel)
+
+    @staticmethod
+    def _channel_path(channel_type: str, identifier: str) -> str:
+        """Channel string the server uses for a subscription (and tags its updates with)"""
+        path = _CHANNEL_PATHS.get(channel_type)
+        return path.format(identifier) if path else f"{channel_type}:{identifier}"
+
+    @classmethod
+    def _channel_message(cls, message_type: str, channel_type: str, identifier: str) -> dict:
+        """Subscribe/unsubscribe message for a channel, addressed the way the server names it"""
+        if channel_type in _CHANNEL_PATHS:
+            return {
+                "type": message_type,
+                "channel": cls._channel_path(channel_type, identifier)
             }
 
-            # Different formats for different channel types
-            if channel_type == "wallet_positions":
-                subscribe_msg = {
-                    "type": "subscribe",
-                    "channel": f"/v2/wallet/{identifier}/positions"
-                }
-            elif channel_type == "wallet_balances":
-                subscribe_msg = {
-                    "type": "subscribe",
-                    "channel": f"/v2/wallet/{identifier}/accounts/balances"
-                }
-            elif channel_type == "prices":
-                subscribe_msg = {
-                    "type": "subscribe",
-                    "channel": f"/v2/prices/{identifier}"
-                }
-            elif channel_type == "market_summary":
-                subscribe_msg = {
-                    "type": "subscribe",
-                    "channel": f"/v2/market/{identifier}/summary"
-                }
-
-            await self.websocket.send(json.dumps(subscribe_msg))
-            logger.debug(f"Sent subscription: {subscribe_msg}")
+        # Placeholder format for channel types without a known path
+        return {
+            "type": message_type,
+            "channel": channel_type,
+            "id": identifier
+        }
+
+    @classmethod
+    def _subscription_payload(cls, channel_type: str, identifier: str) -> str:
+        """Encoded subscribe frame for a channel"""
+        return _json_dumps(cls._channel_message("subscribe", channel_type, identifier))
+
+    async def _send_subscription(self, subscribe_msg: str):
+        """Send an encoded subscription message to WebSocket"""
+        try:
+            await self.websocket.send(subscribe_msg)
+            logger.debug("Sent subscription: %s", subscribe_msg)
 
         except Exception as e:
-            logger.error(f"Error sending subscription: {e}")
+            logger.error("Error sending subscription: %s", e)
 
     async def _send_unsubscription(self, channel_type: str, identifier: str):
         """Send unsubscription message to WebSocket"""
         try:
-            unsubscribe_msg = {
-                "type": "unsubscribe",
-                "channel": channel_type,
-                "id": identifier
-            }
+            unsubscribe_msg = self._channel_message("unsubscribe", channel_type, identifier)
 
-            await self.websocket.send(json.dumps(unsubscribe_msg))
-            logger.debug(f"Sent unsubscription: {unsubscribe_msg}")
+            await self.websocket.send(_json_dumps(unsubscribe_msg))
+            logger.debug("Sent unsubscription: %s", unsubscribe_msg)
 
         except Exception as e:
-            logger.error(f"Error sending unsubscription: {e}")
+            logger.error("Error sending unsubscription: %s", e)
 
     async def _resubscribe_all(self):
         """Resubscribe to all channels after reconnection"""
         logger.info("Resubscribing to all channels...")
 
-        for channel_type, identifiers in self.subscriptions.items():
-            for identifier in identifiers:
-                await self._send_subscription(channel_type, identifier)
+        # Frames are queued together rather than awaiting each send in turn
+        # (_send_subscription logs its own failures, so one can't cancel the rest)
+        await asyncio.gather(*(self._send_subscription(sub.payload) for sub in self._subs.values()))
 
-        logger.info(f"Resubscribed to {sum(len(ids) for ids in self.subscriptions.values())} channels")
+        logger.info("Resubscribed to %d channels", len(self._subs))
 
     async def subscribe_wallet_positions(self, wallet_address: str, callback: Callable):
-        """Subscribe to position updates for a wallet"""
-        await self.subscribe("wallet_positions", wallet_address, callback)
+        """Subscribe to position updates for a wallet (delivered as a list of positions)"""
+        await self.subscribe_wallets_positions({wallet_address: callback})
 
     async def subscribe_wallet_balances(self, wallet_address: str, callback: Callable):
-        """Subscribe to balance updates for a wallet"""
-        await self.subscribe("wallet_balances", wallet_address, callback)
+        """Subscribe to balance updates for a wallet (delivered as a list of accounts)"""
+        await self.subscribe_wallets_balances({wallet_address: callback})
+
+    async def subscribe_wallets_positions(self, callbacks: Dict[str, Callable]):
+        """Subscribe to position updates for many wallets (wallet_address -> callback, delivered as a list of positions)"""
+        await self.subscribe_many(
+            "wallet_positions",
+            {
+                wallet_address: self._normalized_callback(callback, normalize_positions_data)
+                for wallet_address, callback in callbacks.items()
+            }
+        )
+
+    async def subscribe_wallets_balances(self, callbacks: Dict[str, Callable]):
+        """Subscribe to balance updates for many wallets (wallet_address -> callback)"""
+        await self.subscribe_many(
+            "wallet_balances",
+            {
+                wallet_address: self._normalized_callback(callback, normalize_balance_data)
+                for wallet_address, callback in callbacks.items()
+            }
+        )
+
+    @staticmethod
+    def _normalized_callback(callback: Callable, normalize: Callable[[Any], list]) -> Callable:
+        """Wrap a callback so it receives the list unwrapped from the message envelope"""
+        async def normalized_callback(data: dict):
+            await callback(normalize(data))
+
+        return normalized_callback
 
     async def subscribe_price(self, symbol: str, callback: Callable):
         """Subscribe to price updates for a symbol"""
@@ -275,13 +340,15 @@ class ReyaWebSocketManager:
 
     def get_connection_status(self) -> Dict[str, Any]:
         """Get current connection status"""
+        # Grouped by channel type only when asked for
+        subscriptions: Dict[str, List[str]] = {}
+        for sub in self._subs.values():
+            subscriptions.setdefault(sub.channel_type, []).append(sub.identifier)
+
         return {
             "is_connected": self.is_connected,
-            "subscriptions_count": sum(len(ids) for ids in self.subscriptions.values()),
-            "subscriptions": {
-                channel_type: list(identifiers)
-                for channel_type, identifiers in self.subscriptions.items()
-            }
+            "subscriptions_count": len(self._subs),
+            "subscriptions": subscriptions
         }
 
 